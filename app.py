@@ -1,7 +1,8 @@
+import click
 from exceptions import *
 from config import Config
 from flasgger import Swagger
-from flask import Flask
+from flask import Flask, g, request
 from flask_cors import CORS
 from flask_jwt_extended import JWTManager, current_user
 from flask_migrate import Migrate
@@ -48,6 +49,14 @@ def create_app():
     app.register_blueprint(routes.notification_bp)
     app.register_blueprint(routes.report_bp)
 
+    # Comandos CLI (flask <grupo> <comando>)
+    import commands
+    app.cli.add_command(commands.certificates_cli)
+    app.cli.add_command(commands.events_cli)
+    app.cli.add_command(commands.notifications_cli)
+    app.cli.add_command(commands.jobs_cli)
+    app.cli.add_command(commands.worker_command)
+
     # Registrar handlers de erro
     @app.errorhandler(BadRequestException)
     def bad_request_error(error: BadRequestException):
@@ -69,20 +78,55 @@ def create_app():
     def generic_error(error: Exception):
         return {"error": "Internal Server Error"}, 500
 
+    from auth.identity_cache import init_identity_cache, load_user, get_token_version
+    from auth.token_identity import TokenIdentity
+    from domain.models.user import STREAM_TOKEN_SCOPE
+    init_identity_cache(app)
+
     @jwt.user_lookup_loader
     def user_lookup_callback(_jwt_header, jwt_data) -> domain.User:
-        identity = jwt_data["sub"]
-        user = domain.User.query.filter_by(id=int(identity), active=True).first()
-        if not user:
+        identity = int(jwt_data["sub"])
+        token_version = jwt_data.get("ver", 0)
+
+        # O token de stream vai na URL do EventSource: não vale nas demais rotas
+        if jwt_data.get("scope") == STREAM_TOKEN_SCOPE and request.endpoint != "notification.stream":
+            raise UnauthorizedException("Token inválido para esta rota.")
+
+        # Rotas autorizadas por claims: valida apenas a versão do token (em cache)
+        if g.get("jwt_claims_only") and jwt_data.get("role"):
+            if get_token_version(identity) != token_version:
+                raise UnauthorizedException("Usuário inválido.")
+            return TokenIdentity.from_claims(jwt_data)
+
+        user = load_user(identity)
+        if not user or (user.token_version or 0) != token_version:
             raise UnauthorizedException("Usuário inválido.")
         return user
 
-    from utils.certificate_scheduler import init_certificate_scheduler
-    init_certificate_scheduler(app)
+    # Jobs em background no próprio processo, apenas quando a aplicação serve
+    # requisições. Em produção podem ser desligados (SCHEDULER_ENABLED=0,
+    # EMAIL_OUTBOX_WORKER_ENABLED=0) e executados no `flask worker`
+    if _serving_app():
+        from utils.certificate_scheduler import init_certificate_scheduler
+        init_certificate_scheduler(app)
+
+        from utils.email_outbox_worker import init_email_outbox_worker
+        init_email_outbox_worker(app)
 
     return app
 
 
+def _serving_app() -> bool:
+    """
+    Falso quando a aplicação é criada por um comando da CLI do Flask (ex.:
+    `flask db upgrade`, `flask jobs list`), exceto `flask run`. Esses comandos
+    são curtos e não devem disputar o lease do scheduler nem reservar jobs;
+    o `flask worker` inicia os jobs por conta própria.
+    """
+    ctx = click.get_current_context(silent=True)
+    return ctx is None or ctx.info_name == "run"
+
+
 def def_handlers():
     pass
 
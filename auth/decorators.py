@@ -1,6 +1,8 @@
 from functools import wraps
-from flask import request, jsonify
-from flask_jwt_extended import current_user
+from flask import g, request, jsonify
+from flask_jwt_extended import current_user, get_jwt, get_jwt_request_location, verify_jwt_in_request
+
+from domain.models.user import STREAM_TOKEN_SCOPE
 
 
 def require_organizer_grant():
@@ -14,3 +16,43 @@ def require_organizer_grant():
             return f(*args, **kwargs)
         return wrapper
     return decorator
+
+
+def require_organizer_claim():
+    """
+    Decorator que valida o JWT e exige o tipo 'organizer' a partir das claims,
+    sem carregar o usuário do banco (substitui jwt_required + require_organizer_grant).
+    Nessas rotas current_user é um TokenIdentity (apenas id e tipo).
+    """
+    def decorator(f):
+        @wraps(f)
+        def wrapper(*args, **kwargs):
+            g.jwt_claims_only = True
+            verify_jwt_in_request()
+
+            if not current_user.is_organizer():
+                return jsonify({'error': 'Forbidden'}), 403
+
+            return f(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def require_stream_token():
+    """
+    Decorator do stream SSE. O EventSource não envia headers, então além do
+    header Authorization aceita o token no parâmetro `jwt` da query string,
+    mas apenas o token de stream (curto, de POST /notifications/stream-token):
+    o token de acesso não expira e não deve ficar em logs e no histórico.
+    """
+    def decorator(f):
+        @wraps(f)
+        def wrapper(*args, **kwargs):
+            verify_jwt_in_request(locations=["headers", "query_string"])
+
+            if get_jwt_request_location() == "query_string" and get_jwt().get("scope") != STREAM_TOKEN_SCOPE:
+                return jsonify({'error': 'Use o token de stream (POST /notifications/stream-token) na query string'}), 401
+
+            return f(*args, **kwargs)
+        return wrapper
+    return decorator
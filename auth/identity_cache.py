@@ -0,0 +1,136 @@
+import threading
+import time
+from collections import OrderedDict
+from flask import current_app
+from sqlalchemy.orm import make_transient_to_detached
+
+
+class IdentityCache:
+    """
+    Cache em memória (LRU com TTL) das identidades usadas na autorização.
+
+    Guarda apenas um snapshot das colunas do usuário, nunca a instância ORM,
+    para que cada requisição receba sua própria instância ligada à sessão.
+    O cache é por processo: alterações feitas em outro worker só são vistas
+    após o TTL expirar.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, user_id: int):
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires_at, snapshot = entry
+            if expires_at <= self._clock():
+                del self._entries[user_id]
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(user_id)
+            self.hits += 1
+            return snapshot
+
+    def set(self, user_id: int, snapshot: dict) -> None:
+        if self.maxsize <= 0:
+            return
+
+        with self._lock:
+            self._entries[user_id] = (self._clock() + self.ttl, snapshot)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, user_id: int) -> None:
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            }
+
+
+def init_identity_cache(app):
+    """Cria o cache de identidades da aplicação"""
+    app.extensions["identity_cache"] = IdentityCache(
+        maxsize=app.config.get("IDENTITY_CACHE_MAXSIZE", 1024),
+        ttl=app.config.get("IDENTITY_CACHE_TTL", 60),
+    )
+
+
+def get_identity_cache() -> IdentityCache:
+    return current_app.extensions["identity_cache"]
+
+
+def _get_snapshot(user_id: int):
+    """Retorna (snapshot, usuário carregado nesta chamada ou None)"""
+    from domain.models import User
+
+    cache = get_identity_cache()
+
+    snapshot = cache.get(user_id)
+    if snapshot is not None:
+        return snapshot, None
+
+    user = User.query.filter_by(id=user_id, active=True).first()
+    if not user:
+        return None, None
+
+    snapshot = {attr.key: getattr(user, attr.key) for attr in User.__mapper__.column_attrs}
+    cache.set(user_id, snapshot)
+    return snapshot, user
+
+
+def load_user(user_id: int):
+    """
+    Retorna o usuário ativo para o user_lookup_loader do JWT. Em um hit a
+    instância é reconstruída do snapshot e anexada à sessão sem consulta.
+    """
+    from app import db
+    from domain.models import User
+
+    snapshot, user = _get_snapshot(user_id)
+    if user is not None or snapshot is None:
+        return user
+
+    user = User(**snapshot)
+    make_transient_to_detached(user)
+    return db.session.merge(user, load=False)
+
+
+def get_token_version(user_id: int):
+    """Versão atual dos tokens do usuário ativo (None se inexistente/inativo)"""
+    snapshot, _ = _get_snapshot(user_id)
+    if snapshot is None:
+        return None
+    return snapshot.get("token_version") or 0
+
+
+def invalidate_user(user_id: int) -> None:
+    """Remove o usuário do cache (chamar após alterações no usuário)"""
+    get_identity_cache().invalidate(user_id)
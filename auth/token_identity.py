@@ -0,0 +1,23 @@
+from domain.models.user_type import UserType
+
+
+class TokenIdentity:
+    """
+    Identidade montada apenas a partir das claims do JWT. Usada como
+    current_user nas rotas autorizadas por claims, evitando carregar o usuário.
+    Expõe somente o id e o tipo.
+    """
+
+    def __init__(self, id: int, type: UserType):
+        self.id = id
+        self.type = type
+
+    @staticmethod
+    def from_claims(jwt_data: dict) -> "TokenIdentity":
+        return TokenIdentity(
+            id=int(jwt_data["sub"]),
+            type=UserType[jwt_data["role"]]
+        )
+
+    def is_organizer(self):
+        return self.type == UserType.ORGANIZER
@@ -0,0 +1,17 @@
+"""Dados sintéticos compartilhados pelos benchmarks (sem banco)"""
+from datetime import datetime, timedelta
+
+
+def certificate_jobs(total: int) -> list[dict]:
+    """Dados de N certificados do mesmo evento, no formato de certificate_renderer.certificate_data"""
+    event_date = datetime.now() - timedelta(days=1)
+    return [{
+        "user_id": i,
+        "event_id": 1,
+        "participant_name": f"Participante Número {i}",
+        "event_title": "Conferência de Engenharia de Software",
+        "event_date": event_date,
+        "event_location": "Centro de Convenções - Recife",
+        "event_speaker": "Dra. Ana Souza",
+        "institution_organizer": "UFPE",
+    } for i in range(total)]
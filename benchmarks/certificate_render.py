@@ -0,0 +1,59 @@
+"""
+Benchmark da renderização de certificados em lote: escalonamento do pool de processos.
+
+Uso:
+    python -m benchmarks.certificate_render --certificates 2000 --workers 1 2 4 8
+
+Renderiza N certificados (dados sintéticos, sem banco) com cada quantidade
+de workers e mede o tempo total e a vazão. Com 1 worker a renderização
+ocorre no próprio processo, como no modo sequencial. O pool é aquecido
+antes da medição, de forma que o custo de iniciar os processos (spawn) não
+entra no tempo; ele é pago uma única vez por processo da aplicação.
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+from benchmarks._common import certificate_jobs
+from services import certificate_renderer
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--certificates", type=int, default=2000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    jobs = certificate_jobs(args.certificates)
+    print(f"CPUs disponíveis: {os.cpu_count()} | certificados: {args.certificates}\n")
+    print(f"{'workers':>8}{'tempo (s)':>12}{'cert/s':>10}{'ms/cert':>10}{'speedup':>10}")
+
+    baseline = None
+    for workers in args.workers:
+        workdir = tempfile.mkdtemp(prefix="bench_cert_")
+        try:
+            if workers > 1:
+                # Aquecimento: inicia os processos e importa o ReportLab neles
+                certificate_renderer.render_certificates(jobs[:workers * 2], workdir, workers)
+
+            start = time.perf_counter()
+            results = certificate_renderer.render_certificates(jobs, workdir, workers)
+            elapsed = time.perf_counter() - start
+        finally:
+            certificate_renderer.shutdown_render_pool()
+            shutil.rmtree(workdir, ignore_errors=True)
+
+        failures = sum(1 for result in results if "error" in result)
+        if failures:
+            print(f"{workers:>8}  {failures} falhas de renderização")
+            continue
+
+        baseline = baseline or elapsed
+        print(f"{workers:>8}{elapsed:>12.2f}{len(jobs) / elapsed:>10.1f}"
+              f"{elapsed * 1000 / len(jobs):>10.2f}{baseline / elapsed:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Benchmark da renderização por certificado: documento completo vs. modelo do evento.
+
+Uso:
+    python -m benchmarks.certificate_template --certificates 1000
+
+"antes" reproduz a renderização original: estilos recriados e o documento
+inteiro montado pelo SimpleDocTemplate a cada certificado. "depois" usa
+certificate_renderer.render_certificate_pdf, que reutiliza o modelo do evento
+(estilos em cache e layout calculado uma vez) e só desenha o nome do
+participante. Tudo no próprio processo, sem banco.
+"""
+import argparse
+import shutil
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+from benchmarks._common import certificate_jobs
+from services import certificate_renderer
+
+
+def _render_full_document(data: dict, workdir: str) -> None:
+    """Caminho original: estilos e layout refeitos por certificado"""
+    certificate_renderer._styles.cache_clear()
+    emission_date = datetime.now().strftime("%d de %B de %Y")
+    name = certificate_renderer._name_paragraph(data["participant_name"])
+    story = certificate_renderer._story(data, emission_date, name)
+    certificate_renderer._build_document(
+        story, str(Path(workdir) / f"full_{data['user_id']}.pdf"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--certificates", type=int, default=1000)
+    args = parser.parse_args()
+
+    jobs = certificate_jobs(args.certificates)
+    modes = {
+        "antes (documento completo)": _render_full_document,
+        "depois (modelo do evento)": certificate_renderer.render_certificate_pdf,
+    }
+
+    print(f"certificados: {args.certificates}\n")
+    print(f"{'modo':<30}{'tempo (s)':>12}{'ms/cert':>10}{'cert/s':>10}")
+
+    baseline = None
+    for label, render in modes.items():
+        workdir = tempfile.mkdtemp(prefix="bench_template_")
+        try:
+            render(jobs[0], workdir)  # aquecimento (imports e fontes do ReportLab)
+            start = time.perf_counter()
+            for data in jobs:
+                render(data, workdir)
+            elapsed = time.perf_counter() - start
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+        baseline = baseline or elapsed
+        print(f"{label:<30}{elapsed:>12.2f}{elapsed * 1000 / len(jobs):>10.2f}"
+              f"{len(jobs) / elapsed:>10.1f}  {baseline / elapsed:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+Benchmark do envio de emails de certificado: uma conexão por mensagem vs. lote.
+
+Uso:
+    python -m benchmarks.email_delivery --messages 1000 --connections 1 2 4
+
+Sobe um servidor SMTP local (aiosmtpd, necessário apenas para o benchmark)
+e envia N emails com um certificado PDF anexado. "mail.send" abre uma
+conexão por mensagem, como o envio original; "lote" usa
+email_service.send_messages_batch com a quantidade de conexões informada.
+
+Um servidor local não tem o custo do handshake TLS + AUTH do smtp.gmail.com;
+--handshake-ms simula esse custo a cada nova conexão (no EHLO) e
+--message-ms a latência de cada DATA.
+"""
+import argparse
+import asyncio
+import os
+import socket
+import tempfile
+import time
+
+
+class _LatencySink:
+    def __init__(self, handshake_ms: float, message_ms: float):
+        self.handshake = handshake_ms / 1000
+        self.message = message_ms / 1000
+        self.received = 0
+
+    async def handle_EHLO(self, server, session, envelope, hostname, responses):
+        session.host_name = hostname
+        await asyncio.sleep(self.handshake)
+        return responses
+
+    async def handle_DATA(self, server, session, envelope):
+        await asyncio.sleep(self.message)
+        self.received += 1
+        return "250 OK"
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--messages", type=int, default=1000)
+    parser.add_argument("--connections", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--max-per-connection", type=int, default=100)
+    parser.add_argument("--handshake-ms", type=float, default=50)
+    parser.add_argument("--message-ms", type=float, default=2)
+    parser.add_argument("--baseline-messages", type=int, default=200,
+                        help="mensagens enviadas com mail.send (uma conexão cada)")
+    args = parser.parse_args()
+
+    try:
+        from aiosmtpd.controller import Controller
+    except ImportError:
+        raise SystemExit("Instale o aiosmtpd para rodar este benchmark: pip install aiosmtpd")
+
+    workdir = tempfile.mkdtemp(prefix="bench_email_")
+    os.environ["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{workdir}/bench.db"
+    os.environ["EMAIL_OUTBOX_WORKER_ENABLED"] = "0"
+    os.environ["SCHEDULER_ENABLED"] = "0"
+
+    from flask_mail import Message
+    from app import create_app, mail
+    from services import certificate_renderer, email_service
+
+    sink = _LatencySink(args.handshake_ms, args.message_ms)
+    port = _free_port()
+    controller = Controller(sink, hostname="127.0.0.1", port=port)
+    controller.start()
+
+    app = create_app()
+    state = app.extensions["mail"]
+    state.server, state.port = "127.0.0.1", port
+    state.use_tls = state.use_ssl = False
+    state.username = state.password = None
+    state.suppress = False
+    state.default_sender = "certificados@eventanexus.test"
+
+    with app.app_context():
+        pdf_path = certificate_renderer.render_certificate_pdf({
+            "user_id": 1, "event_id": 1, "participant_name": "Participante",
+            "event_title": "Conferência", "event_date": None,
+            "event_location": "Recife", "event_speaker": None,
+            "institution_organizer": "UFPE",
+        }, workdir)
+        with open(pdf_path, "rb") as f:
+            pdf = f.read()
+
+        def messages(total):
+            result = []
+            for i in range(total):
+                msg = Message(subject=f"Certificado {i}",
+                              recipients=[f"participante{i}@test.com"],
+                              body="Segue em anexo seu certificado.")
+                msg.attach("certificado.pdf", "application/pdf", pdf)
+                result.append(msg)
+            return result
+
+        print(f"PDF anexado: {len(pdf) / 1024:.1f} KiB | handshake simulado: "
+              f"{args.handshake_ms:.0f} ms | DATA: {args.message_ms:.0f} ms\n")
+        print(f"{'modo':<28}{'mensagens':>10}{'tempo (s)':>12}{'msg/s':>10}")
+
+        batch = messages(args.baseline_messages)
+        start = time.perf_counter()
+        for msg in batch:
+            mail.send(msg)
+        elapsed = time.perf_counter() - start
+        baseline = len(batch) / elapsed
+        print(f"{'mail.send (1 conexão/msg)':<28}{len(batch):>10}{elapsed:>12.2f}{baseline:>10.1f}")
+
+        for connections in args.connections:
+            batch = messages(args.messages)
+            start = time.perf_counter()
+            results = email_service.send_messages_batch(
+                batch, connections=connections,
+                max_per_connection=args.max_per_connection)
+            elapsed = time.perf_counter() - start
+            failures = sum(1 for r in results if r is not None)
+            rate = len(batch) / elapsed
+            label = f"lote ({connections} conexões)"
+            print(f"{label:<28}{len(batch):>10}{elapsed:>12.2f}{rate:>10.1f}"
+                  f"  {rate / baseline:.1f}x" + (f"  {failures} falhas" if failures else ""))
+
+    controller.stop()
+
+
+if __name__ == "__main__":
+    main()
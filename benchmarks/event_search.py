@@ -0,0 +1,129 @@
+"""
+Benchmark da busca livre (filtro q): índice FTS5 vs. ILIKE '%q%'.
+
+Uso:
+    python -m benchmarks.event_search --events 100000
+
+Cria um banco SQLite temporário, popula N eventos e mede a mediana do
+tempo de cada busca. As consultas são ordenadas por data, como na listagem
+padrão, o que obriga o ILIKE a varrer a tabela inteira; a coluna
+"FTS5 bm25" mede a ordenação por relevância, cujo custo cresce com o
+número de resultados do termo.
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+WORDS = [
+    "python", "dados", "inteligência", "artificial", "segurança", "redes",
+    "nuvem", "design", "gestão", "inovação", "robótica", "educação",
+    "saúde", "finanças", "blockchain", "jogos", "música", "química",
+]
+# Termos do mais seletivo ao menos seletivo
+TERMS = ["#12345", "xyz-inexistente", "Sala 42 ", "segurança de", "python"]
+
+
+def _populate(db, total: int):
+    from domain.models import Event, EventType, User, UserType
+
+    organizer = User(name="Bench", email="bench@test.com", password="x",
+                     type=UserType.ORGANIZER)
+    db.session.add(organizer)
+    db.session.commit()
+
+    rng = random.Random(42)
+    cities = ["Recife", "Olinda", "Caruaru", "Petrolina", "Garanhuns"]
+    rows = []
+    for i in range(total):
+        words = rng.sample(WORDS, 4)
+        rows.append({
+            "title": f"{words[0].title()} e {words[1]} #{i}",
+            "description": " ".join(rng.sample(WORDS, 8)),
+            "date": datetime.now() + timedelta(days=rng.randint(1, 365)),
+            "location": f"Sala {rng.randint(1, 300)} - {rng.choice(cities)}",
+            "capacity": rng.randint(10, 500),
+            "type": rng.choice(list(EventType)),
+            "speaker": f"Dr. {words[2].title()}",
+            "institution_organizer": rng.choice(["UFPE", "UFRPE", "UPE", "IFPE"]),
+            "created_by": organizer.id,
+            "active": True,
+        })
+    db.session.execute(Event.__table__.insert(), rows)
+    db.session.commit()
+
+
+def _ilike_query(term: str):
+    from domain.models import Event
+
+    search = f"%{term}%"
+    return Event.query.filter(
+        (Event.title.ilike(search))
+        | (Event.description.ilike(search))
+        | (Event.location.ilike(search))
+        | (Event.speaker.ilike(search))
+        | (Event.institution_organizer.ilike(search))
+    ).order_by(Event.date.asc(), Event.id.asc())
+
+
+def _fts_query(order_by: str):
+    from domain import EventFilterDTO
+
+    def build(term: str):
+        filter = EventFilterDTO()
+        filter.q = term
+        filter.order_by = order_by
+        return filter.build_filters(None)
+    return build
+
+
+def _measure(build_query, term: str, repeat: int, limit: int):
+    timings = []
+    count = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        count = len(build_query(term).limit(limit).all())
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings), count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--events", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench_search_")
+    os.environ["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{workdir}/bench.db"
+    # Sem jobs em background disputando o lock de escrita durante a carga
+    os.environ["SCHEDULER_ENABLED"] = "0"
+    os.environ["EMAIL_OUTBOX_WORKER_ENABLED"] = "0"
+
+    from app import create_app, db
+
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        print(f"Populando {args.events} eventos...")
+        start = time.perf_counter()
+        _populate(db, args.events)
+        print(f"Carga concluída em {time.perf_counter() - start:.1f}s\n")
+
+        print(f"{'termo':<18}{'ILIKE (ms)':>12}{'FTS5 (ms)':>12}{'speedup':>10}"
+              f"{'FTS5 bm25 (ms)':>16}{'matches':>9}")
+        for term in TERMS:
+            ilike_ms, _ = _measure(_ilike_query, term, args.repeat, args.limit)
+            fts_ms, _ = _measure(_fts_query('date'), term, args.repeat, args.limit)
+            rank_ms, _ = _measure(_fts_query('relevance'), term, args.repeat, args.limit)
+            matches = _fts_query('date')(term).count()
+            speedup = ilike_ms / fts_ms if fts_ms else float("inf")
+            print(f"{term:<18}{ilike_ms:>12.2f}{fts_ms:>12.2f}{speedup:>9.1f}x"
+                  f"{rank_ms:>16.2f}{matches:>9}")
+
+
+if __name__ == "__main__":
+    main()
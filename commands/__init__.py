@@ -0,0 +1,5 @@
+from .certificate_commands import certificates_cli
+from .event_commands import events_cli
+from .job_commands import jobs_cli
+from .notification_commands import notifications_cli
+from .worker_commands import worker_command
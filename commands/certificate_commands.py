@@ -0,0 +1,31 @@
+import click
+from flask.cli import AppGroup
+from services.certificate_service import CertificateService
+
+
+certificates_cli = AppGroup("certificates", help="Comandos de manutenção de certificados.")
+
+
+@certificates_cli.command("gc")
+@click.option("--dry-run", is_flag=True, help="Apenas conta os arquivos órfãos, sem alterar.")
+@click.option("--quarantine/--delete", default=None,
+              help="Move os órfãos para a quarentena em vez de apagá-los.")
+@click.option("--batch-size", type=int, default=None, help="Chaves por lote.")
+@click.option("--min-age-hours", type=int, default=None,
+              help="Preserva arquivos mais novos que N horas.")
+def gc(dry_run, quarantine, batch_size, min_age_hours):
+    """Coleta os PDFs do armazenamento sem certificado correspondente"""
+    metrics = CertificateService.collect_orphaned_files(
+        batch_size=batch_size, min_age_hours=min_age_hours,
+        quarantine=quarantine, dry_run=dry_run)
+
+    if dry_run:
+        click.echo(f"{metrics['orphans']} arquivo(s) órfão(s) de {metrics['scanned']} "
+                   f"({metrics['reclaimed_bytes']} bytes) e {metrics['staging']} sobra(s) "
+                   f"de renderização seriam removido(s) (dry-run).")
+    else:
+        action = "movido(s) para a quarentena" if metrics["quarantine"] else "apagado(s)"
+        click.echo(f"{metrics['removed']} arquivo(s) órfão(s) de {metrics['scanned']} {action} "
+                   f"({metrics['reclaimed_bytes']} bytes) e {metrics['staging']} sobra(s) de "
+                   f"renderização apagada(s) em {metrics['batches']} lote(s) "
+                   f"({metrics['elapsed_seconds']}s).")
@@ -0,0 +1,24 @@
+import click
+from flask.cli import AppGroup
+import services.event_service as service
+
+
+events_cli = AppGroup("events", help="Comandos de manutenção de eventos.")
+
+
+@events_cli.command("reconcile-enrollments")
+@click.option("--dry-run", is_flag=True, help="Apenas relata divergências, sem corrigir.")
+def reconcile_enrollments(dry_run):
+    """Detecta e corrige divergências em Event.enrolled_count"""
+    drift = service.reconcile_enrolled_counts(fix=not dry_run)
+
+    for item in drift:
+        click.echo(
+            f"Evento {item['event_id']}: armazenado={item['stored']} real={item['actual']}")
+
+    if not drift:
+        click.echo("Nenhuma divergência encontrada.")
+    elif dry_run:
+        click.echo(f"{len(drift)} evento(s) divergente(s) (dry-run, nada foi alterado).")
+    else:
+        click.echo(f"{len(drift)} evento(s) corrigido(s).")
@@ -0,0 +1,37 @@
+import click
+from flask.cli import AppGroup
+import services.scheduled_job_service as service
+
+
+jobs_cli = AppGroup("jobs", help="Consulta dos jobs agendados.")
+
+
+@jobs_cli.command("list")
+def list_jobs():
+    """Lista os jobs agendados com a próxima execução e o último resultado"""
+    jobs = service.list_jobs()
+    if not jobs:
+        click.echo("Nenhum job agendado.")
+        return
+
+    for job in jobs:
+        last = (f"{job.last_status.name} em {job.last_duration_seconds}s ({job.last_run_at:%Y-%m-%d %H:%M:%S})"
+                if job.last_status else "nunca executado")
+        running = f" | em execução desde {job.running_since:%Y-%m-%d %H:%M:%S}" if job.running_since else ""
+        click.echo(f"{job.name}: próxima {job.next_run_at:%Y-%m-%d %H:%M:%S} | última {last}{running}")
+
+
+@jobs_cli.command("history")
+@click.argument("name")
+@click.option("--limit", type=int, default=20, show_default=True, help="Execuções exibidas.")
+def history(name, limit):
+    """Histórico das execuções mais recentes de um job"""
+    runs = service.get_job_runs(name, limit)
+    if not runs:
+        click.echo(f"Nenhuma execução registrada para {name}.")
+        return
+
+    for run in runs:
+        detail = run.error or run.result
+        click.echo(f"{run.started_at:%Y-%m-%d %H:%M:%S} {run.status.name} "
+                   f"{run.duration_seconds}s" + (f" {detail}" if detail else ""))
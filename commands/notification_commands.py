@@ -0,0 +1,46 @@
+import click
+from flask.cli import AppGroup
+import services.notification_service as service
+
+
+notifications_cli = AppGroup("notifications", help="Comandos de manutenção de notificações.")
+
+
+@notifications_cli.command("reconcile-unread")
+@click.option("--dry-run", is_flag=True, help="Apenas relata divergências, sem corrigir.")
+def reconcile_unread(dry_run):
+    """Detecta e corrige divergências em User.unread_count"""
+    drift = service.reconcile_unread_counts(fix=not dry_run)
+
+    for item in drift:
+        click.echo(
+            f"Usuário {item['user_id']}: armazenado={item['stored']} real={item['actual']}")
+
+    if not drift:
+        click.echo("Nenhuma divergência encontrada.")
+    elif dry_run:
+        click.echo(f"{len(drift)} usuário(s) divergente(s) (dry-run, nada foi alterado).")
+    else:
+        click.echo(f"{len(drift)} usuário(s) corrigido(s).")
+
+
+@notifications_cli.command("retention")
+@click.option("--dry-run", is_flag=True, help="Apenas conta as notificações afetadas, sem alterar.")
+@click.option("--read-days", type=int, default=None,
+              help="Apaga notificações lidas mais antigas que N dias.")
+@click.option("--archive-days", type=int, default=None,
+              help="Arquiva notificações não lidas mais antigas que N dias.")
+@click.option("--batch-size", type=int, default=None, help="Linhas por lote.")
+def retention(dry_run, read_days, archive_days, batch_size):
+    """Aplica a política de retenção (apaga lidas antigas e arquiva não lidas antigas)"""
+    metrics = service.apply_retention_policy(
+        read_days=read_days, archive_days=archive_days,
+        batch_size=batch_size, dry_run=dry_run)
+
+    if dry_run:
+        click.echo(f"{metrics['deleted']} notificação(ões) lida(s) seriam apagada(s) e "
+                   f"{metrics['archived']} não lida(s) seriam arquivada(s) (dry-run).")
+    else:
+        click.echo(f"{metrics['deleted']} notificação(ões) apagada(s) e "
+                   f"{metrics['archived']} arquivada(s) em {metrics['batches']} lote(s) "
+                   f"({metrics['elapsed_seconds']}s).")
@@ -0,0 +1,55 @@
+import signal
+import threading
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+
+from utils.certificate_scheduler import certificate_scheduler
+from utils.email_outbox_worker import email_outbox_worker
+
+
+def run_worker(app, scheduler: bool = True, email: bool = True, stop_event: threading.Event = None):
+    """
+    Executa os jobs em background (scheduler e fila de emails) neste processo
+    até stop_event ser sinalizado, parando-os de forma ordenada em seguida:
+    o scheduler termina o job em andamento e libera o lease.
+    """
+    stop_event = stop_event or threading.Event()
+
+    if scheduler:
+        certificate_scheduler.init_app(app, force=True)
+    if email:
+        email_outbox_worker.init_app(app, force=True)
+
+    try:
+        stop_event.wait()
+    finally:
+        if scheduler:
+            certificate_scheduler.stop_scheduler()
+        if email:
+            email_outbox_worker.stop()
+
+
+@click.command("worker")
+@click.option("--scheduler/--no-scheduler", default=True, help="Executa os jobs agendados.")
+@click.option("--email/--no-email", default=True, help="Esvazia a fila de emails.")
+@with_appcontext
+def worker_command(scheduler, email):
+    """Processo dedicado aos jobs em background, fora dos workers web"""
+    if not scheduler and not email:
+        raise click.UsageError("Nada a executar: habilite --scheduler ou --email.")
+
+    app = current_app._get_current_object()
+    stop_event = threading.Event()
+
+    def stop(signum, frame):
+        click.echo("Encerrando worker...")
+        stop_event.set()
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    jobs = [name for name, enabled in (("scheduler", scheduler), ("fila de emails", email)) if enabled]
+    click.echo(f"Worker iniciado: {', '.join(jobs)}")
+    run_worker(app, scheduler=scheduler, email=email, stop_event=stop_event)
+    click.echo("Worker encerrado.")
@@ -18,6 +18,84 @@ class Config:
     MAIL_USERNAME = os.getenv("MAIL_USERNAME")
     MAIL_PASSWORD = os.getenv("MAIL_PASSWORD")
 
+    # Cache em memória das identidades carregadas pelo JWT (por processo)
+    IDENTITY_CACHE_MAXSIZE = int(os.getenv("IDENTITY_CACHE_MAXSIZE", 1024))
+    IDENTITY_CACHE_TTL = int(os.getenv("IDENTITY_CACHE_TTL", 60))
+
+    # Scheduler de jobs em background. Em vários processos apenas o dono do
+    # lease (scheduler_leases) executa os jobs; outro assume em até TTL + HEARTBEAT segundos
+    SCHEDULER_ENABLED = os.getenv("SCHEDULER_ENABLED", "1") == "1"
+    # O loop dorme até o próximo job, no máximo SCHEDULER_MAX_SLEEP segundos
+    SCHEDULER_MAX_SLEEP = int(os.getenv("SCHEDULER_MAX_SLEEP", 300))
+    SCHEDULER_LEASE_TTL = int(os.getenv("SCHEDULER_LEASE_TTL", 60))
+    SCHEDULER_LEASE_HEARTBEAT = int(os.getenv("SCHEDULER_LEASE_HEARTBEAT", 15))
+    # Atraso (s) a partir do qual a execução conta como perdida (política de catch-up do job)
+    SCHEDULER_MISFIRE_GRACE = int(os.getenv("SCHEDULER_MISFIRE_GRACE", 600))
+    # Execução sem término após N segundos é considerada abandonada (processo morto)
+    SCHEDULER_JOB_TIMEOUT = int(os.getenv("SCHEDULER_JOB_TIMEOUT", 21600))
+    # Execuções mantidas por job em job_runs
+    SCHEDULER_JOB_HISTORY = int(os.getenv("SCHEDULER_JOB_HISTORY", 100))
+
+    # Armazenamento dos PDFs: "filesystem" (CERTIFICATE_STORAGE_PATH, padrão
+    # instance/certificates) ou "s3" (bucket S3/MinIO, requer o boto3)
+    CERTIFICATE_STORAGE = os.getenv("CERTIFICATE_STORAGE", "filesystem")
+    CERTIFICATE_STORAGE_PATH = os.getenv("CERTIFICATE_STORAGE_PATH")
+    CERTIFICATE_S3_BUCKET = os.getenv("CERTIFICATE_S3_BUCKET")
+    CERTIFICATE_S3_PREFIX = os.getenv("CERTIFICATE_S3_PREFIX", "certificates/")
+    CERTIFICATE_S3_ENDPOINT_URL = os.getenv("CERTIFICATE_S3_ENDPOINT_URL")
+    CERTIFICATE_S3_REGION = os.getenv("CERTIFICATE_S3_REGION")
+
+    # "eager" renderiza os PDFs ao gerar os certificados e os anexa aos emails;
+    # "lazy" cria apenas as linhas e cada PDF é renderizado no primeiro download
+    # ou reenvio por email; os emails da conclusão do evento levam o link no FRONTEND_URL
+    CERTIFICATE_RENDER_MODE = os.getenv("CERTIFICATE_RENDER_MODE", "eager")
+    FRONTEND_URL = os.getenv("FRONTEND_URL", "http://localhost:3000")
+    # Processos usados para renderizar certificados em lote (0 ou 1 = no próprio processo)
+    CERTIFICATE_RENDER_WORKERS = int(os.getenv("CERTIFICATE_RENDER_WORKERS", 0))
+
+    # Processamento automático de eventos concluídos: eventos por execução e,
+    # na primeira execução (sem marca d'água), quantas horas olhar para trás
+    CERTIFICATE_PROCESSING_MAX_EVENTS = int(os.getenv("CERTIFICATE_PROCESSING_MAX_EVENTS", 50))
+    CERTIFICATE_PROCESSING_INITIAL_LOOKBACK_HOURS = int(os.getenv("CERTIFICATE_PROCESSING_INITIAL_LOOKBACK_HOURS", 24))
+
+    # Coleta de PDFs órfãos (sem linha em certificates): arquivos com menos de
+    # MIN_AGE_HOURS são preservados (renderizações em andamento); com
+    # QUARANTINE=1 os órfãos vão para a quarentena do armazenamento em vez de apagados
+    CERTIFICATE_GC_ENABLED = os.getenv("CERTIFICATE_GC_ENABLED", "1") == "1"
+    CERTIFICATE_GC_BATCH_SIZE = int(os.getenv("CERTIFICATE_GC_BATCH_SIZE", 500))
+    CERTIFICATE_GC_MIN_AGE_HOURS = int(os.getenv("CERTIFICATE_GC_MIN_AGE_HOURS", 24))
+    CERTIFICATE_GC_QUARANTINE = os.getenv("CERTIFICATE_GC_QUARANTINE", "0") == "1"
+
+    # Fila de emails (email_outbox) e worker de envio em background
+    EMAIL_OUTBOX_WORKER_ENABLED = os.getenv("EMAIL_OUTBOX_WORKER_ENABLED", "1") == "1"
+    EMAIL_OUTBOX_POLL_INTERVAL = int(os.getenv("EMAIL_OUTBOX_POLL_INTERVAL", 10))
+    EMAIL_OUTBOX_BATCH_SIZE = int(os.getenv("EMAIL_OUTBOX_BATCH_SIZE", 50))
+    EMAIL_OUTBOX_MAX_ATTEMPTS = int(os.getenv("EMAIL_OUTBOX_MAX_ATTEMPTS", 5))
+    EMAIL_OUTBOX_BACKOFF_SECONDS = int(os.getenv("EMAIL_OUTBOX_BACKOFF_SECONDS", 30))
+    EMAIL_OUTBOX_MAX_BACKOFF_SECONDS = int(os.getenv("EMAIL_OUTBOX_MAX_BACKOFF_SECONDS", 3600))
+    EMAIL_OUTBOX_CLAIM_TIMEOUT = int(os.getenv("EMAIL_OUTBOX_CLAIM_TIMEOUT", 300))
+
+    # Envio em lote: conexões SMTP simultâneas e limite de mensagens por conexão
+    EMAIL_BATCH_CONNECTIONS = int(os.getenv("EMAIL_BATCH_CONNECTIONS", 2))
+    EMAIL_BATCH_MAX_PER_CONNECTION = int(os.getenv("EMAIL_BATCH_MAX_PER_CONNECTION", 100))
+
+    # Stream SSE de notificações (/notifications/stream), limites por processo
+    NOTIFICATION_STREAM_MAX_CLIENTS = int(os.getenv("NOTIFICATION_STREAM_MAX_CLIENTS", 500))
+    NOTIFICATION_STREAM_HEARTBEAT = int(os.getenv("NOTIFICATION_STREAM_HEARTBEAT", 15))
+    NOTIFICATION_STREAM_MAX_SECONDS = int(os.getenv("NOTIFICATION_STREAM_MAX_SECONDS", 300))
+    NOTIFICATION_STREAM_RETRY_MS = int(os.getenv("NOTIFICATION_STREAM_RETRY_MS", 3000))
+    NOTIFICATION_STREAM_REPLAY_LIMIT = int(os.getenv("NOTIFICATION_STREAM_REPLAY_LIMIT", 100))
+    # Validade (s) do token de stream usado na query string; basta para abrir a conexão
+    NOTIFICATION_STREAM_TOKEN_TTL = int(os.getenv("NOTIFICATION_STREAM_TOKEN_TTL", 60))
+
+    # Retenção de notificações: lidas são apagadas após READ_DAYS e não lidas
+    # arquivadas (notifications_archive) após ARCHIVE_DAYS, em lotes de BATCH_SIZE
+    NOTIFICATION_RETENTION_ENABLED = os.getenv("NOTIFICATION_RETENTION_ENABLED", "1") == "1"
+    NOTIFICATION_RETENTION_READ_DAYS = int(os.getenv("NOTIFICATION_RETENTION_READ_DAYS", 90))
+    NOTIFICATION_RETENTION_ARCHIVE_DAYS = int(os.getenv("NOTIFICATION_RETENTION_ARCHIVE_DAYS", 180))
+    NOTIFICATION_RETENTION_BATCH_SIZE = int(os.getenv("NOTIFICATION_RETENTION_BATCH_SIZE", 500))
+    NOTIFICATION_RETENTION_BATCH_PAUSE_MS = int(os.getenv("NOTIFICATION_RETENTION_BATCH_PAUSE_MS", 50))
+
     # Configuração do Swagger
     SWAGGER = {
         'title': 'Event Anexus API',
@@ -53,7 +131,7 @@ class Config:
                     'institution_organizer': {'type': 'string'},
                     'created_by': {'type': 'integer'},
                     'q': {'type': 'string', 'description': 'Pesquisa livre: title | description | location | speaker | institution_organizer'},
-                    'order_by': {'type': 'string', 'enum': ['date', 'title', 'capacity', 'location', 'type', 'speaker', 'institution_organizer'], 'default': 'date'},
+                    'order_by': {'type': 'string', 'enum': ['date', 'title', 'capacity', 'location', 'type', 'speaker', 'institution_organizer', 'relevance'], 'default': 'date', 'description': 'relevance (bm25) só se aplica com q; é o padrão quando q é informado sem order_by'},
                     'order_direction': {'type': 'string', 'enum': ['asc', 'desc'], 'default': 'asc'}
                 }
             }
@@ -124,7 +124,7 @@ get_certificate = {
 download_certificate = {
     "tags": ["Certificados"],
     "summary": "Baixar certificado PDF",
-    "description": "Faz o download do arquivo PDF do certificado.",
+    "description": "Faz o download do arquivo PDF do certificado. Com CERTIFICATE_RENDER_MODE=lazy o PDF é renderizado no primeiro download. Aceita um intervalo no cabeçalho Range (resposta 206 com Content-Range, ou 416 se ele começa depois do fim do arquivo; vários intervalos recebem o arquivo inteiro). Responde com ETag e atende If-None-Match (304) e If-Range.",
     "security": [{"Bearer": []}],
     "parameters": [
         {
@@ -133,6 +133,13 @@ download_certificate = {
             "type": "integer",
             "required": True,
             "description": "ID do certificado"
+        },
+        {
+            "name": "Range",
+            "in": "header",
+            "type": "string",
+            "required": False,
+            "description": "Intervalo de bytes (ex.: bytes=0-1023)"
         }
     ],
     "responses": {
@@ -147,6 +154,15 @@ download_certificate = {
                 }
             }
         },
+        206: {
+            "description": "Intervalo solicitado do PDF (cabeçalho Content-Range)"
+        },
+        304: {
+            "description": "Não modificado (If-None-Match confere com o ETag)"
+        },
+        416: {
+            "description": "Intervalo fora do tamanho do arquivo"
+        },
         401: {
             "description": "Unauthorized - token inválido ou ausente",
             "schema": {
@@ -180,7 +196,7 @@ download_certificate = {
 send_certificate_email = {
     "tags": ["Certificados"],
     "summary": "Reenviar certificado por email",
-    "description": "Reenvia o certificado PDF para o email do usuário.",
+    "description": "Agenda o reenvio do certificado PDF para o email do usuário (fila de emails).",
     "security": [{"Bearer": []}],
     "parameters": [
         {
@@ -193,7 +209,7 @@ send_certificate_email = {
     ],
     "responses": {
         200: {
-            "description": "Certificado enviado com sucesso",
+            "description": "Envio do certificado agendado com sucesso",
             "schema": {
                 "type": "object",
                 "properties": {
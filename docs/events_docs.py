@@ -12,7 +12,7 @@ event_filter_schema = {
         "institution_organizer": {"type": "string"},
         "created_by": {"type": "integer"},
         "q": {"type": "string", "description": "Pesquisa livre: title | description | location | speaker | institution_organizer"},
-        "order_by": {"type": "string", "enum": ["date", "title", "capacity", "location", "type", "speaker", "institution_organizer"], "default": "date"},
+        "order_by": {"type": "string", "enum": ["date", "title", "capacity", "location", "type", "speaker", "institution_organizer", "relevance"], "default": "date", "description": "relevance (bm25) só se aplica com q; é o padrão quando q é informado sem order_by"},
         "order_direction": {"type": "string", "enum": ["asc", "desc"], "default": "asc"}
     }
 }
@@ -32,6 +32,20 @@ list_events = {
                 "type": "string",
                 "example": "ewogICJkYXRlX2Zyb20iOiAiMjAyNS0xMi0wMVQwOTowMDowMCIsCiAgImRhdGVfdG8iOiAiMjAyNS0xMi0zMVQxODowMDowMCIsCiAgInR5cGUiOiAiV09SS1NIT1AiCn0="
             }
+        },
+        {
+            "name": "limit",
+            "in": "query",
+            "required": False,
+            "description": "Tamanho da página (máx. 100). Quando informado (ou com `cursor`), a resposta é paginada: `{\"data\": [...], \"next_cursor\": \"...\"}`.",
+            "schema": {"type": "integer", "default": 20}
+        },
+        {
+            "name": "cursor",
+            "in": "query",
+            "required": False,
+            "description": "Cursor opaco retornado em `next_cursor` pela página anterior. Deve ser usado com o mesmo filtro.",
+            "schema": {"type": "string"}
         }
     ],
     "responses": {
@@ -500,6 +514,20 @@ list_available_events = {
                 "type": "string",
                 "example": "ewogICJkYXRlX2Zyb20iOiAiMjAyNS0xMi0wMVQwOTowMDowMCIsCiAgImRhdGVfdG8iOiAiMjAyNS0xMi0zMVQxODowMDowMCIsCiAgInR5cGUiOiAiV09SS1NIT1AiCn0="
             }
+        },
+        {
+            "name": "limit",
+            "in": "query",
+            "required": False,
+            "description": "Tamanho da página (máx. 100). Quando informado (ou com `cursor`), a resposta é paginada: `{\"data\": [...], \"next_cursor\": \"...\"}`.",
+            "schema": {"type": "integer", "default": 20}
+        },
+        {
+            "name": "cursor",
+            "in": "query",
+            "required": False,
+            "description": "Cursor opaco retornado em `next_cursor` pela página anterior. Deve ser usado com o mesmo filtro.",
+            "schema": {"type": "string"}
         }
     ],
     "responses": {
@@ -525,6 +553,7 @@ list_available_events = {
                         "speaker": {"type": "string"},
                         "institution_organizer": {"type": "string"},
                         "created_by": {"type": "integer"},
+                        "enrolled_count": {"type": "integer", "description": "Número de inscritos ativos"},
                         "remaining_slots": {"type": "integer", "description": "Vagas restantes (null se sem limite)"},
                         "is_participant": {"type": "boolean", "description": "Indica se o usuário autenticado está inscrito no evento"}
                     }
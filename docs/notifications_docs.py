@@ -5,7 +5,7 @@ Documentação Swagger para as rotas de notificações
 list_notifications = {
     "tags": ["Notificações"],
     "summary": "Listar notificações do usuário",
-    "description": "Retorna todas as notificações do usuário autenticado, com opção de filtrar por status de leitura e data",
+    "description": "Retorna as notificações do usuário autenticado (mais recentes primeiro), com opção de filtrar por status de leitura e data. Com `limit`/`cursor` a resposta é paginada (keyset sobre created_at e id) e a primeira página traz a `watermark`; com `since` retorna apenas as notificações criadas depois dessa marca d'água (modo delta).",
     "security": [{"Bearer": []}],
     "parameters": [
         {
@@ -29,6 +29,27 @@ list_notifications = {
                 "format": "date-time",
                 "example": "2025-01-01T00:00:00"
             }
+        },
+        {
+            "name": "limit",
+            "in": "query",
+            "required": False,
+            "description": "Tamanho da página (máx. 100). Quando informado (ou com `cursor`), a resposta é paginada: `{\"data\": [...], \"next_cursor\": \"...\", \"watermark\": \"...\"}`.",
+            "schema": {"type": "integer", "example": 20}
+        },
+        {
+            "name": "cursor",
+            "in": "query",
+            "required": False,
+            "description": "Cursor opaco retornado em `next_cursor` pela página anterior. Deve ser usado com os mesmos filtros.",
+            "schema": {"type": "string"}
+        },
+        {
+            "name": "since",
+            "in": "query",
+            "required": False,
+            "description": "Marca d'água (`watermark`) retornada pela listagem, por `mark-all-as-read` ou por uma chamada delta anterior. Retorna, da mais antiga para a mais nova, até `limit` notificações criadas depois dela: `{\"data\": [...], \"watermark\": \"...\", \"has_more\": false}`. Ignora `since_date` e `cursor`.",
+            "schema": {"type": "string"}
         }
     ],
     "responses": {
@@ -154,51 +175,23 @@ mark_notification_as_read = {
 mark_all_notifications_as_read = {
     "tags": ["Notificações"],
     "summary": "Marcar todas as notificações como lidas",
-    "description": "Marca todas as notificações não lidas do usuário como lidas e retorna a lista atualizada de notificações",
+    "description": "Marca como lidas as notificações não lidas do usuário até a mais recente no momento da chamada e retorna apenas a quantidade afetada e a nova marca d'água",
     "security": [{"Bearer": []}],
     "responses": {
         200: {
-            "description": "Notificações marcadas como lidas com sucesso. Retorna todas as notificações do usuário",
+            "description": "Notificações marcadas como lidas com sucesso",
             "schema": {
                 "type": "object",
                 "properties": {
-                    "data": {
-                        "type": "array",
-                        "items": {
-                            "type": "object",
-                            "properties": {
-                                "id": {
-                                    "type": "integer",
-                                    "example": 1
-                                },
-                                "user_id": {
-                                    "type": "integer",
-                                    "example": 5
-                                },
-                                "title": {
-                                    "type": "string",
-                                    "example": "Novo Evento Disponível"
-                                },
-                                "message": {
-                                    "type": "string",
-                                    "example": "Um novo evento foi criado: Workshop de Python"
-                                },
-                                "created_at": {
-                                    "type": "string",
-                                    "format": "date-time",
-                                    "example": "2025-11-23T10:30:00"
-                                },
-                                "is_read": {
-                                    "type": "boolean",
-                                    "example": True
-                                },
-                                "link": {
-                                    "type": "string",
-                                    "nullable": True,
-                                    "example": "/events/42"
-                                }
-                            }
-                        }
+                    "updated": {
+                        "type": "integer",
+                        "example": 3,
+                        "description": "Número de notificações marcadas como lidas"
+                    },
+                    "watermark": {
+                        "type": "string",
+                        "example": "eyJpZCI6NDJ9",
+                        "description": "Marca d'água da última notificação coberta; pode ser usada em `since` na listagem"
                     }
                 }
             }
@@ -221,7 +214,7 @@ mark_all_notifications_as_read = {
 count_unread_notifications = {
     "tags": ["Notificações"],
     "summary": "Contar notificações não lidas",
-    "description": "Retorna o número de notificações não lidas do usuário autenticado",
+    "description": "Retorna o número de notificações não lidas do usuário autenticado, mantido em um contador por usuário (leitura O(1))",
     "security": [{"Bearer": []}],
     "responses": {
         200: {
@@ -260,3 +253,93 @@ count_unread_notifications = {
         }
     }
 }
+
+create_stream_token = {
+    "tags": ["Notificações"],
+    "summary": "Token para o stream de notificações",
+    "description": (
+        "Emite um token de curta duração (NOTIFICATION_STREAM_TOKEN_TTL segundos) para "
+        "abrir /notifications/stream pelo EventSource, que envia o token na URL "
+        "(parâmetro `jwt`). O token só é aceito no stream."
+    ),
+    "security": [{"Bearer": []}],
+    "responses": {
+        200: {
+            "description": "Token de stream",
+            "schema": {
+                "type": "object",
+                "properties": {
+                    "token": {"type": "string"},
+                    "expires_in": {"type": "integer", "example": 60}
+                }
+            }
+        },
+        401: {
+            "description": "Não autenticado"
+        }
+    }
+}
+
+stream_notifications = {
+    "tags": ["Notificações"],
+    "summary": "Stream de notificações (Server-Sent Events)",
+    "description": (
+        "Mantém uma conexão text/event-stream que envia os eventos `notification` "
+        "(com `id` = id da notificação) e `unread_count` assim que ocorrem, além de "
+        "comentários de heartbeat. Substitui o polling de /notifications/ e "
+        "/notifications/count-unread. O EventSource do navegador não envia headers, "
+        "por isso o parâmetro `jwt` aceita o token de stream de POST "
+        "/notifications/stream-token (o token de acesso só é aceito no header). O token "
+        "de stream é válido por poucos segundos: peça um novo a cada (re)conexão, "
+        "informando last_event_id para receber as notificações perdidas."
+    ),
+    "security": [{"Bearer": []}],
+    "produces": ["text/event-stream"],
+    "parameters": [
+        {
+            "name": "jwt",
+            "in": "query",
+            "type": "string",
+            "required": False,
+            "description": "Token de stream de POST /notifications/stream-token (alternativa ao header Authorization)"
+        },
+        {
+            "name": "Last-Event-ID",
+            "in": "header",
+            "type": "integer",
+            "required": False,
+            "description": "Id da última notificação recebida (retomada do stream)"
+        },
+        {
+            "name": "last_event_id",
+            "in": "query",
+            "type": "integer",
+            "required": False,
+            "description": "Alternativa ao header Last-Event-ID"
+        }
+    ],
+    "responses": {
+        200: {
+            "description": "Stream de eventos",
+            "examples": {
+                "text/event-stream": "event: unread_count\ndata: {\"unread_count\": 2}\n\n"
+                                     "id: 42\nevent: notification\ndata: {\"id\": 42, \"title\": \"Certificado Gerado\"}\n\n"
+            }
+        },
+        400: {
+            "description": "Last-Event-ID inválido"
+        },
+        401: {
+            "description": "Não autenticado, ou token de acesso na query string"
+        },
+        503: {
+            "description": "Limite de conexões de stream do servidor atingido",
+            "schema": {
+                "type": "object",
+                "properties": {
+                    "error": {"type": "string"}
+                }
+            }
+        }
+    }
+}
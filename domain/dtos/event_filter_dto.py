@@ -2,11 +2,16 @@
 import base64
 from datetime import datetime
 import json
+from sqlalchemy import and_, or_
 from sqlalchemy.orm import Query
-from domain.models import EventType, Event
+from domain.models import EventType, Event, event_search
+from exceptions.business_exceptions import BadRequestException
 from utils.format_utils import format_date, format_event_type
 
 
+ORDERABLE_FIELDS = ['title', 'description', 'date', 'capacity', 'location', 'type', 'speaker', 'institution_organizer']
+
+
 class EventFilterDTO:
     title: str = None
     description: str = None
@@ -18,8 +23,10 @@ class EventFilterDTO:
     institution_organizer: str = None
     created_by: int = None
     q : str = None  # title | description | location | speaker | institution_organizer
-    order_by: str = 'date'
+    order_by: str = 'date'  # ORDERABLE_FIELDS | 'relevance' (apenas com q)
     order_direction: str = 'asc'  # 'asc' | 'desc'
+    # Coluna do rank bm25 da busca montada por build_filters (None sem índice FTS)
+    search_rank = None
 
     @staticmethod
     def from_dict(data: str) -> "EventFilterDTO":
@@ -42,6 +49,10 @@ class EventFilterDTO:
         if 'type' in data:
             event_filter.type = format_event_type(data['type'])
 
+        # Buscas sem ordenação explícita são ordenadas por relevância (bm25)
+        if event_filter.q and 'order_by' not in data:
+            event_filter.order_by = 'relevance'
+
         return event_filter
 
     def build_filters(self, query: Query) -> Query:
@@ -66,21 +77,105 @@ class EventFilterDTO:
                 f"%{self.institution_organizer}%"))
         if self.created_by:
             q = q.filter(Event.created_by == self.created_by)
+        search_rank = None
         if self.q:
-            search = f"%{self.q}%"
-            q = q.filter(
-                (Event.title.ilike(search))
-                | (Event.description.ilike(search))
-                | (Event.location.ilike(search))
-                | (Event.speaker.ilike(search))
-                | (Event.institution_organizer.ilike(search))
-            )
-
-        if self.order_by in ['title', 'description', 'date', 'capacity', 'location', 'type', 'speaker', 'institution_organizer']:
+            match = event_search.build_match_expression(self.q)
+            if match and event_search.fts_available(q.session):
+                search = event_search.search_subquery(match)
+                q = q.join(search, Event.id == search.c.event_id)
+                search_rank = search.c.rank
+            else:
+                search = f"%{self.q}%"
+                q = q.filter(
+                    (Event.title.ilike(search))
+                    | (Event.description.ilike(search))
+                    | (Event.location.ilike(search))
+                    | (Event.speaker.ilike(search))
+                    | (Event.institution_organizer.ilike(search))
+                )
+
+        self.search_rank = search_rank
+        if self.order_by == 'relevance':
+            # Sem índice (termo curto ou banco sem FTS) não há rank: apenas o id
+            if search_rank is not None:
+                q = q.order_by(search_rank.asc(), Event.id.asc())
+            else:
+                q = q.order_by(Event.id.asc())
+        elif self.order_by in ORDERABLE_FIELDS:
             order_column = getattr(Event, self.order_by)
             if self.order_direction == 'asc':
-                q = q.order_by(order_column.asc())
+                q = q.order_by(order_column.asc().nulls_first(), Event.id.asc())
             else:
-                q = q.order_by(order_column.desc())
+                q = q.order_by(order_column.desc().nulls_last(), Event.id.desc())
 
         return q
+
+    def build_cursor(self, event: Event, rank: float = None) -> dict:
+        """
+        Monta o cursor (keyset) que aponta para depois do evento informado. Na
+        ordenação por relevância o valor é o rank bm25 do evento na busca.
+        """
+        value = rank if self.order_by == 'relevance' else getattr(event, self.order_by)
+        if isinstance(value, datetime):
+            value = value.isoformat()
+        elif isinstance(value, EventType):
+            value = value.value
+
+        return {
+            "order_by": self.order_by,
+            "order_direction": self.order_direction,
+            "value": value,
+            "id": event.id,
+        }
+
+    def apply_cursor(self, query: Query, cursor: dict) -> Query:
+        """
+        Filtra a consulta para os registros posteriores ao cursor, seguindo a
+        ordenação (coluna de ordenação + Event.id como desempate).
+        """
+        if cursor.get("order_by") != self.order_by \
+                or cursor.get("order_direction") != self.order_direction:
+            raise BadRequestException(
+                details=[{"cursor": "Cursor não corresponde à ordenação do filtro."}])
+
+        value = cursor.get("value")
+        last_id = cursor.get("id")
+
+        if not isinstance(last_id, int):
+            raise BadRequestException(details=[{"cursor": "Cursor inválido."}])
+
+        if self.order_by == 'relevance':
+            return self._apply_relevance_cursor(query, value, last_id)
+
+        column = getattr(Event, self.order_by)
+
+        if value is not None:
+            if self.order_by == 'date':
+                value = format_date(value)
+            elif self.order_by == 'type':
+                value = format_event_type(value)
+
+        # NULLs vêm primeiro na ordem ascendente e por último na descendente
+        if self.order_direction == 'asc':
+            if value is None:
+                return query.filter(
+                    or_(and_(column.is_(None), Event.id > last_id), column.isnot(None)))
+            return query.filter(
+                or_(column > value, and_(column == value, Event.id > last_id)))
+
+        if value is None:
+            return query.filter(column.is_(None), Event.id < last_id)
+        return query.filter(
+            or_(column < value, and_(column == value, Event.id < last_id), column.is_(None)))
+
+    def _apply_relevance_cursor(self, query: Query, rank, last_id: int) -> Query:
+        """Registros depois do cursor na ordem (rank bm25, Event.id)"""
+        if self.search_rank is None:
+            return query.filter(Event.id > last_id)
+
+        if not isinstance(rank, (int, float)) or isinstance(rank, bool):
+            raise BadRequestException(details=[{"cursor": "Cursor inválido."}])
+
+        return query.filter(or_(
+            self.search_rank > rank,
+            and_(self.search_rank == rank, Event.id > last_id)))
@@ -3,6 +3,14 @@ from .user_type import UserType
 
 from .event_participant import event_participants
 from .event import Event
+from . import event_search
 from .event_type import EventType
 from .certificate import Certificate
 from .notification import Notification
+from .notification_archive import NotificationArchive
+from .email_status import EmailStatus
+from .email_outbox import EmailOutbox
+from .scheduler_lease import SchedulerLease
+from .job_state import JobState
+from .job_run_status import JobRunStatus
+from .scheduled_job import ScheduledJob, JobRun
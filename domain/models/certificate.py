@@ -8,8 +8,9 @@ class Certificate(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     event_id = db.Column(db.Integer, db.ForeignKey('events.id'), nullable=False)
-    generated_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
-    certificate_path = db.Column(db.String(500), nullable=False)
+    generated_at = db.Column(db.DateTime, default=datetime.now, nullable=False)
+    # None até a primeira renderização no modo lazy (CERTIFICATE_RENDER_MODE)
+    certificate_path = db.Column(db.String(500), nullable=True)
     active = db.Column(db.Boolean, default=True, nullable=False)
 
     user = db.relationship('User', backref=db.backref('certificates', lazy=True))
@@ -17,6 +18,9 @@ class Certificate(db.Model):
 
     __table_args__ = (
         db.UniqueConstraint('user_id', 'event_id', name='uq_certificate_user_event'),
+        db.Index('ix_certificates_event_id_active', 'event_id', 'active'),
+        db.Index('ix_certificates_user_id_generated_at_active', 'user_id', 'generated_at',
+                 sqlite_where=db.text('active = 1')),
     )
 
     def to_dict(self):
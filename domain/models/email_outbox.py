@@ -0,0 +1,47 @@
+from datetime import datetime
+from app import db
+from domain.models.email_status import EmailStatus
+
+
+class EmailOutbox(db.Model):
+    """
+    Fila persistente de emails. As rotas e jobs apenas gravam a mensagem aqui;
+    o envio é feito em lote pelo worker (services.email_service.process_outbox).
+    """
+    __tablename__ = 'email_outbox'
+
+    id = db.Column(db.Integer, primary_key=True)
+    recipients = db.Column(db.JSON, nullable=False)
+    subject = db.Column(db.String(255), nullable=False)
+    body = db.Column(db.Text, nullable=False)
+    attachment_path = db.Column(db.String(500), nullable=True)
+    attachment_filename = db.Column(db.String(255), nullable=True)
+    # Certificado anexado: o PDF é resolvido (e renderizado, se preciso) no envio
+    certificate_id = db.Column(db.Integer, db.ForeignKey('certificates.id'), nullable=True)
+    status = db.Column(db.Enum(EmailStatus), default=EmailStatus.PENDING,
+                       server_default=EmailStatus.PENDING.name, nullable=False)
+    attempts = db.Column(db.Integer, default=0, server_default='0', nullable=False)
+    next_attempt_at = db.Column(db.DateTime, default=datetime.now, nullable=False)
+    claimed_at = db.Column(db.DateTime, nullable=True)
+    claim_token = db.Column(db.String(32), nullable=True)
+    last_error = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.now, nullable=False)
+    sent_at = db.Column(db.DateTime, nullable=True)
+
+    __table_args__ = (
+        db.Index('ix_email_outbox_status_next_attempt_at', 'status', 'next_attempt_at'),
+        db.Index('ix_email_outbox_claim_token', 'claim_token'),
+    )
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "recipients": self.recipients,
+            "subject": self.subject,
+            "status": self.status.name if self.status else None,
+            "attempts": self.attempts,
+            "next_attempt_at": self.next_attempt_at.isoformat() if self.next_attempt_at else None,
+            "last_error": self.last_error,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "sent_at": self.sent_at.isoformat() if self.sent_at else None
+        }
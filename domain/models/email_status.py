@@ -0,0 +1,8 @@
+import enum
+
+
+class EmailStatus(enum.Enum):
+    PENDING = "PENDING"
+    SENDING = "SENDING"
+    SENT = "SENT"
+    DEAD = "DEAD"
@@ -14,6 +14,8 @@ class Event(db.Model):
     date = db.Column(db.DateTime, nullable=False)
     location = db.Column(db.String(200), nullable=False)
     capacity = db.Column(db.Integer, nullable=True)
+    # Contador desnormalizado de inscrições ativas (mantido por enroll_user/cancel_enrollment)
+    enrolled_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
     type = db.Column(SqlEnum(EventType), nullable=False)
     speaker = db.Column(db.String(100), nullable=True)
     institution_organizer = db.Column(db.String(200), nullable=False)
@@ -30,6 +32,16 @@ class Event(db.Model):
     )
 
     active = db.Column(db.Boolean(), default=True, nullable=False)
+    # Preenchido quando o job de certificados conclui o evento (process_completed_events)
+    certificates_processed_at = db.Column(db.DateTime, nullable=True)
+
+    __table_args__ = (
+        db.Index('ix_events_date_active', 'date', sqlite_where=db.text('active = 1')),
+        # Eventos ainda pendentes para o job de certificados
+        db.Index('ix_events_date_certificates_pending', 'date',
+                 sqlite_where=db.text('active = 1 AND certificates_processed_at IS NULL')),
+        db.Index('ix_events_created_by_active', 'created_by', 'active'),
+    )
 
     @staticmethod
     def from_dict(data: dict) -> "Event":
@@ -10,5 +10,7 @@ event_participants = db.Table(
     db.Column('event_id', db.Integer, db.ForeignKey('events.id'), nullable=False),
     db.Column('registered_at', db.DateTime, default=datetime.utcnow, nullable=False),
     db.Column('active', db.Boolean(), default=True, nullable=False),
-    db.UniqueConstraint('user_id', 'event_id', name='uq_user_event')
+    db.UniqueConstraint('user_id', 'event_id', name='uq_user_event'),
+    db.Index('ix_event_participants_event_id_active', 'event_id', 'active'),
+    db.Index('ix_event_participants_user_id_active', 'user_id', 'active')
 )
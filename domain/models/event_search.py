@@ -0,0 +1,98 @@
+"""
+Índice de busca textual (SQLite FTS5) dos eventos.
+
+A tabela virtual `events_fts` é uma tabela de conteúdo externo sobre `events`
+(não duplica o texto) e é mantida sincronizada por triggers. O tokenizer
+`trigram` preserva a semântica de substring do antigo `ILIKE '%q%'`, mas
+consultas com menos de 3 caracteres não podem usar o índice.
+"""
+import weakref
+from sqlalchemy import DDL, Float, Integer, event, text
+
+from domain.models.event import Event
+
+
+FTS_TABLE = "events_fts"
+FTS_COLUMNS = ["title", "description", "location", "speaker", "institution_organizer"]
+FTS_MIN_TERM_LENGTH = 3
+
+# Pesos do bm25 na mesma ordem de FTS_COLUMNS (título pesa mais)
+BM25_WEIGHTS = [10.0, 1.0, 2.0, 2.0, 1.0]
+
+_columns = ", ".join(FTS_COLUMNS)
+_new_values = ", ".join(f"new.{c}" for c in FTS_COLUMNS)
+_old_values = ", ".join(f"old.{c}" for c in FTS_COLUMNS)
+
+CREATE_STATEMENTS = [
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    f"{_columns}, content='events', content_rowid='id', tokenize='trigram')",
+    f"CREATE TRIGGER IF NOT EXISTS events_fts_ai AFTER INSERT ON events BEGIN "
+    f"INSERT INTO {FTS_TABLE}(rowid, {_columns}) VALUES (new.id, {_new_values}); END",
+    f"CREATE TRIGGER IF NOT EXISTS events_fts_ad AFTER DELETE ON events BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {_columns}) "
+    f"VALUES ('delete', old.id, {_old_values}); END",
+    f"CREATE TRIGGER IF NOT EXISTS events_fts_au AFTER UPDATE OF {_columns} ON events BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {_columns}) "
+    f"VALUES ('delete', old.id, {_old_values}); "
+    f"INSERT INTO {FTS_TABLE}(rowid, {_columns}) VALUES (new.id, {_new_values}); END",
+]
+
+DROP_STATEMENTS = [
+    "DROP TRIGGER IF EXISTS events_fts_au",
+    "DROP TRIGGER IF EXISTS events_fts_ad",
+    "DROP TRIGGER IF EXISTS events_fts_ai",
+    f"DROP TABLE IF EXISTS {FTS_TABLE}",
+]
+
+REBUILD_STATEMENT = f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"
+
+
+# Garante o índice também quando o schema é criado via db.create_all() (testes)
+for _statement in CREATE_STATEMENTS:
+    event.listen(Event.__table__, "after_create",
+                 DDL(_statement).execute_if(dialect="sqlite"))
+
+for _statement in DROP_STATEMENTS:
+    event.listen(Event.__table__, "before_drop",
+                 DDL(_statement).execute_if(dialect="sqlite"))
+
+
+_availability = weakref.WeakKeyDictionary()
+
+
+def fts_available(session) -> bool:
+    """Indica se o banco da sessão possui o índice FTS (resultado em cache por engine)"""
+    engine = session.get_bind()
+    if engine.dialect.name != "sqlite":
+        return False
+
+    if engine not in _availability:
+        with engine.connect() as conn:
+            _availability[engine] = conn.execute(
+                text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+                {"name": FTS_TABLE}
+            ).first() is not None
+
+    return _availability[engine]
+
+
+def build_match_expression(term: str) -> str | None:
+    """
+    Converte o termo digitado em uma frase FTS5 (busca por substring).
+    Retorna None quando o termo é curto demais para o tokenizer trigram.
+    """
+    term = (term or "").strip()
+    if len(term) < FTS_MIN_TERM_LENGTH:
+        return None
+    return '"' + term.replace('"', '""') + '"'
+
+
+def search_subquery(match_expression: str):
+    """Subquery com (event_id, rank) dos eventos que casam com a busca, rank via bm25"""
+    weights = ", ".join(str(w) for w in BM25_WEIGHTS)
+    return text(
+        f"SELECT rowid AS event_id, bm25({FTS_TABLE}, {weights}) AS rank "
+        f"FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH :match"
+    ).bindparams(match=match_expression).columns(
+        event_id=Integer, rank=Float
+    ).subquery("event_search")
@@ -0,0 +1,7 @@
+import enum
+
+
+class JobRunStatus(enum.Enum):
+    SUCCESS = "SUCCESS"
+    FAILED = "FAILED"
+    SKIPPED = "SKIPPED"
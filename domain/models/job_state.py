@@ -0,0 +1,14 @@
+from datetime import datetime
+from app import db
+
+
+class JobState(db.Model):
+    """
+    Estado persistido de um job em background, para que ele continue de onde
+    parou após reinícios (ex.: marca d'água do processamento de certificados).
+    """
+    __tablename__ = 'job_states'
+
+    name = db.Column(db.String(100), primary_key=True)
+    watermark = db.Column(db.DateTime, nullable=True)
+    updated_at = db.Column(db.DateTime, default=datetime.now, onupdate=datetime.now, nullable=False)
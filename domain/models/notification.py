@@ -15,6 +15,15 @@ class Notification(db.Model):
 
     user = db.relationship('User', backref=db.backref('notifications', lazy=True))
 
+    __table_args__ = (
+        db.Index('ix_notifications_user_id_is_read_created_at',
+                 'user_id', 'is_read', 'created_at'),
+        # Paginação keyset (created_at, id) sem filtro de leitura; o id (rowid) já vem no índice
+        db.Index('ix_notifications_user_id_created_at', 'user_id', 'created_at'),
+        # Política de retenção: notificações lidas/não lidas mais antigas que o corte
+        db.Index('ix_notifications_is_read_created_at', 'is_read', 'created_at'),
+    )
+
     def to_dict(self):
         return {
             "id": self.id,
@@ -0,0 +1,35 @@
+from datetime import datetime
+from app import db
+
+
+class NotificationArchive(db.Model):
+    """
+    Arquivo das notificações antigas não lidas, movidas pela política de
+    retenção (notification_service.apply_retention_policy). Mantém o id
+    original e apenas as colunas de conteúdo, sem os índices dos caminhos
+    quentes da tabela notifications.
+    """
+    __tablename__ = 'notifications_archive'
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    title = db.Column(db.String(100), nullable=False)
+    message = db.Column(db.String(500), nullable=False)
+    link = db.Column(db.String(200), nullable=True)
+    created_at = db.Column(db.DateTime, nullable=False)
+    archived_at = db.Column(db.DateTime, default=datetime.now, nullable=False)
+
+    __table_args__ = (
+        db.Index('ix_notifications_archive_user_id_created_at', 'user_id', 'created_at'),
+    )
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "user_id": self.user_id,
+            "title": self.title,
+            "message": self.message,
+            "link": self.link,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "archived_at": self.archived_at.isoformat() if self.archived_at else None
+        }
@@ -0,0 +1,71 @@
+from datetime import datetime
+from app import db
+from domain.models.job_run_status import JobRunStatus
+
+
+class ScheduledJob(db.Model):
+    """
+    Job periódico do scheduler persistente (utils.job_scheduler). Guarda o
+    gatilho (intervalo e/ou horário diário), a próxima execução e a reserva
+    da execução em andamento, para que reinícios não percam o agendamento e
+    dois processos nunca executem o mesmo job ao mesmo tempo.
+    """
+    __tablename__ = 'scheduled_jobs'
+
+    name = db.Column(db.String(100), primary_key=True)
+    interval_seconds = db.Column(db.Integer, nullable=True)
+    daily_at = db.Column(db.String(5), nullable=True)  # "HH:MM"
+    catch_up = db.Column(db.String(20), nullable=False, default="run_once")
+    next_run_at = db.Column(db.DateTime, nullable=False)
+    running_since = db.Column(db.DateTime, nullable=True)
+    running_owner = db.Column(db.String(200), nullable=True)
+    last_run_at = db.Column(db.DateTime, nullable=True)
+    last_status = db.Column(db.Enum(JobRunStatus), nullable=True)
+    last_duration_seconds = db.Column(db.Float, nullable=True)
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "interval_seconds": self.interval_seconds,
+            "daily_at": self.daily_at,
+            "catch_up": self.catch_up,
+            "next_run_at": self.next_run_at.isoformat() if self.next_run_at else None,
+            "running_since": self.running_since.isoformat() if self.running_since else None,
+            "last_run_at": self.last_run_at.isoformat() if self.last_run_at else None,
+            "last_status": self.last_status.name if self.last_status else None,
+            "last_duration_seconds": self.last_duration_seconds
+        }
+
+
+class JobRun(db.Model):
+    """Histórico de execuções (duração e resultado) dos jobs agendados"""
+    __tablename__ = 'job_runs'
+
+    id = db.Column(db.Integer, primary_key=True)
+    job_name = db.Column(db.String(100), nullable=False)
+    scheduled_for = db.Column(db.DateTime, nullable=True)
+    started_at = db.Column(db.DateTime, default=datetime.now, nullable=False)
+    finished_at = db.Column(db.DateTime, nullable=True)
+    duration_seconds = db.Column(db.Float, nullable=True)
+    status = db.Column(db.Enum(JobRunStatus), nullable=False)
+    owner = db.Column(db.String(200), nullable=True)
+    result = db.Column(db.JSON, nullable=True)
+    error = db.Column(db.Text, nullable=True)
+
+    __table_args__ = (
+        db.Index('ix_job_runs_job_name_id', 'job_name', 'id'),
+    )
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "job_name": self.job_name,
+            "scheduled_for": self.scheduled_for.isoformat() if self.scheduled_for else None,
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+            "duration_seconds": self.duration_seconds,
+            "status": self.status.name if self.status else None,
+            "owner": self.owner,
+            "result": self.result,
+            "error": self.error
+        }
@@ -0,0 +1,25 @@
+from app import db
+
+
+class SchedulerLease(db.Model):
+    """
+    Lease (trava com expiração) que elege o processo líder de um job agendado.
+    O dono renova expires_at a cada heartbeat; se o processo morrer, outro
+    assume o lease assim que ele expirar (services.scheduler_lease_service).
+    """
+    __tablename__ = 'scheduler_leases'
+
+    name = db.Column(db.String(100), primary_key=True)
+    owner = db.Column(db.String(200), nullable=False)
+    acquired_at = db.Column(db.DateTime, nullable=False)
+    heartbeat_at = db.Column(db.DateTime, nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False)
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "owner": self.owner,
+            "acquired_at": self.acquired_at.isoformat() if self.acquired_at else None,
+            "heartbeat_at": self.heartbeat_at.isoformat() if self.heartbeat_at else None,
+            "expires_at": self.expires_at.isoformat() if self.expires_at else None
+        }
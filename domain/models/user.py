@@ -1,9 +1,13 @@
+from datetime import timedelta
 from app import db
 from werkzeug.security import generate_password_hash, check_password_hash
 from flask_jwt_extended import create_access_token
 
 from domain.models.user_type import UserType
 
+# Claim "scope" do token curto do stream SSE, aceito apenas em /notifications/stream
+STREAM_TOKEN_SCOPE = "notifications_stream"
+
 
 class User(db.Model):
     __tablename__ = "users"
@@ -18,6 +22,10 @@ class User(db.Model):
     password_reset_token = db.Column(db.String(6), unique=True, nullable=True)
     password_reset_expires_at = db.Column(db.DateTime, nullable=True)
     active = db.Column(db.Boolean(), default=True, nullable=False)
+    # Incrementado para revogar os tokens já emitidos (claim "ver")
+    token_version = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    # Contador desnormalizado de notificações não lidas (notification_service)
+    unread_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
 
     @staticmethod
     def from_dict(data: dict) -> "User":
@@ -46,7 +54,25 @@ class User(db.Model):
         return check_password_hash(self.password, password)
 
     def generate_auth_token(self):
-        return create_access_token(identity=str(self.id), expires_delta=False)
+        return create_access_token(
+            identity=str(self.id),
+            additional_claims={
+                "role": self.type.name if self.type else None,
+                "ver": self.token_version or 0,
+            },
+            expires_delta=False
+        )
+
+    def generate_stream_token(self, expires_in: int):
+        """Token de curta duração para o stream de notificações (vai na URL do EventSource)"""
+        return create_access_token(
+            identity=str(self.id),
+            additional_claims={
+                "ver": self.token_version or 0,
+                "scope": STREAM_TOKEN_SCOPE,
+            },
+            expires_delta=timedelta(seconds=expires_in)
+        )
 
     def is_organizer(self):
         return self.type == UserType.ORGANIZER
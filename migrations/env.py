@@ -90,9 +90,18 @@ def run_migrations_online():
                 directives[:] = []
                 logger.info('No changes in schema detected.')
 
+    # as tabelas do índice FTS5 (events_fts e suas shadow tables) são
+    # criadas manualmente nas migrations e não existem no metadata
+    def include_object(object, name, type_, reflected, compare_to):
+        if type_ == "table" and reflected and name.startswith("events_fts"):
+            return False
+        return True
+
     conf_args = current_app.extensions['migrate'].configure_args
     if conf_args.get("process_revision_directives") is None:
         conf_args["process_revision_directives"] = process_revision_directives
+    if conf_args.get("include_object") is None:
+        conf_args["include_object"] = include_object
 
     connectable = get_engine()
 
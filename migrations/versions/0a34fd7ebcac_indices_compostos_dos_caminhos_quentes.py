@@ -0,0 +1,53 @@
+"""índices compostos dos caminhos quentes
+
+Revision ID: 0a34fd7ebcac
+Revises: 33d8b4465277
+Create Date: 2026-10-17 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0a34fd7ebcac'
+down_revision = '33d8b4465277'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('events', schema=None) as batch_op:
+        batch_op.create_index('ix_events_date_active', ['date'], unique=False,
+                              sqlite_where=sa.text('active = 1'))
+        batch_op.create_index('ix_events_created_by_active', ['created_by', 'active'], unique=False)
+
+    with op.batch_alter_table('event_participants', schema=None) as batch_op:
+        batch_op.create_index('ix_event_participants_event_id_active', ['event_id', 'active'], unique=False)
+        batch_op.create_index('ix_event_participants_user_id_active', ['user_id', 'active'], unique=False)
+
+    with op.batch_alter_table('certificates', schema=None) as batch_op:
+        batch_op.create_index('ix_certificates_event_id_active', ['event_id', 'active'], unique=False)
+        batch_op.create_index('ix_certificates_user_id_generated_at_active', ['user_id', 'generated_at'],
+                              unique=False, sqlite_where=sa.text('active = 1'))
+
+    with op.batch_alter_table('notifications', schema=None) as batch_op:
+        batch_op.create_index('ix_notifications_user_id_is_read_created_at',
+                              ['user_id', 'is_read', 'created_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('notifications', schema=None) as batch_op:
+        batch_op.drop_index('ix_notifications_user_id_is_read_created_at')
+
+    with op.batch_alter_table('certificates', schema=None) as batch_op:
+        batch_op.drop_index('ix_certificates_user_id_generated_at_active')
+        batch_op.drop_index('ix_certificates_event_id_active')
+
+    with op.batch_alter_table('event_participants', schema=None) as batch_op:
+        batch_op.drop_index('ix_event_participants_user_id_active')
+        batch_op.drop_index('ix_event_participants_event_id_active')
+
+    with op.batch_alter_table('events', schema=None) as batch_op:
+        batch_op.drop_index('ix_events_created_by_active')
+        batch_op.drop_index('ix_events_date_active')
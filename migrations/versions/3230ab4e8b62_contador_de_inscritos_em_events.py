@@ -0,0 +1,35 @@
+"""contador de inscritos em events
+
+Revision ID: 3230ab4e8b62
+Revises: 0a34fd7ebcac
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3230ab4e8b62'
+down_revision = '0a34fd7ebcac'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # ADD COLUMN nativo: a tabela não é recriada e os triggers FTS são preservados
+    op.add_column('events', sa.Column('enrolled_count', sa.Integer(),
+                                      server_default='0', nullable=False))
+
+    # Backfill a partir das inscrições ativas
+    op.execute(
+        "UPDATE events SET enrolled_count = ("
+        "SELECT COUNT(*) FROM event_participants "
+        "WHERE event_participants.event_id = events.id "
+        "AND event_participants.active = 1)"
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('events', schema=None) as batch_op:
+        batch_op.drop_column('enrolled_count')
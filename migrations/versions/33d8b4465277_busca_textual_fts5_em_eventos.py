@@ -0,0 +1,58 @@
+"""busca textual (FTS5) em eventos
+
+Revision ID: 33d8b4465277
+Revises: 4116101cd417
+Create Date: 2026-10-17 10:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '33d8b4465277'
+down_revision = '4116101cd417'
+branch_labels = None
+depends_on = None
+
+
+COLUMNS = "title, description, location, speaker, institution_organizer"
+NEW_VALUES = "new.title, new.description, new.location, new.speaker, new.institution_organizer"
+OLD_VALUES = "old.title, old.description, old.location, old.speaker, old.institution_organizer"
+
+
+def upgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+
+    op.execute(
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS events_fts USING fts5("
+        f"{COLUMNS}, content='events', content_rowid='id', tokenize='trigram')"
+    )
+    op.execute(
+        f"CREATE TRIGGER IF NOT EXISTS events_fts_ai AFTER INSERT ON events BEGIN "
+        f"INSERT INTO events_fts(rowid, {COLUMNS}) VALUES (new.id, {NEW_VALUES}); END"
+    )
+    op.execute(
+        f"CREATE TRIGGER IF NOT EXISTS events_fts_ad AFTER DELETE ON events BEGIN "
+        f"INSERT INTO events_fts(events_fts, rowid, {COLUMNS}) "
+        f"VALUES ('delete', old.id, {OLD_VALUES}); END"
+    )
+    op.execute(
+        f"CREATE TRIGGER IF NOT EXISTS events_fts_au AFTER UPDATE OF {COLUMNS} ON events BEGIN "
+        f"INSERT INTO events_fts(events_fts, rowid, {COLUMNS}) "
+        f"VALUES ('delete', old.id, {OLD_VALUES}); "
+        f"INSERT INTO events_fts(rowid, {COLUMNS}) VALUES (new.id, {NEW_VALUES}); END"
+    )
+
+    # Backfill dos eventos existentes
+    op.execute("INSERT INTO events_fts(events_fts) VALUES ('rebuild')")
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+
+    op.execute("DROP TRIGGER IF EXISTS events_fts_au")
+    op.execute("DROP TRIGGER IF EXISTS events_fts_ad")
+    op.execute("DROP TRIGGER IF EXISTS events_fts_ai")
+    op.execute("DROP TABLE IF EXISTS events_fts")
@@ -0,0 +1,34 @@
+"""contador de notificacoes nao lidas em users
+
+Revision ID: ed96712f9421
+Revises: 3764c62f3f67
+Create Date: 2026-10-17 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'ed96712f9421'
+down_revision = '3764c62f3f67'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('users', sa.Column('unread_count', sa.Integer(),
+                                     server_default='0', nullable=False))
+
+    # Backfill a partir das notificações não lidas
+    op.execute(
+        "UPDATE users SET unread_count = ("
+        "SELECT COUNT(*) FROM notifications "
+        "WHERE notifications.user_id = users.id "
+        "AND notifications.is_read = 0)"
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_column('unread_count')
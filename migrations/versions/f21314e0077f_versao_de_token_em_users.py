@@ -0,0 +1,26 @@
+"""versão de token em users
+
+Revision ID: f21314e0077f
+Revises: 3230ab4e8b62
+Create Date: 2026-10-17 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f21314e0077f'
+down_revision = '3230ab4e8b62'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('users', sa.Column('token_version', sa.Integer(),
+                                     server_default='0', nullable=False))
+
+
+def downgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_column('token_version')
@@ -1,10 +1,17 @@
-from flask import Blueprint, request, current_app, send_file
+import hashlib
+import os
+import string
+import unicodedata
+from urllib.parse import quote
+from flask import Blueprint, Response, request, current_app
 from flask_jwt_extended import jwt_required, current_user
 from flasgger import swag_from
-import os
+from werkzeug.datastructures import ContentRange
+from werkzeug.http import is_resource_modified
 
 import services.certificate_service as service
 import services.email_service as email_service
+from services.certificate_storage import get_storage
 import docs.certificates_docs as swagger
 from exceptions import *
 from utils.response import *
@@ -49,23 +56,87 @@ def download_certificate(certificate_id):
         certificate = service.CertificateService.get_certificate_by_id(
             certificate_id, current_user.id)
 
-        if not os.path.exists(certificate.certificate_path):
-            raise NotFoundException("Arquivo do certificado não encontrado")
+        # Renderiza no primeiro download (modo lazy) ou se o arquivo sumiu
+        key = service.CertificateService.ensure_certificate_file(certificate)
 
         # Nome do arquivo para download
         filename = f"certificado_{certificate.event.title.replace(' ', '_')}_{certificate.user.name.replace(' ', '_')}.pdf"
 
-        return send_file(
-            certificate.certificate_path,
-            as_attachment=True,
-            download_name=filename,
-            mimetype='application/pdf'
-        )
+        return _stream_certificate(key, filename)
     except Exception as e:
         print(e)
         raise
 
 
+def _certificate_etag(key: str, length: int) -> str:
+    """
+    ETag do PDF: no modo lazy a chave já é o hash do conteúdo; as demais
+    chaves são únicas por renderização e nunca regravadas com outro conteúdo.
+    """
+    stem = os.path.splitext(os.path.basename(key))[0]
+    if len(stem) == 64 and all(c in string.hexdigits for c in stem):
+        return stem
+    return hashlib.sha256(f"{key}:{length}".encode("utf-8")).hexdigest()
+
+
+def _range_is_unsatisfiable(byte_range, length: int) -> bool:
+    """Um único intervalo de bytes que começa depois do fim do arquivo"""
+    return (byte_range.units == "bytes" and len(byte_range.ranges) == 1
+            and byte_range.ranges[0][0] >= length)
+
+
+def _stream_certificate(key: str, filename: str) -> Response:
+    """
+    Transmite o PDF do armazenamento em blocos, sem carregá-lo em memória.
+    Atende um único intervalo do cabeçalho Range com 206 (416 se ele começa
+    depois do fim do arquivo); vários intervalos, ou um If-Range que não
+    confere com o ETag, recebem o arquivo inteiro. If-None-Match responde 304.
+    """
+    storage = get_storage()
+    try:
+        length = storage.size(key)
+    except FileNotFoundError:
+        raise NotFoundException("Arquivo do certificado não encontrado")
+
+    etag = _certificate_etag(key, length)
+    if not is_resource_modified(request.environ, etag=etag):
+        response = Response(status=304)
+        response.set_etag(etag)
+        return response
+
+    start, stop, status = 0, length, 200
+    # If-Range com data não confere: não há Last-Modified, apenas o ETag
+    if_range = request.if_range
+    if request.range is not None and (if_range.etag, if_range.date) in ((None, None), (etag, None)):
+        byte_range = request.range.range_for_length(length)
+        if byte_range is not None:
+            (start, stop), status = byte_range, 206
+        elif _range_is_unsatisfiable(request.range, length):
+            response = Response(status=416)
+            response.content_range = ContentRange("bytes", None, None, length)
+            return response
+
+    try:
+        chunks = storage.iter_range(key, start, stop)
+    except FileNotFoundError:
+        raise NotFoundException("Arquivo do certificado não encontrado")
+
+    response = Response(chunks, status=status, mimetype="application/pdf", direct_passthrough=True)
+    response.content_length = stop - start
+    response.accept_ranges = "bytes"
+    response.set_etag(etag)
+    if status == 206:
+        response.content_range = ContentRange("bytes", start, stop, length)
+
+    # Como o send_file: nome ASCII e, se preciso, o original em filename*
+    simple = unicodedata.normalize("NFKD", filename).encode("ascii", "ignore").decode("ascii")
+    disposition = {"filename": simple}
+    if simple != filename:
+        disposition["filename*"] = f"UTF-8''{quote(filename, safe='!#$&+^`|~')}"
+    response.headers.set("Content-Disposition", "attachment", **disposition)
+    return response
+
+
 @certificate_bp.route("/<int:certificate_id>/send-email", methods=["POST"])
 @swag_from(swagger.send_certificate_email)
 @jwt_required()
@@ -75,7 +146,7 @@ def send_certificate_email(certificate_id):
         certificate = service.CertificateService.get_certificate_by_id(
             certificate_id, current_user.id)
         email_service.send_certificate_by_email(certificate, current_user)
-        return response_resource({"message": "Certificado enviado por email com sucesso"})
+        return response_resource({"message": "Envio do certificado por email agendado com sucesso"})
     except Exception as e:
         print(e)
         raise
@@ -1,11 +1,12 @@
 from flask import Blueprint, request
 from flask_jwt_extended import jwt_required, current_user
 from flasgger import swag_from
-from auth.decorators import require_organizer_grant
+from auth.decorators import require_organizer_claim
 import services.event_service as service
 import docs.events_docs as swagger
 from exceptions import *
 from utils.response import *
+from utils.pagination import parse_limit
 from domain import Event, EventFilterDTO
 
 
@@ -14,12 +15,19 @@ event_bp = Blueprint("event_bp", __name__, url_prefix="/events")
 
 @event_bp.route("/", methods=["GET"])
 @swag_from(swagger.list_events)
-@jwt_required()
-@require_organizer_grant()
+@require_organizer_claim()
 def list_events():
     try:
         filter_data = request.args.get('filter')
         filter = EventFilterDTO.from_dict(filter_data) if filter_data else None
+
+        limit = request.args.get('limit')
+        cursor = request.args.get('cursor')
+        if limit or cursor:
+            events, next_cursor = service.list_events_page(
+                current_user, filter, parse_limit(limit), cursor)
+            return response_page([event.to_dict() for event in events], next_cursor)
+
         events = service.list_events(current_user, filter)
         return response_resource([event.to_dict() for event in events])
     except Exception as e:
@@ -29,8 +37,7 @@ def list_events():
 
 @event_bp.route("/<int:event_id>", methods=["GET"])
 @swag_from(swagger.get_event)
-@jwt_required()
-@require_organizer_grant()
+@require_organizer_claim()
 def get_event(event_id):
     try:
         event = service.get_by_id(event_id)
@@ -42,8 +49,7 @@ def get_event(event_id):
 
 @event_bp.route("/", methods=["POST"])
 @swag_from(swagger.create_event)
-@jwt_required()
-@require_organizer_grant()
+@require_organizer_claim()
 def create_event():
     try:
         data = request.get_json(silent=True)
@@ -62,8 +68,7 @@ def create_event():
 
 @event_bp.route("/<int:event_id>", methods=["PUT"])
 @swag_from(swagger.update_event)
-@jwt_required()
-@require_organizer_grant()
+@require_organizer_claim()
 def update_event(event_id):
     try:
         data = request.get_json(silent=True)
@@ -80,8 +85,7 @@ def update_event(event_id):
 
 @event_bp.route("/<int:event_id>", methods=["DELETE"])
 @swag_from(swagger.delete_event)
-@jwt_required()
-@require_organizer_grant()
+@require_organizer_claim()
 def delete_event(event_id):
     try:
         service.delete(event_id, current_user.id)
@@ -99,6 +103,14 @@ def list_available_events():
     try:
         filter_data = request.args.get('filter')
         filter = EventFilterDTO.from_dict(filter_data) if filter_data else None
+
+        limit = request.args.get('limit')
+        cursor = request.args.get('cursor')
+        if limit or cursor:
+            events, next_cursor = service.list_available_events_page(
+                filter, parse_limit(limit), cursor)
+            return response_page(events, next_cursor)
+
         events = service.list_available_events(filter)
         return response_resource(events)
     except Exception as e:
@@ -160,8 +172,7 @@ def list_my_enrollments():
 
 @event_bp.route("/<int:event_id>/participants", methods=["GET"])
 @swag_from(swagger.list_event_participants)
-@jwt_required()
-@require_organizer_grant()
+@require_organizer_claim()
 def list_participants(event_id):
     """Listar participantes do evento"""
     try:
@@ -1,9 +1,11 @@
 from datetime import datetime
-from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required
+from flask import Blueprint, Response, current_app, request, jsonify, stream_with_context
+from flask_jwt_extended import current_user, jwt_required
 from flasgger import swag_from
+from auth.decorators import require_stream_token
 import services.notification_service as notification_service
-from utils.response import response_resource
+from utils.pagination import parse_limit
+from utils.response import response_page, response_resource
 import docs.notifications_docs as notification_docs
 
 notification_bp = Blueprint('notification', __name__, url_prefix='/notifications')
@@ -19,6 +21,27 @@ def list_notifications():
         since_date = request.args.get('since_date')
         since_date = datetime.fromisoformat(since_date) if since_date else None
 
+        limit = request.args.get('limit')
+        cursor = request.args.get('cursor')
+        since = request.args.get('since')
+
+        if since:
+            # Modo delta: apenas o que chegou depois da marca d'água
+            notifications, watermark, has_more = notification_service.get_notifications_since(
+                since, parse_limit(limit), unread=unread)
+            return response_resource({
+                "data": [n.to_dict() for n in notifications],
+                "watermark": watermark,
+                "has_more": has_more
+            })
+
+        if limit or cursor:
+            # Marca d'água lida antes da página: no pior caso o delta repete uma notificação
+            extra = {} if cursor else {"watermark": notification_service.get_notifications_watermark()}
+            notifications, next_cursor = notification_service.get_user_notifications_page(
+                parse_limit(limit), cursor, unread=unread, since_date=since_date)
+            return response_page([n.to_dict() for n in notifications], next_cursor, **extra)
+
         notifications = notification_service.get_user_notifications(
             unread=unread,
             since_date=since_date
@@ -49,9 +72,8 @@ def mark_notification_as_read(notification_id):
 def mark_all_as_read():
     """Marca todas as notificações do usuário como lidas"""
     try:
-        notification_service.mark_all_notifications_as_read()
-        notifications = notification_service.get_user_notifications()
-        return response_resource([n.to_dict() for n in notifications])
+        result = notification_service.mark_all_notifications_as_read()
+        return response_resource(result)
     except Exception as e:
         print(f"Erro ao marcar todas as notificações como lidas: {e}")
         raise e
@@ -68,3 +90,34 @@ def count_unread():
     except Exception as e:
         print(f"Erro ao contar notificações não lidas: {e}")
         raise e
+
+
+@notification_bp.route('/stream-token', methods=['POST'])
+@jwt_required()
+@swag_from(notification_docs.create_stream_token)
+def create_stream_token():
+    """Emite o token curto que o EventSource envia na query string do stream"""
+    expires_in = current_app.config["NOTIFICATION_STREAM_TOKEN_TTL"]
+    return response_resource({
+        "token": current_user.generate_stream_token(expires_in),
+        "expires_in": expires_in
+    })
+
+
+@notification_bp.route('/stream', methods=['GET'])
+@require_stream_token()
+@swag_from(notification_docs.stream_notifications)
+def stream():
+    """Stream SSE das notificações e do contador de não lidas do usuário"""
+    last_event_id = notification_service.parse_last_event_id(
+        request.headers.get('Last-Event-ID') or request.args.get('last_event_id'))
+
+    subscription = notification_service.subscribe_notifications(current_user.id)
+    if subscription is None:
+        return jsonify({"error": "Limite de conexões de notificações atingido. Tente novamente."}), 503
+
+    return Response(
+        stream_with_context(notification_service.stream_notifications(subscription, last_event_id)),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
@@ -0,0 +1,391 @@
+"""
+Renderização dos PDFs de certificado.
+
+As funções deste módulo recebem apenas dados simples (dicts com str, int e
+datetime), nunca instâncias ORM nem o contexto da aplicação, para que possam
+ser executadas em processos de um ProcessPoolExecutor.
+"""
+import hashlib
+import io
+import json
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.units import cm
+from reportlab.lib.colors import black, darkblue
+from reportlab.pdfgen.canvas import Canvas
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Frame, Flowable
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.enums import TA_CENTER, TA_JUSTIFY
+
+
+def certificate_data(user, event) -> dict:
+    """Extrai do usuário e do evento os dados necessários para o certificado"""
+    return {
+        "user_id": user.id,
+        "event_id": event.id,
+        "participant_name": getattr(user, 'name', None) or 'Nome não disponível',
+        "event_title": event.title,
+        "event_date": event.date,
+        "event_location": event.location,
+        "event_speaker": event.speaker,
+        "institution_organizer": event.institution_organizer,
+    }
+
+
+# Moldura do SimpleDocTemplate original (A4, margens de 2 cm nas laterais e 3 cm em cima e embaixo)
+PAGE_SIZE = A4
+_FRAME = (2 * cm, 3 * cm, A4[0] - 4 * cm, A4[1] - 6 * cm)
+
+# Dados que variam por participante; todo o resto é igual dentro do evento
+_PARTICIPANT_FIELDS = ("user_id", "participant_name")
+
+
+@lru_cache(maxsize=1)
+def _styles() -> dict[str, ParagraphStyle]:
+    """Estilos do certificado, criados uma vez por processo"""
+    styles = getSampleStyleSheet()
+
+    return {
+        "title": ParagraphStyle(
+            'CustomTitle',
+            parent=styles['Title'],
+            fontSize=24,
+            spaceAfter=30,
+            alignment=TA_CENTER,
+            textColor=darkblue,
+            fontName='Helvetica-Bold'
+        ),
+        "subtitle": ParagraphStyle(
+            'CustomSubtitle',
+            parent=styles['Normal'],
+            fontSize=18,
+            spaceAfter=20,
+            alignment=TA_CENTER,
+            textColor=black,
+            fontName='Helvetica-Bold'
+        ),
+        "body": ParagraphStyle(
+            'CustomBody',
+            parent=styles['Normal'],
+            fontSize=14,
+            spaceAfter=15,
+            alignment=TA_JUSTIFY,
+            textColor=black,
+            fontName='Helvetica'
+        ),
+        "center": ParagraphStyle(
+            'CustomCenter',
+            parent=styles['Normal'],
+            fontSize=12,
+            spaceAfter=10,
+            alignment=TA_CENTER,
+            textColor=black,
+            fontName='Helvetica'
+        ),
+    }
+
+
+def _name_paragraph(participant_name: str) -> Paragraph:
+    return Paragraph(f"<b>{participant_name}</b>", _styles()["subtitle"])
+
+
+def _story(data: dict, emission_date: str, name: Paragraph) -> list:
+    """Conteúdo do certificado; `name` é o único elemento por participante"""
+    styles = _styles()
+    title_style, body_style, center_style = styles["title"], styles["body"], styles["center"]
+
+    story = []
+
+    # Título
+    story.append(Paragraph("CERTIFICADO DE PARTICIPAÇÃO", title_style))
+    story.append(Spacer(1, 20))
+
+    # Texto principal
+    story.append(Paragraph("Certificamos que", body_style))
+    story.append(Spacer(1, 10))
+
+    # Nome do participante
+    story.append(name)
+    story.append(Spacer(1, 20))
+
+    # Texto do evento
+    event_date = data['event_date'].strftime(
+        "%d de %B de %Y") if data['event_date'] else "Data não informada"
+    event_time = data['event_date'].strftime("%H:%M") if data['event_date'] else ""
+
+    participation_text = f"""
+    participou do evento <b>"{data['event_title']}"</b>, realizado em {event_date}
+    {f" às {event_time}" if event_time else ""}, no local {data['event_location']}.
+    """
+
+    if data['event_speaker']:
+        participation_text += f"""<br/><br/>
+        O evento foi conduzido por <b>{data['event_speaker']}</b>.
+        """
+
+    story.append(Paragraph(participation_text, body_style))
+    story.append(Spacer(1, 30))
+
+    # Instituição organizadora
+    story.append(Paragraph(f"<b>{data['institution_organizer']}</b>", center_style))
+    story.append(Spacer(1, 10))
+
+    # Data de emissão
+    story.append(Paragraph(f"Emitido em {emission_date}", center_style))
+    story.append(Spacer(1, 30))
+
+    # Assinatura (texto simples por enquanto)
+    story.append(Paragraph("_" * 40, center_style))
+    story.append(Paragraph("Assinatura do Responsável", center_style))
+
+    return story
+
+
+class _Placement(Flowable):
+    """Registra onde o Frame posicionaria o flowable, sem desenhá-lo"""
+
+    def __init__(self, flowable):
+        super().__init__()
+        self.flowable = flowable
+        self.position = None
+        self.available = None
+
+    def wrap(self, availWidth, availHeight):
+        self.available = (availWidth, availHeight)
+        return self.flowable.wrap(availWidth, availHeight)
+
+    def getSpaceBefore(self):
+        return self.flowable.getSpaceBefore()
+
+    def getSpaceAfter(self):
+        return self.flowable.getSpaceAfter()
+
+    def drawOn(self, canvas, x, y, _sW=0):
+        self.position = (x, y, _sW)
+
+
+def _layout(story: list) -> list[tuple] | None:
+    """
+    Posiciona a história com o mesmo Frame do SimpleDocTemplate e retorna
+    [(flowable, x, y, _sW, espaço disponível)]; None se ela não couber em uma página.
+    """
+    placements = [_Placement(flowable) for flowable in story]
+    frame = Frame(*_FRAME, id='normal')
+    frame.addFromList(list(placements), Canvas(io.BytesIO(), pagesize=PAGE_SIZE))
+
+    if any(placement.position is None for placement in placements):
+        return None
+    return [(placement.flowable, *placement.position, placement.available) for placement in placements]
+
+
+class CertificateTemplate:
+    """
+    Modelo de certificado de um evento. O layout (quebra de linhas e posição
+    de cada parágrafo) é calculado uma vez; cada certificado apenas desenha
+    os parágrafos já quebrados e o nome do participante na posição reservada.
+    Nomes que ocupam outra altura (ex.: quebram em duas linhas) recalculam o
+    layout só para aquele certificado.
+    """
+
+    def __init__(self, data: dict, emission_date: str):
+        self.data = data
+        self.emission_date = emission_date
+
+        reference = _name_paragraph("Participante")
+        self._layout = _layout(_story(data, emission_date, reference))
+        self._name_index = next(
+            (i for i, (flowable, *_) in enumerate(self._layout or ()) if flowable is reference), None)
+        self._name_height = reference.height if self._layout else None
+        # Os flowables guardam o canvas enquanto desenham: um certificado por vez
+        self._lock = threading.Lock()
+
+    def render(self, participant_name: str, filepath: str) -> None:
+        name = _name_paragraph(participant_name)
+        layout = self._layout
+
+        if layout is not None:
+            _, x, y, _sW, available = layout[self._name_index]
+            name.wrap(*available)
+            if name.height == self._name_height:
+                layout = list(layout)
+                layout[self._name_index] = (name, x, y, _sW, available)
+            else:
+                layout = _layout(_story(self.data, self.emission_date, name))
+
+        if layout is None:
+            # Não coube em uma página: deixa o SimpleDocTemplate paginar
+            _build_document(_story(self.data, self.emission_date, name), filepath)
+            return
+
+        canvas = Canvas(filepath, pagesize=PAGE_SIZE)
+        with self._lock:
+            for flowable, x, y, _sW, _ in layout:
+                flowable.drawOn(canvas, x, y, _sW=_sW)
+        canvas.showPage()
+        canvas.save()
+
+
+def _build_document(story: list, filepath: str) -> None:
+    doc = SimpleDocTemplate(filepath, pagesize=PAGE_SIZE,
+                            rightMargin=2 * cm, leftMargin=2 * cm,
+                            topMargin=3 * cm, bottomMargin=3 * cm)
+    doc.build(story)
+
+
+@lru_cache(maxsize=32)
+def _cached_template(static: tuple, emission_date: str) -> CertificateTemplate:
+    return CertificateTemplate(dict(static), emission_date)
+
+
+def emission_date_text(date: datetime = None) -> str:
+    """Data de emissão impressa no certificado (hoje, se não informada)"""
+    return (date or datetime.now()).strftime("%d de %B de %Y")
+
+
+def get_certificate_template(data: dict, emission_date: str = None) -> CertificateTemplate:
+    """
+    Modelo do evento de `data`, reutilizado entre os certificados do mesmo
+    evento e dia de emissão (cache por processo, inclusive nos workers do pool).
+    """
+    static = tuple(sorted((key, value) for key, value in data.items()
+                          if key not in _PARTICIPANT_FIELDS))
+    return _cached_template(static, emission_date or emission_date_text())
+
+
+def render_certificate_pdf(data: dict, certificates_dir: str) -> str:
+    """Gera o PDF do certificado a partir de `certificate_data` e retorna o caminho do arquivo"""
+    filename = f"certificate_{data['user_id']}_{data['event_id']}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
+    filepath = Path(certificates_dir) / filename
+
+    get_certificate_template(data).render(data['participant_name'], str(filepath))
+
+    return str(filepath)
+
+
+# Versão do layout: entra no hash do conteúdo, para que mudanças no modelo gerem arquivos novos
+TEMPLATE_VERSION = 1
+
+# Renderizações em andamento neste processo: hash -> [lock, interessados]
+_inflight = {}
+_inflight_lock = threading.Lock()
+
+
+def content_hash(data: dict, emission_date: str) -> str:
+    """
+    Hash (SHA-256) de tudo o que determina o conteúdo do PDF: textos do
+    certificado, data de emissão e versão do modelo. Os ids não aparecem no
+    documento e ficam de fora.
+    """
+    payload = {key: value for key, value in data.items() if key not in ("user_id", "event_id")}
+    payload["emission_date"] = emission_date
+    payload["template_version"] = TEMPLATE_VERSION
+    return hashlib.sha256(
+        json.dumps(payload, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+def content_filename(data: dict, emission_date: str) -> str:
+    """Nome do PDF endereçado pelo conteúdo: <content_hash>.pdf"""
+    return f"{content_hash(data, emission_date)}.pdf"
+
+
+@contextmanager
+def render_lock(key: str):
+    """
+    Serializa as renderizações de `key` no processo: pedidos simultâneos do
+    mesmo certificado esperam a primeira renderização (e então encontram o
+    arquivo pronto) em vez de renderizar de novo.
+    """
+    with _inflight_lock:
+        entry = _inflight.setdefault(key, [threading.Lock(), 0])
+        entry[1] += 1
+
+    try:
+        with entry[0]:
+            yield
+    finally:
+        with _inflight_lock:
+            entry[1] -= 1
+            if entry[1] == 0:
+                del _inflight[key]
+
+
+def render_certificate_file(data: dict, filepath: str, emission_date: str) -> None:
+    """Renderiza o certificado em `filepath` com a data de emissão informada"""
+    get_certificate_template(data, emission_date).render(data['participant_name'], filepath)
+
+
+def render_certificate_job(data: dict, certificates_dir: str) -> dict:
+    """
+    Unidade de trabalho do pool: nunca propaga exceções, para que a falha de
+    um participante não interrompa o lote. Retorna {"user_id", "path"} ou
+    {"user_id", "error"}.
+    """
+    try:
+        return {"user_id": data["user_id"],
+                "path": render_certificate_pdf(data, certificates_dir)}
+    except Exception as e:
+        return {"user_id": data["user_id"], "error": str(e)}
+
+
+_pool = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+
+def get_render_pool(max_workers: int) -> ProcessPoolExecutor:
+    """
+    Retorna o pool de processos de renderização (criado sob demanda e
+    reutilizado entre lotes). Usa 'spawn' para não herdar via fork as threads
+    e conexões do processo da aplicação.
+    """
+    global _pool, _pool_workers
+
+    with _pool_lock:
+        if _pool is None or _pool_workers != max_workers:
+            if _pool is not None:
+                _pool.shutdown(wait=True)
+            _pool = ProcessPoolExecutor(
+                max_workers=max_workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+            _pool_workers = max_workers
+        return _pool
+
+
+def shutdown_render_pool() -> None:
+    """Encerra o pool de renderização, se existir"""
+    global _pool, _pool_workers
+
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=True)
+        _pool = None
+        _pool_workers = 0
+
+
+def render_certificates(jobs: list[dict], certificates_dir: str, max_workers: int = 0) -> list[dict]:
+    """
+    Renderiza os certificados de `jobs` (dicts de `certificate_data`).
+    Com max_workers > 1 distribui o trabalho no pool de processos; caso
+    contrário renderiza no processo atual. A ordem dos resultados segue a de `jobs`.
+    """
+    if max_workers <= 1 or len(jobs) <= 1:
+        return [render_certificate_job(data, certificates_dir) for data in jobs]
+
+    pool = get_render_pool(max_workers)
+    chunksize = max(1, len(jobs) // (max_workers * 4))
+    try:
+        return list(pool.map(render_certificate_job, jobs,
+                             [certificates_dir] * len(jobs), chunksize=chunksize))
+    except BrokenProcessPool as e:
+        # Um worker morreu (ex.: OOM): descarta o pool e reporta o lote como falho
+        shutdown_render_pool()
+        return [{"user_id": data["user_id"], "error": f"Pool de renderização interrompido: {e}"}
+                for data in jobs]
@@ -1,18 +1,16 @@
 import os
+import tempfile
+import time
 from datetime import datetime, timedelta
 from pathlib import Path
-from reportlab.lib.pagesizes import A4
-from reportlab.lib.units import cm
-from reportlab.lib.colors import black, darkblue
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Image
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.enums import TA_CENTER, TA_JUSTIFY
 from flask import current_app
 from flask_mail import Message
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import joinedload
 
 from app import db
 from domain.models import Certificate, Event, User, event_participants, Notification
-from services import email_service, notification_service
+from services import certificate_renderer, certificate_storage, email_service, job_state_service, notification_service
 from exceptions import BadRequestException, NotFoundException
 
 
@@ -20,121 +18,90 @@ class CertificateService:
 
     @staticmethod
     def _get_certificates_dir():
-        """Cria e retorna o diretório para armazenar certificados"""
-        certificates_dir = Path(current_app.instance_path) / "certificates"
+        """Diretório local onde os PDFs são renderizados antes de irem para o armazenamento"""
+        certificates_dir = Path(certificate_storage.get_storage().staging_dir)
         certificates_dir.mkdir(parents=True, exist_ok=True)
         return certificates_dir
 
+    @staticmethod
+    def _store_rendered(path: str) -> str:
+        """Entrega ao armazenamento o PDF renderizado em `path` e retorna sua chave"""
+        key = os.path.basename(path)
+        certificate_storage.get_storage().save(key, path)
+        return key
+
     @staticmethod
     def _generate_certificate_pdf(user: User, event: Event) -> str:
-        """Gera o PDF do certificado e retorna o caminho do arquivo"""
-        # Debug: verificar se o usuário tem nome
+        """Gera o PDF do certificado e retorna sua chave no armazenamento"""
         current_app.logger.info(
             f"Gerando certificado para: {user.name} (ID: {user.id})")
 
-        certificates_dir = CertificateService._get_certificates_dir()
-        filename = f"certificate_{user.id}_{event.id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
-        filepath = certificates_dir / filename
-
-        # Configurar documento PDF
-        doc = SimpleDocTemplate(str(filepath), pagesize=A4,
-                                rightMargin=2 * cm, leftMargin=2 * cm,
-                                topMargin=3 * cm, bottomMargin=3 * cm)
-
-        # Estilos
-        styles = getSampleStyleSheet()
-
-        title_style = ParagraphStyle(
-            'CustomTitle',
-            parent=styles['Title'],
-            fontSize=24,
-            spaceAfter=30,
-            alignment=TA_CENTER,
-            textColor=darkblue,
-            fontName='Helvetica-Bold'
-        )
-
-        subtitle_style = ParagraphStyle(
-            'CustomSubtitle',
-            parent=styles['Normal'],
-            fontSize=18,
-            spaceAfter=20,
-            alignment=TA_CENTER,
-            textColor=black,
-            fontName='Helvetica-Bold'
-        )
-
-        body_style = ParagraphStyle(
-            'CustomBody',
-            parent=styles['Normal'],
-            fontSize=14,
-            spaceAfter=15,
-            alignment=TA_JUSTIFY,
-            textColor=black,
-            fontName='Helvetica'
-        )
-
-        center_style = ParagraphStyle(
-            'CustomCenter',
-            parent=styles['Normal'],
-            fontSize=12,
-            spaceAfter=10,
-            alignment=TA_CENTER,
-            textColor=black,
-            fontName='Helvetica'
-        )
-
-        # Conteúdo do certificado
-        story = []
-
-        # Título
-        story.append(Paragraph("CERTIFICADO DE PARTICIPAÇÃO", title_style))
-        story.append(Spacer(1, 20))
-
-        # Texto principal
-        story.append(Paragraph("Certificamos que", body_style))
-        story.append(Spacer(1, 10))
+        return CertificateService._store_rendered(certificate_renderer.render_certificate_pdf(
+            certificate_renderer.certificate_data(user, event),
+            str(CertificateService._get_certificates_dir())
+        ))
 
-        # Nome do participante
-        participant_name = getattr(user, 'name', 'Nome não disponível')
-        story.append(Paragraph(f"<b>{participant_name}</b>", subtitle_style))
-        story.append(Spacer(1, 20))
-
-        # Texto do evento
-        event_date = event.date.strftime(
-            "%d de %B de %Y") if event.date else "Data não informada"
-        event_time = event.date.strftime("%H:%M") if event.date else ""
+    @staticmethod
+    def _lazy_rendering() -> bool:
+        """No modo lazy os certificados são criados sem PDF, renderizado no primeiro download ou email"""
+        return current_app.config.get("CERTIFICATE_RENDER_MODE", "eager") == "lazy"
 
-        participation_text = f"""
-        participou do evento <b>"{event.title}"</b>, realizado em {event_date}
-        {f" às {event_time}" if event_time else ""}, no local {event.location}.
+    @staticmethod
+    def _render_to_storage(data: dict, emission_date: str) -> str:
         """
+        Renderiza o certificado sob a chave <hash do conteúdo>.pdf, se ela ainda
+        não existe no armazenamento. Pedidos simultâneos da mesma chave no
+        processo aguardam uma única renderização; entre processos, uma
+        renderização duplicada apenas regrava o mesmo conteúdo.
+        """
+        storage = certificate_storage.get_storage()
+        key = certificate_renderer.content_filename(data, emission_date)
+
+        with certificate_renderer.render_lock(key):
+            if not storage.exists(key):
+                fd, tmp = tempfile.mkstemp(suffix=".pdf", dir=CertificateService._get_certificates_dir())
+                os.close(fd)
+                try:
+                    certificate_renderer.render_certificate_file(data, tmp, emission_date)
+                    storage.save(key, tmp)
+                finally:
+                    if os.path.exists(tmp):
+                        os.remove(tmp)
+
+        return key
 
-        if event.speaker:
-            participation_text += f"""<br/><br/>
-            O evento foi conduzido por <b>{event.speaker}</b>.
-            """
-
-        story.append(Paragraph(participation_text, body_style))
-        story.append(Spacer(1, 30))
-
-        # Instituição organizadora
-        story.append(Paragraph(f"<b>{event.institution_organizer}</b>", center_style))
-        story.append(Spacer(1, 10))
-
-        # Data de emissão
-        emission_date = datetime.now().strftime("%d de %B de %Y")
-        story.append(Paragraph(f"Emitido em {emission_date}", center_style))
-        story.append(Spacer(1, 30))
-
-        # Assinatura (texto simples por enquanto)
-        story.append(Paragraph("_" * 40, center_style))
-        story.append(Paragraph("Assinatura do Responsável", center_style))
+    @staticmethod
+    def ensure_certificate_file(certificate: Certificate, commit: bool = True) -> str:
+        """
+        Retorna a chave do PDF do certificado no armazenamento, renderizando-o
+        se ainda não existe (modo lazy) ou se o arquivo sumiu. A data de
+        emissão é a da geração do certificado.
+        """
+        storage = certificate_storage.get_storage()
+        key = certificate.certificate_path
+        if key and storage.exists(key):
+            return key
+
+        key = CertificateService._render_to_storage(
+            certificate_renderer.certificate_data(certificate.user, certificate.event),
+            certificate_renderer.emission_date_text(certificate.generated_at)
+        )
 
-        # Gerar PDF
-        doc.build(story)
+        db.session.execute(
+            db.update(Certificate)
+            .where(Certificate.id == certificate.id)
+            .values(certificate_path=key)
+            .execution_options(synchronize_session=False)
+        )
+        certificate.certificate_path = key
+        if commit:
+            try:
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                raise
 
-        return str(filepath)
+        return key
 
     @staticmethod
     def generate_certificate_for_participant(user_id: int, event_id: int) -> Certificate:
@@ -176,8 +143,10 @@ class CertificateService:
         if existing_certificate:
             return existing_certificate
 
-        # Gerar PDF
-        certificate_path = CertificateService._generate_certificate_pdf(user, event)
+        # Gerar PDF (no modo lazy, apenas no primeiro download ou email)
+        certificate_path = None
+        if not CertificateService._lazy_rendering():
+            certificate_path = CertificateService._generate_certificate_pdf(user, event)
 
         # Salvar no banco
         certificate = Certificate(
@@ -192,8 +161,7 @@ class CertificateService:
         return certificate
 
     @staticmethod
-    def generate_certificates_for_event(event_id: int) -> list[Certificate]:
-        """Gera certificados para todos os participantes de um evento"""
+    def _get_completed_event(event_id: int) -> Event:
         event = Event.query.filter_by(id=event_id, active=True).first()
         if not event:
             raise NotFoundException("Evento não encontrado")
@@ -205,30 +173,139 @@ class CertificateService:
                     {"event": "Certificados só podem ser gerados após a conclusão do evento"}]
             )
 
-        # Buscar todos os participantes inscritos
-        participants = db.session.query(User).join(
+        return event
+
+    @staticmethod
+    def _participants_query(event_id: int):
+        """(id, name) dos participantes ativos inscritos no evento"""
+        return db.session.query(User.id, User.name).join(
             event_participants,
             User.id == event_participants.c.user_id
         ).filter(
             event_participants.c.event_id == event_id,
             event_participants.c.active == True,
             User.active == True
-        ).all()
+        ).order_by(User.id)
 
-        certificates = []
-        for user in participants:
-            try:
-                certificate = CertificateService.generate_certificate_for_participant(
-                    user.id, event_id
-                )
-                certificates.append(certificate)
-            except Exception as e:
-                # Log error but continue with other participants
+    @staticmethod
+    def _render_and_persist(event: Event, participants: list, max_workers: int = None) -> tuple[list[Certificate], list[dict]]:
+        """
+        Renderiza os certificados dos participantes e insere todos em uma única
+        instrução (executemany) e um único commit. O ON CONFLICT DO NOTHING sobre
+        uq_certificate_user_event mantém a operação idempotente quando outro
+        processo gera o mesmo certificado ao mesmo tempo; nesse caso o PDF
+        renderizado aqui é descartado. No modo lazy nada é renderizado: as
+        linhas são criadas sem PDF. Retorna (certificados inseridos, erros).
+        """
+        if not participants:
+            return [], []
+
+        if max_workers is None:
+            max_workers = current_app.config.get("CERTIFICATE_RENDER_WORKERS", 0)
+
+        if CertificateService._lazy_rendering():
+            rendered, errors = {participant.id: None for participant in participants}, []
+        else:
+            jobs = [certificate_renderer.certificate_data(participant, event)
+                    for participant in participants]
+            results = certificate_renderer.render_certificates(
+                jobs, str(CertificateService._get_certificates_dir()), max_workers)
+
+            errors = [result for result in results if "error" in result]
+            for error in errors:
                 current_app.logger.error(
-                    f"Erro ao gerar certificado para usuário {user.id}: {str(e)}")
-                continue
+                    f"Erro ao gerar certificado para usuário {error['user_id']}: {error['error']}")
+
+            rendered = {result["user_id"]: CertificateService._store_rendered(result["path"])
+                        for result in results if "path" in result}
+
+        if not rendered:
+            return [], errors
+
+        generated_at = datetime.now()
+        stmt = sqlite_insert(Certificate).on_conflict_do_nothing(
+            index_elements=[Certificate.user_id, Certificate.event_id]
+        ).returning(Certificate)
+
+        certificates = list(db.session.scalars(stmt, [{
+            "user_id": user_id,
+            "event_id": event.id,
+            "certificate_path": path,
+            "generated_at": generated_at,
+            "active": True,
+        } for user_id, path in rendered.items()]))
+        inserted = {certificate.user_id for certificate in certificates}
+        ids = [certificate.id for certificate in certificates]
+        db.session.commit()
+
+        # Certificados já inseridos por outro processo: remove os PDFs duplicados
+        storage = certificate_storage.get_storage()
+        for user_id, key in rendered.items():
+            if user_id not in inserted and key:
+                storage.delete(key)
+
+        # O commit expira as instâncias: recarrega com os usuários em uma consulta,
+        # evitando um refresh por certificado nos emails e notificações
+        certificates = Certificate.query.options(
+            joinedload(Certificate.user)
+        ).filter(Certificate.id.in_(ids)).order_by(Certificate.user_id).all() if ids else []
+
+        return certificates, errors
+
+    @staticmethod
+    def generate_certificates_for_event(event_id: int) -> list[Certificate]:
+        """
+        Gera certificados para todos os participantes de um evento. Carrega os
+        participantes e os certificados existentes com uma consulta cada e
+        renderiza apenas os que faltam. Retorna os certificados ativos de
+        todos os participantes (existentes e novos).
+        """
+        event = CertificateService._get_completed_event(event_id)
+
+        participants = CertificateService._participants_query(event_id).all()
+
+        existing = {
+            certificate.user_id: certificate
+            for certificate in Certificate.query.filter_by(event_id=event_id)
+        }
+
+        # A constraint única vale também para certificados inativos
+        missing = [participant for participant in participants
+                   if participant.id not in existing]
 
-        return certificates
+        if missing:
+            CertificateService._render_and_persist(event, missing)
+            # O commit expira as instâncias: recarrega todas com uma única consulta,
+            # incluindo as gravadas por uma geração concorrente
+            existing = {
+                certificate.user_id: certificate
+                for certificate in Certificate.query.filter_by(event_id=event_id)
+            }
+
+        return [existing[participant.id] for participant in participants
+                if participant.id in existing and existing[participant.id].active]
+
+    @staticmethod
+    def generate_certificates_for_event_batch(event_id: int, max_workers: int = None) -> tuple[list[Certificate], list[dict]]:
+        """
+        Modo em lote: renderiza os certificados que faltam no evento em um pool
+        de processos (CERTIFICATE_RENDER_WORKERS) e persiste todos com um único
+        INSERT. Retorna (certificados gerados, erros [{"user_id", "error"}]).
+        """
+        event = CertificateService._get_completed_event(event_id)
+
+        # Participantes ativos ainda sem certificado (a constraint única vale
+        # também para certificados inativos, por isso não filtra por active)
+        has_certificate = db.session.query(Certificate.id).filter(
+            Certificate.user_id == User.id,
+            Certificate.event_id == event_id
+        ).exists()
+
+        participants = CertificateService._participants_query(event_id).filter(
+            ~has_certificate
+        ).all()
+
+        return CertificateService._render_and_persist(event, participants, max_workers)
 
     @staticmethod
     def get_user_certificates(user_id: int) -> list[Certificate]:
@@ -252,70 +329,226 @@ class CertificateService:
 
         return certificate
 
-    @staticmethod
-    def process_completed_events():
-        """Processa eventos concluídos para gerar certificados automaticamente"""
-        # Buscar eventos que foram concluídos recentemente (nas últimas 24h)
-        yesterday = datetime.now() - timedelta(days=1)
+    # Nome do job em job_states (marca d'água = Event.date do último evento processado)
+    PROCESSING_JOB = "certificates.process_completed_events"
 
+    @staticmethod
+    def process_completed_events(max_events: int = None) -> dict:
+        """
+        Processa eventos concluídos para gerar certificados automaticamente.
+
+        Incremental: busca apenas eventos concluídos ainda sem
+        certificates_processed_at com data a partir da marca d'água persistida
+        (job_states), em ordem de data e no máximo max_events por execução.
+        Eventos que concluíram enquanto o processo esteve parado são
+        processados na execução seguinte. A marca d'água só avança até antes
+        do primeiro evento que falhar, para que ele seja tentado de novo.
+        Retorna {"processed", "failed", "certificates", "watermark"}.
+        """
+        config = current_app.config
+        if max_events is None:
+            max_events = config.get("CERTIFICATE_PROCESSING_MAX_EVENTS", 50)
+
+        now = datetime.now()
+        watermark = job_state_service.get_watermark(CertificateService.PROCESSING_JOB)
+        if watermark is None:
+            watermark = now - timedelta(
+                hours=config.get("CERTIFICATE_PROCESSING_INITIAL_LOOKBACK_HOURS", 24))
+
+        # >= e não >: eventos com a mesma data da marca d'água que ficaram
+        # para a próxima execução (limite) continuam elegíveis
         completed_events = Event.query.filter(
             Event.active == True,
-            Event.date <= datetime.now(),
-            Event.date >= yesterday
-        ).all()
+            Event.certificates_processed_at.is_(None),
+            Event.date >= watermark,
+            Event.date <= now
+        ).order_by(Event.date, Event.id).limit(max_events).all()
+
+        stats = {"processed": 0, "failed": 0, "certificates": 0}
+        new_watermark, blocked = watermark, False
 
         for event in completed_events:
-            try:
-                # Verificar se já foram gerados certificados para este evento
-                existing_certificates = Certificate.query.filter_by(
-                    event_id=event.id,
-                    active=True
-                ).count()
-
-                # Contar participantes inscritos
-                participants_count = db.session.query(event_participants).filter_by(
-                    event_id=event.id,
-                    active=True
-                ).count()
-
-                # Se ainda não foram gerados certificados para todos
-                if existing_certificates < participants_count:
-                    certificates = CertificateService.generate_certificates_for_event(
-                        event.id)
-
-                    # Enviar por email
-                    for certificate in certificates:
-                        try:
-                            email_service.send_certificate_by_email(
-                                certificate, certificate.user)
-                        except Exception as e:
-                            current_app.logger.error(
-                                f"Erro ao enviar certificado {certificate.id}: {str(e)}")
-                            continue
+            event_date = event.date
+            generated = CertificateService._process_completed_event(event)
 
-                    for certificate in certificates:
-                        try:
-                            CertificateService._create_notification_for_certificate(
-                                certificate)
-                        except Exception as e:
-                            current_app.logger.error(
-                                f"Erro ao criar notificação para certificado {certificate.id}: {str(e)}")
-                            continue
+            if generated is None:
+                stats["failed"] += 1
+                blocked = True
+                continue
 
-            except Exception as e:
+            stats["processed"] += 1
+            stats["certificates"] += generated
+            if not blocked:
+                new_watermark = event_date
+
+        job_state_service.set_watermark(CertificateService.PROCESSING_JOB, new_watermark)
+        stats["watermark"] = new_watermark.isoformat()
+        return stats
+
+    @staticmethod
+    def _process_completed_event(event: Event) -> int | None:
+        """
+        Gera os certificados que faltam no evento, enfileira os emails e cria
+        as notificações; marca o evento como processado se não houve erro.
+        Retorna a quantidade de certificados gerados ou None em caso de falha.
+        """
+        event_id = event.id
+
+        try:
+            # Só os certificados que faltam: uma nova tentativa não repete emails
+            certificates, errors = CertificateService.generate_certificates_for_event_batch(event_id)
+
+            # Enfileirar os emails (uma transação; o envio fica com o worker).
+            # No modo lazy vai o link, e não o PDF, para não renderizar o evento inteiro no envio
+            attach_pdf = not CertificateService._lazy_rendering()
+            for certificate in certificates:
+                try:
+                    email_service.send_certificate_by_email(
+                        certificate, certificate.user, commit=False, attach_pdf=attach_pdf)
+                except Exception as e:
+                    current_app.logger.error(
+                        f"Erro ao enviar certificado {certificate.id}: {str(e)}")
+                    continue
+            db.session.commit()
+            if certificates:
+                email_service.wake_worker()
+
+            if CertificateService._create_notifications_for_certificates(certificates) < len(certificates):
                 current_app.logger.error(
-                    f"Erro ao processar evento {event.id}: {str(e)}")
-                continue
+                    f"Erro ao criar notificações dos certificados do evento {event_id}")
+
+            if errors:
+                current_app.logger.error(
+                    f"Evento {event_id}: {len(errors)} certificado(s) não gerado(s), nova tentativa na próxima execução")
+                return None
+
+            db.session.execute(
+                db.update(Event)
+                .where(Event.id == event_id)
+                .values(certificates_processed_at=datetime.now())
+                .execution_options(synchronize_session=False)
+            )
+            db.session.commit()
+            return len(certificates)
+
+        except Exception as e:
+            db.session.rollback()
+            current_app.logger.error(
+                f"Erro ao processar evento {event_id}: {str(e)}")
+            return None
 
     @staticmethod
-    def _create_notification_for_certificate(certificate: Certificate):
-        """Cria notificação para o usuário sobre o certificado gerado"""
+    def _create_notifications_for_certificates(certificates: list[Certificate]) -> int:
+        """Cria, em uma única inserção, as notificações dos certificados gerados"""
+        notifications = []
+        for certificate in certificates:
+            notification = Notification()
+
+            notification.title = "Certificado Gerado"
+            notification.message = f"Seu certificado de participação no evento '{certificate.event.title}' foi gerado com sucesso."
+            notification.link = f"dashboard-participant/certificado/{certificate.id}"
+            notification.user_id = certificate.user_id
 
-        notification = Notification()
+            notifications.append(notification)
+
+        return notification_service.save_notifications_bulk(notifications)
+
+    @staticmethod
+    def collect_orphaned_files(batch_size: int = None, min_age_hours: int = None,
+                               quarantine: bool = None, dry_run: bool = False) -> dict:
+        """
+        Remove do armazenamento os PDFs que nenhuma linha de certificates
+        referencia (ex.: renderizações interrompidas antes do commit ou
+        duplicadas por outro processo). A listagem do armazenamento é percorrida
+        sob demanda e comparada com certificates.certificate_path em lotes de
+        batch_size chaves (uma consulta IN por lote), com memória proporcional
+        ao lote e não ao armazenamento. Certificados inativos continuam
+        referenciando seus arquivos. Arquivos com menos de min_age_hours são
+        preservados, assim como sobras do diretório de preparação, que são
+        apagadas com a mesma idade mínima.
+        Args:
+            batch_size (int): Chaves por lote.
+            min_age_hours (int): Idade mínima (horas) de um arquivo para ser coletado.
+            quarantine (bool): Move os órfãos para a quarentena em vez de apagá-los.
+            dry_run (bool): Se True, apenas conta os órfãos e os bytes recuperáveis.
+        Returns:
+            dict: {"scanned", "orphans", "removed", "reclaimed_bytes", "staging",
+                   "batches", "elapsed_seconds", "dry_run", "quarantine"}.
+        """
+        config = current_app.config
+        if batch_size is None:
+            batch_size = config.get("CERTIFICATE_GC_BATCH_SIZE", 500)
+        if min_age_hours is None:
+            min_age_hours = config.get("CERTIFICATE_GC_MIN_AGE_HOURS", 24)
+        if quarantine is None:
+            quarantine = config.get("CERTIFICATE_GC_QUARANTINE", False)
+
+        started = time.perf_counter()
+        cutoff = time.time() - min_age_hours * 3600
+        storage = certificate_storage.get_storage()
+        metrics = {"scanned": 0, "orphans": 0, "removed": 0, "reclaimed_bytes": 0,
+                   "staging": 0, "batches": 0, "dry_run": dry_run, "quarantine": quarantine}
+
+        batch = []
+        for stored in storage.iter_files():
+            metrics["scanned"] += 1
+            if stored.modified_at < cutoff:
+                batch.append(stored)
+            if len(batch) >= batch_size:
+                CertificateService._collect_orphan_batch(storage, batch, quarantine, dry_run, metrics)
+                batch = []
+        if batch:
+            CertificateService._collect_orphan_batch(storage, batch, quarantine, dry_run, metrics)
+
+        metrics["staging"] = CertificateService._sweep_staging(storage, cutoff, dry_run)
+
+        metrics["elapsed_seconds"] = round(time.perf_counter() - started, 3)
+        current_app.logger.info(
+            f"Coleta de certificados órfãos{' (dry-run)' if dry_run else ''}: "
+            f"{metrics['orphans']} órfão(s) de {metrics['scanned']} arquivo(s), "
+            f"{metrics['removed']} {'movido(s) para a quarentena' if quarantine else 'apagado(s)'}, "
+            f"{metrics['reclaimed_bytes']} bytes em {metrics['batches']} lote(s) "
+            f"e {metrics['elapsed_seconds']}s")
+        return metrics
 
-        notification.title = "Certificado Gerado"
-        notification.message = f"Seu certificado de participação no evento '{certificate.event.title}' foi gerado com sucesso."
-        notification.link = f"dashboard-participant/certificado/{certificate.id}"
-        notification.user_id = certificate.user_id
+    @staticmethod
+    def _collect_orphan_batch(storage, batch: list, quarantine: bool, dry_run: bool, metrics: dict) -> None:
+        """Remove (ou apenas conta) os arquivos do lote sem linha em certificates"""
+        keys = [stored.key for stored in batch]
+        referenced = set(db.session.scalars(
+            db.select(Certificate.certificate_path).where(Certificate.certificate_path.in_(keys))
+        ))
+        # Só leitura: encerra a transação para não segurar o banco entre os lotes
+        db.session.rollback()
+        metrics["batches"] += 1
+
+        for stored in batch:
+            if stored.key in referenced:
+                continue
+            metrics["orphans"] += 1
+            if dry_run:
+                metrics["reclaimed_bytes"] += stored.size
+                continue
+            try:
+                removed = storage.quarantine(stored.key) if quarantine else storage.delete(stored.key)
+            except Exception as e:
+                current_app.logger.error(f"Erro ao coletar o certificado órfão {stored.key}: {str(e)}")
+                continue
+            if removed:
+                metrics["removed"] += 1
+                metrics["reclaimed_bytes"] += stored.size
 
-        notification_service.save_notification(notification)
+    @staticmethod
+    def _sweep_staging(storage, cutoff: float, dry_run: bool) -> int:
+        """Apaga renderizações abandonadas no diretório de preparação; retorna quantas"""
+        swept = 0
+        with os.scandir(storage.staging_dir) as entries:
+            for entry in entries:
+                if entry.is_file(follow_symlinks=False) and entry.stat().st_mtime < cutoff:
+                    if not dry_run:
+                        try:
+                            os.remove(entry.path)
+                        except FileNotFoundError:
+                            continue
+                    swept += 1
+        return swept
@@ -0,0 +1,305 @@
+"""
+Armazenamento dos PDFs de certificado.
+
+`Certificate.certificate_path` guarda a chave do arquivo (ex.: o nome do
+PDF), e não um caminho do disco; o backend configurado em
+CERTIFICATE_STORAGE decide onde ela fica:
+
+- "filesystem": disco local em subdiretórios pelo prefixo do hash da chave
+  (<raiz>/ab/cd/<chave>), para que nenhum diretório acumule centenas de
+  milhares de arquivos. Chaves absolutas (caminhos gravados antes do
+  armazenamento existir) continuam sendo lidas onde estão.
+- "s3": bucket S3 ou compatível (MinIO, moto server), com o mesmo layout
+  sob CERTIFICATE_S3_PREFIX. Requer o boto3.
+
+Os PDFs são renderizados em um diretório local de preparação
+(staging_dir) e entregues ao backend com save(). Arquivos órfãos podem ser
+movidos para uma quarentena (quarantine()), fora da listagem de iter_files().
+"""
+import hashlib
+import os
+from pathlib import Path
+from typing import Iterator, NamedTuple
+from flask import current_app
+
+
+CHUNK_SIZE = 64 * 1024
+
+# Áreas internas do backend, fora da listagem de iter_files()
+STAGING = ".staging"
+QUARANTINE = ".quarantine"
+
+
+class StoredFile(NamedTuple):
+    key: str
+    size: int
+    modified_at: float  # timestamp (segundos desde a época)
+
+
+def shard_path(key: str) -> str:
+    """Caminho relativo da chave: dois níveis de subdiretórios pelo hash da chave"""
+    digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+    return f"{digest[:2]}/{digest[2:4]}/{key}"
+
+
+class CertificateStorage:
+    """Interface dos backends de armazenamento de certificados"""
+
+    def save(self, key: str, source_path: str) -> None:
+        """Armazena o arquivo local `source_path` sob `key` (o arquivo de origem é consumido)"""
+        raise NotImplementedError
+
+    def exists(self, key: str) -> bool:
+        raise NotImplementedError
+
+    def size(self, key: str) -> int:
+        """Tamanho em bytes; FileNotFoundError se a chave não existe"""
+        raise NotImplementedError
+
+    def iter_range(self, key: str, start: int = 0, end: int = None,
+                   chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+        """Conteúdo de [start, end) em blocos; FileNotFoundError se a chave não existe"""
+        raise NotImplementedError
+
+    def read(self, key: str) -> bytes:
+        return b"".join(self.iter_range(key))
+
+    def delete(self, key: str) -> bool:
+        """Remove a chave; retorna False se ela não existia"""
+        raise NotImplementedError
+
+    def iter_files(self) -> Iterator[StoredFile]:
+        """Percorre o armazenamento sob demanda, sem carregar a listagem inteira"""
+        raise NotImplementedError
+
+    def quarantine(self, key: str) -> bool:
+        """Move a chave para a quarentena; retorna False se ela não existia"""
+        raise NotImplementedError
+
+    @property
+    def staging_dir(self) -> str:
+        """Diretório local onde os PDFs são renderizados antes de save()"""
+        raise NotImplementedError
+
+
+class FilesystemStorage(CertificateStorage):
+    """Disco local com subdiretórios pelo prefixo do hash da chave"""
+
+    def __init__(self, root: str):
+        self.root = Path(root)
+        # Dentro da raiz (mesmo sistema de arquivos): save() é um rename
+        self._staging = self.root / STAGING
+        self._staging.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, key: str) -> Path:
+        if os.path.isabs(key):
+            return Path(key)
+        return self.root / shard_path(key)
+
+    @property
+    def staging_dir(self) -> str:
+        return str(self._staging)
+
+    def save(self, key: str, source_path: str) -> None:
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(source_path, path)
+
+    def exists(self, key: str) -> bool:
+        return self._path(key).is_file()
+
+    def size(self, key: str) -> int:
+        return self._path(key).stat().st_size
+
+    def iter_range(self, key: str, start: int = 0, end: int = None,
+                   chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+        f = open(self._path(key), "rb")
+
+        def chunks():
+            with f:
+                f.seek(start)
+                remaining = None if end is None else end - start
+                while remaining is None or remaining > 0:
+                    data = f.read(chunk_size if remaining is None else min(chunk_size, remaining))
+                    if not data:
+                        break
+                    if remaining is not None:
+                        remaining -= len(data)
+                    yield data
+
+        # open() fora do gerador: chave inexistente falha já na chamada
+        return chunks()
+
+    def delete(self, key: str) -> bool:
+        try:
+            self._path(key).unlink()
+            return True
+        except FileNotFoundError:
+            return False
+
+    def iter_files(self) -> Iterator[StoredFile]:
+        """
+        Percorre os subdiretórios com os.scandir, sem carregar a listagem
+        inteira. Arquivos fora do layout (ex.: gravados na raiz antes do
+        armazenamento existir) são gerados com o caminho absoluto como chave.
+        """
+        reserved = {str(self.root / STAGING), str(self.root / QUARANTINE)}
+
+        def walk(directory):
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        if entry.path not in reserved:
+                            yield from walk(entry.path)
+                    elif entry.is_file(follow_symlinks=False):
+                        sharded = self._path(entry.name) == Path(entry.path)
+                        stat = entry.stat()
+                        yield StoredFile(entry.name if sharded else entry.path,
+                                         stat.st_size, stat.st_mtime)
+
+        yield from walk(self.root)
+
+    def quarantine(self, key: str) -> bool:
+        target = self.root / QUARANTINE / os.path.basename(key)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            os.replace(self._path(key), target)
+            return True
+        except FileNotFoundError:
+            return False
+
+
+class S3Storage(CertificateStorage):
+    """Bucket S3 ou compatível (MinIO, moto server); requer o boto3"""
+
+    def __init__(self, bucket: str, prefix: str = "", endpoint_url: str = None,
+                 region: str = None, staging_dir: str = None, client=None):
+        if client is None:
+            try:
+                import boto3
+            except ImportError:
+                raise RuntimeError(
+                    "CERTIFICATE_STORAGE=s3 requer o boto3: pip install boto3")
+            client = boto3.client("s3", endpoint_url=endpoint_url, region_name=region)
+
+        self.client = client
+        self.bucket = bucket
+        self.prefix = prefix
+        self.quarantine_prefix = f"{prefix}{QUARANTINE}/"
+        self._staging = Path(staging_dir)
+        self._staging.mkdir(parents=True, exist_ok=True)
+
+    def _object_key(self, key: str) -> str:
+        return f"{self.prefix}{shard_path(key)}"
+
+    def _is_missing(self, error) -> bool:
+        return error.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound")
+
+    @property
+    def staging_dir(self) -> str:
+        return str(self._staging)
+
+    def save(self, key: str, source_path: str) -> None:
+        self.client.upload_file(source_path, self.bucket, self._object_key(key),
+                                ExtraArgs={"ContentType": "application/pdf"})
+        os.remove(source_path)
+
+    def _head(self, key: str) -> dict:
+        from botocore.exceptions import ClientError
+
+        try:
+            return self.client.head_object(Bucket=self.bucket, Key=self._object_key(key))
+        except ClientError as e:
+            if self._is_missing(e):
+                raise FileNotFoundError(key)
+            raise
+
+    def exists(self, key: str) -> bool:
+        try:
+            self._head(key)
+            return True
+        except FileNotFoundError:
+            return False
+
+    def size(self, key: str) -> int:
+        return self._head(key)["ContentLength"]
+
+    def iter_range(self, key: str, start: int = 0, end: int = None,
+                   chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+        from botocore.exceptions import ClientError
+
+        if end is not None and end <= start:
+            return iter(())
+
+        byte_range = f"bytes={start}-{'' if end is None else end - 1}"
+        try:
+            body = self.client.get_object(
+                Bucket=self.bucket, Key=self._object_key(key), Range=byte_range)["Body"]
+        except ClientError as e:
+            if self._is_missing(e):
+                raise FileNotFoundError(key)
+            raise
+
+        def chunks():
+            try:
+                yield from body.iter_chunks(chunk_size)
+            finally:
+                body.close()
+
+        return chunks()
+
+    def delete(self, key: str) -> bool:
+        if not self.exists(key):
+            return False
+        self.client.delete_object(Bucket=self.bucket, Key=self._object_key(key))
+        return True
+
+    def iter_files(self) -> Iterator[StoredFile]:
+        """Lista o bucket página a página (list_objects_v2, até 1000 chaves por página)"""
+        paginator = self.client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=self.prefix):
+            for item in page.get("Contents", ()):
+                if item["Key"].startswith(self.quarantine_prefix):
+                    continue
+                yield StoredFile(item["Key"].rsplit("/", 1)[-1], item["Size"],
+                                 item["LastModified"].timestamp())
+
+    def quarantine(self, key: str) -> bool:
+        if not self.exists(key):
+            return False
+        self.client.copy_object(
+            Bucket=self.bucket,
+            Key=f"{self.quarantine_prefix}{key}",
+            CopySource={"Bucket": self.bucket, "Key": self._object_key(key)}
+        )
+        self.client.delete_object(Bucket=self.bucket, Key=self._object_key(key))
+        return True
+
+
+def create_storage(config: dict, instance_path: str) -> CertificateStorage:
+    """Cria o backend configurado em CERTIFICATE_STORAGE"""
+    backend = config.get("CERTIFICATE_STORAGE", "filesystem")
+    root = config.get("CERTIFICATE_STORAGE_PATH") or os.path.join(instance_path, "certificates")
+
+    if backend == "filesystem":
+        return FilesystemStorage(root)
+
+    if backend == "s3":
+        return S3Storage(
+            bucket=config["CERTIFICATE_S3_BUCKET"],
+            prefix=config.get("CERTIFICATE_S3_PREFIX", ""),
+            endpoint_url=config.get("CERTIFICATE_S3_ENDPOINT_URL"),
+            region=config.get("CERTIFICATE_S3_REGION"),
+            staging_dir=os.path.join(root, STAGING)
+        )
+
+    raise ValueError(f"CERTIFICATE_STORAGE inválido: {backend}")
+
+
+def get_storage() -> CertificateStorage:
+    """Backend de armazenamento da aplicação atual (criado no primeiro uso)"""
+    storage = current_app.extensions.get("certificate_storage")
+    if storage is None:
+        storage = create_storage(current_app.config, current_app.instance_path)
+        current_app.extensions["certificate_storage"] = storage
+    return storage
@@ -1,18 +1,58 @@
+import smtplib
+import threading
+import uuid
+from datetime import datetime, timedelta
 from flask import current_app
-from app import mail
+from app import db, mail
 from flask_mail import Message
 import os
 
 from domain.models.certificate import Certificate
+from domain.models.email_outbox import EmailOutbox
+from domain.models.email_status import EmailStatus
 from domain.models.user import User
-from exceptions.business_exceptions import BadRequestException
+from services.certificate_storage import get_storage
+
+
+def enqueue_email(recipients: list[str], subject: str, body: str,
+                  attachment_path: str = None, attachment_filename: str = None,
+                  certificate_id: int = None, commit: bool = True) -> EmailOutbox:
+    """
+    Grava o email na fila (email_outbox) para envio pelo worker.
+    Com commit=False apenas adiciona à sessão, para enfileirar vários emails
+    em uma única transação. Com certificate_id o PDF do certificado é
+    anexado no envio, renderizado nesse momento se ainda não existir.
+    """
+    email = EmailOutbox(
+        recipients=list(recipients),
+        subject=subject,
+        body=body,
+        attachment_path=attachment_path,
+        attachment_filename=attachment_filename,
+        certificate_id=certificate_id,
+        status=EmailStatus.PENDING,
+        attempts=0,
+        next_attempt_at=datetime.now()
+    )
+    db.session.add(email)
+
+    if commit:
+        db.session.commit()
+        wake_worker()
+
+    return email
+
+
+def wake_worker():
+    """Avisa o worker de que há emails novos na fila"""
+    from utils.email_outbox_worker import email_outbox_worker
+    email_outbox_worker.wake()
 
 
 def send_password_reset_email(user_email: str, token: str):
-    msg = Message(
-        subject="Redefinição de senha - Event Anexus",
-        sender=os.getenv("MAIL_USERNAME"),
+    enqueue_email(
         recipients=[user_email],
+        subject="Redefinição de senha - Event Anexus",
         body=f"""Olá,
 
             Você solicitou a redefinição de senha da sua conta no Event Anexus.
@@ -28,41 +68,303 @@ def send_password_reset_email(user_email: str, token: str):
     """
     )
 
-    try:
-        mail.send(msg)
-    except Exception as e:
-        raise Exception("Erro ao enviar email de redefinição de senha.") from e
 
+def send_certificate_by_email(certificate: Certificate, destination_user: User, commit: bool = True,
+                              attach_pdf: bool = True):
+    """
+    Enfileira o envio do certificado por email. Com attach_pdf o PDF vai
+    anexado (renderizado no envio se ainda não existir); sem ele o email leva
+    o link do certificado no frontend, usado no envio em massa do modo lazy
+    para que o worker de email não renderize todos os PDFs do evento.
+    """
+    if attach_pdf:
+        delivery = f"Segue em anexo seu certificado de participação do evento \"{certificate.event.title}\"."
+        attachment = {"attachment_filename": f"certificado_{certificate.event.title}.pdf",
+                      "certificate_id": certificate.id}
+    else:
+        frontend_url = current_app.config.get("FRONTEND_URL", "").rstrip("/")
+        delivery = (f"Seu certificado de participação do evento \"{certificate.event.title}\" "
+                    f"está disponível para download em:\n"
+                    f"            {frontend_url}/dashboard-participant/certificado/{certificate.id}")
+        attachment = {}
 
-def send_certificate_by_email(certificate: Certificate, destination_user: User):
-    """Envia certificado por email"""
-    try:
-        msg = Message(
-            subject=f"Certificado de Participação - {certificate.event.title}",
-            sender=os.getenv("MAIL_USERNAME"),
-            recipients=[destination_user.email],
-            body=f"""
+    enqueue_email(
+        recipients=[destination_user.email],
+        subject=f"Certificado de Participação - {certificate.event.title}",
+        body=f"""
             Olá {destination_user.name},
-            
-            Segue em anexo seu certificado de participação do evento "{certificate.event.title}".
-            
+
+            {delivery}
+
             Parabéns pela participação!
-            
+
             Atenciosamente,
             Sistema Event Anexus
-            """
-        )
+            """,
+        commit=commit,
+        **attachment
+    )
+
 
+def _certificate_attachment(certificate_id: int) -> tuple[str, bytes]:
+    """(chave, conteúdo) do PDF do certificado, renderizado no primeiro envio se ainda não existir"""
+    from services.certificate_service import CertificateService
+
+    certificate = db.session.get(Certificate, certificate_id)
+    if certificate is None:
+        raise FileNotFoundError(f"Certificado {certificate_id} não encontrado")
+
+    # O commit fica com process_outbox, junto com o status dos emails do lote
+    key = CertificateService.ensure_certificate_file(certificate, commit=False)
+    return key, get_storage().read(key)
+
+
+def _build_message(email: EmailOutbox) -> Message:
+    msg = Message(
+        subject=email.subject,
+        sender=os.getenv("MAIL_USERNAME"),
+        recipients=email.recipients,
+        body=email.body
+    )
+
+    attachment = None
+    if email.certificate_id is not None:
+        attachment = _certificate_attachment(email.certificate_id)
+    elif email.attachment_path:
+        with open(email.attachment_path, 'rb') as f:
+            attachment = (email.attachment_path, f.read())
+
+    if attachment:
         # Anexar PDF
-        with open(certificate.certificate_path, 'rb') as f:
-            msg.attach(
-                filename=f"certificado_{certificate.event.title}.pdf",
-                content_type="application/pdf",
-                data=f.read()
-            )
-
-        mail.send(msg)
-    except Exception as e:
-        current_app.logger.error(f"Erro ao enviar certificado por email: {str(e)}")
-        raise BadRequestException(
-            details=[{"email": "Erro ao enviar certificado por email"}])
+        name, data = attachment
+        msg.attach(
+            filename=email.attachment_filename or os.path.basename(name),
+            content_type="application/pdf",
+            data=data
+        )
+
+    return msg
+
+
+# Erros da conexão (não da mensagem): a conexão é descartada e o envio repetido
+_CONNECTION_ERRORS = (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError,
+                      smtplib.SMTPHeloError, ConnectionError, TimeoutError)
+
+
+class _PooledConnection:
+    """Conexão SMTP do Flask-Mail que é reaberta após max_per_connection envios ou falhas"""
+
+    def __init__(self, max_per_connection: int):
+        self.max_per_connection = max_per_connection
+        self._connection = None
+        self._sent = 0
+
+    def send(self, message: Message):
+        if self._connection is None or self._sent >= self.max_per_connection:
+            self.close()
+            self._connection = mail.connect().__enter__()
+            self._sent = 0
+
+        self._connection.send(message)
+        self._sent += 1
+
+    def close(self):
+        if self._connection is not None:
+            try:
+                self._connection.__exit__(None, None, None)
+            except Exception:
+                pass  # Conexão já caiu: nada a encerrar
+        self._connection = None
+
+
+def send_messages_batch(messages: list[Message], connections: int = None,
+                        max_per_connection: int = None, retries: int = 1) -> list:
+    """
+    Envia as mensagens reutilizando conexões SMTP persistentes, em vez de uma
+    conexão (e um handshake TLS) por mensagem. Usa até `connections` conexões
+    em paralelo (uma por thread), cada uma reaberta após `max_per_connection`
+    mensagens. Em erro de conexão reconecta e repete a mensagem até `retries`
+    vezes; se não for possível conectar, o restante do lote falha com o mesmo erro.
+
+    Retorna uma lista alinhada com `messages`: None para enviada ou a exceção.
+    """
+    if connections is None:
+        connections = current_app.config.get("EMAIL_BATCH_CONNECTIONS", 2)
+    if max_per_connection is None:
+        max_per_connection = current_app.config.get("EMAIL_BATCH_MAX_PER_CONNECTION", 100)
+
+    results = [None] * len(messages)
+    pending = iter(range(len(messages)))
+    lock = threading.Lock()
+    abort = []
+    app = current_app._get_current_object()
+
+    def next_index():
+        with lock:
+            if abort:
+                return None
+            return next(pending, None)
+
+    def deliver():
+        connection = _PooledConnection(max_per_connection)
+        with app.app_context():
+            try:
+                while (index := next_index()) is not None:
+                    for attempt in range(retries + 1):
+                        try:
+                            connection.send(messages[index])
+                            results[index] = None
+                            break
+                        except _CONNECTION_ERRORS as e:
+                            connection.close()
+                            results[index] = e
+                        except Exception as e:
+                            results[index] = e
+                            break
+
+                    if results[index] is not None and connection._connection is None:
+                        # Nem a reconexão funcionou: servidor indisponível
+                        with lock:
+                            abort.append(results[index])
+            finally:
+                connection.close()
+
+    workers = max(1, min(connections, len(messages)))
+    if workers == 1:
+        deliver()
+    else:
+        threads = [threading.Thread(target=deliver, daemon=True) for _ in range(workers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    if abort:
+        # Mensagens que nenhuma thread chegou a tentar
+        for index in pending:
+            results[index] = abort[0]
+
+    return results
+
+
+def _claim_batch(batch_size: int) -> list[EmailOutbox]:
+    """
+    Reserva até batch_size emails vencidos com um único UPDATE condicional,
+    para que workers concorrentes não enviem a mesma mensagem. Reservas mais
+    antigas que EMAIL_OUTBOX_CLAIM_TIMEOUT (worker que morreu) são retomadas.
+    """
+    now = datetime.now()
+    token = uuid.uuid4().hex
+    stale = now - timedelta(seconds=current_app.config.get("EMAIL_OUTBOX_CLAIM_TIMEOUT", 300))
+
+    due = db.session.query(EmailOutbox.id).filter(
+        db.or_(
+            db.and_(EmailOutbox.status == EmailStatus.PENDING,
+                    EmailOutbox.next_attempt_at <= now),
+            db.and_(EmailOutbox.status == EmailStatus.SENDING,
+                    EmailOutbox.claimed_at < stale)
+        )
+    ).order_by(EmailOutbox.next_attempt_at, EmailOutbox.id).limit(batch_size).scalar_subquery()
+
+    db.session.execute(
+        db.update(EmailOutbox).where(EmailOutbox.id.in_(due)).values(
+            status=EmailStatus.SENDING, claimed_at=now, claim_token=token
+        ).execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+
+    return EmailOutbox.query.filter_by(claim_token=token).order_by(EmailOutbox.id).all()
+
+
+def _record_failure(email: EmailOutbox, error: Exception) -> bool:
+    """Agenda nova tentativa com backoff exponencial; retorna True se foi para a dead letter"""
+    max_attempts = current_app.config.get("EMAIL_OUTBOX_MAX_ATTEMPTS", 5)
+    backoff = current_app.config.get("EMAIL_OUTBOX_BACKOFF_SECONDS", 30)
+    max_backoff = current_app.config.get("EMAIL_OUTBOX_MAX_BACKOFF_SECONDS", 3600)
+
+    email.attempts += 1
+    email.last_error = str(error)[:1000]
+    email.claimed_at = None
+    email.claim_token = None
+
+    if email.attempts >= max_attempts:
+        email.status = EmailStatus.DEAD
+        current_app.logger.error(
+            f"Email {email.id} movido para a dead letter após {email.attempts} tentativas: {error}")
+        return True
+
+    email.status = EmailStatus.PENDING
+    email.next_attempt_at = datetime.now() + timedelta(
+        seconds=min(backoff * 2 ** (email.attempts - 1), max_backoff))
+    current_app.logger.warning(
+        f"Falha ao enviar email {email.id} (tentativa {email.attempts}): {error}")
+    return False
+
+
+def process_outbox(batch_size: int = None) -> dict:
+    """
+    Envia um lote de emails pendentes da fila com send_messages_batch
+    (conexões SMTP reutilizadas). Falhas são reagendadas com backoff
+    exponencial e, após EMAIL_OUTBOX_MAX_ATTEMPTS tentativas, vão para a
+    dead letter (status DEAD).
+    Retorna {"claimed", "sent", "failed", "dead"}.
+    """
+    if batch_size is None:
+        batch_size = current_app.config.get("EMAIL_OUTBOX_BATCH_SIZE", 50)
+
+    emails = _claim_batch(batch_size)
+    stats = {"claimed": len(emails), "sent": 0, "failed": 0, "dead": 0}
+    if not emails:
+        return stats
+
+    def fail(email, error):
+        if _record_failure(email, error):
+            stats["dead"] += 1
+        else:
+            stats["failed"] += 1
+
+    # Falhas ao montar a mensagem (ex.: anexo removido) não chegam ao SMTP
+    ready, messages = [], []
+    for email in emails:
+        try:
+            messages.append(_build_message(email))
+            ready.append(email)
+        except Exception as e:
+            fail(email, e)
+
+    results = send_messages_batch(messages) if messages else []
+
+    for email, error in zip(ready, results):
+        if error is not None:
+            fail(email, error)
+            continue
+
+        email.status = EmailStatus.SENT
+        email.sent_at = datetime.now()
+        email.claimed_at = None
+        email.claim_token = None
+        stats["sent"] += 1
+
+    db.session.commit()
+    return stats
+
+
+def drain_outbox(batch_size: int = None, max_batches: int = None) -> dict:
+    """Processa lotes até a fila de emails vencidos esvaziar (ou max_batches)"""
+    if batch_size is None:
+        batch_size = current_app.config.get("EMAIL_OUTBOX_BATCH_SIZE", 50)
+
+    totals = {"claimed": 0, "sent": 0, "failed": 0, "dead": 0}
+    batches = 0
+
+    while max_batches is None or batches < max_batches:
+        stats = process_outbox(batch_size)
+        for key in totals:
+            totals[key] += stats[key]
+        batches += 1
+
+        # Fila vazia, ou nenhum envio bem-sucedido (SMTP indisponível): para
+        if stats["claimed"] < batch_size or stats["sent"] == 0:
+            break
+
+    return totals
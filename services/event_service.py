@@ -1,15 +1,30 @@
 from flask_jwt_extended import current_user
 from domain import Event, EventType, User, event_participants, EventFilterDTO
+from domain.dtos.event_filter_dto import ORDERABLE_FIELDS
 from app import db
 from exceptions import BadRequestException, NotFoundException
 from exceptions.business_exceptions import UnauthorizedException
 from datetime import datetime
+from sqlalchemy import exists, func, or_, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.exc import IntegrityError
 from utils import parse_integrity_error
+from utils.pagination import decode_cursor, encode_cursor
 
 
 def list_events(user, filter: EventFilterDTO) -> list[Event]:
     """ Lista eventos criados pelo organizador, com filtros opcionais"""
+    return _organizer_events_query(user, filter).all()
+
+
+def list_events_page(user, filter: EventFilterDTO, limit: int, cursor: str = None) -> tuple[list[Event], str]:
+    """ Lista uma página (keyset) dos eventos criados pelo organizador"""
+    filter = _pagination_filter(filter)
+    query = _organizer_events_query(user, filter)
+    return _paginate(query, filter, limit, cursor, lambda event: event)
+
+
+def _organizer_events_query(user, filter: EventFilterDTO):
     query = Event.query.filter_by(
         created_by=user.id,
         active=True
@@ -20,15 +35,41 @@ def list_events(user, filter: EventFilterDTO) -> list[Event]:
             filter.created_by = None  # Ignorar filtro created_by para organizadores
         query = filter.build_filters(query)
 
-    return query.all()
+    return query
 
 
 def list_available_events(filter: EventFilterDTO) -> list[dict]:
-    """ Lista eventos futuros com inscrições abertas"""
+    """ Lista eventos futuros com inscrições abertas
+
+    Vagas restantes vêm do contador desnormalizado Event.enrolled_count e a
+    participação do usuário é calculada na mesma consulta (EXISTS
+    correlacionado), evitando N+1.
+    """
+    rows = _available_events_query(filter).all()
+    return [_available_event_to_dict(*row) for row in rows]
+
+
+def list_available_events_page(filter: EventFilterDTO, limit: int, cursor: str = None) -> tuple[list[dict], str]:
+    """ Lista uma página (keyset) dos eventos futuros com inscrições abertas"""
+    filter = _pagination_filter(filter)
+    query = _available_events_query(filter)
+    rows, next_cursor = _paginate(query, filter, limit, cursor, lambda row: row[0])
+    return [_available_event_to_dict(*row) for row in rows], next_cursor
+
+
+def _available_events_query(filter: EventFilterDTO):
     now = datetime.now()
 
-    query = Event.query
-    query = query.filter(
+    is_participant = exists().where(
+        event_participants.c.event_id == Event.id,
+        event_participants.c.user_id == current_user.id,
+        event_participants.c.active == True
+    ).correlate(Event)
+
+    query = db.session.query(
+        Event,
+        is_participant
+    ).filter(
         Event.active == True,
         Event.date >= now
     )
@@ -36,32 +77,66 @@ def list_available_events(filter: EventFilterDTO) -> list[dict]:
     if filter:
         query = filter.build_filters(query)
 
-    events = query.all()
+    return query
 
-    result = []
-    for event in events:
-        enrolled_count = db.session.query(event_participants).filter_by(
-            event_id=event.id,
-            active=True
-        ).count()
 
-        remaining_slots = None
-        if event.capacity:
-            remaining_slots = event.capacity - enrolled_count
+def _available_event_to_dict(event: Event, participant: bool) -> dict:
+    event_dict = event.to_dict()
+    event_dict['enrolled_count'] = event.enrolled_count
+    event_dict['remaining_slots'] = _remaining_slots(event)
+    event_dict['is_participant'] = bool(participant)
 
-        is_participant = db.session.query(event_participants).filter_by(
-            event_id=event.id,
-            user_id=current_user.id,
-            active=True
-        ).first() is not None
+    return event_dict
 
-        event_dict = event.to_dict()
-        event_dict['remaining_slots'] = remaining_slots
-        event_dict['is_participant'] = is_participant
 
-        result.append(event_dict)
+def _remaining_slots(event: Event):
+    if event.capacity:
+        return event.capacity - event.enrolled_count
+    return None
 
-    return result
+
+def _pagination_filter(filter: EventFilterDTO) -> EventFilterDTO:
+    """Garante uma ordenação determinística para a paginação por cursor"""
+    filter = filter or EventFilterDTO()
+    if filter.order_by == 'relevance':
+        if not filter.q:
+            raise BadRequestException(
+                details=[{"order_by": "A ordenação por relevância exige o parâmetro q."}])
+    elif filter.order_by not in ORDERABLE_FIELDS:
+        raise BadRequestException(
+            details=[{"order_by": f"Ordenação inválida. Use: {', '.join(ORDERABLE_FIELDS + ['relevance'])}."}])
+    if filter.order_direction != 'desc':
+        filter.order_direction = 'asc'
+    return filter
+
+
+def _paginate(query, filter: EventFilterDTO, limit: int, cursor: str, get_event) -> tuple[list, str]:
+    """
+    Aplica paginação keyset: filtra a partir do cursor e busca limit + 1
+    registros para saber se existe próxima página. Na ordenação por
+    relevância o rank bm25 é selecionado junto, para montar o cursor.
+    """
+    if cursor:
+        query = filter.apply_cursor(query, decode_cursor(cursor))
+
+    rank = filter.search_rank if filter.order_by == 'relevance' else None
+    if rank is not None:
+        single_entity = len(query.column_descriptions) == 1
+        query = query.add_columns(rank.label("search_rank"))
+
+    rows = query.limit(limit + 1).all()
+
+    ranks = [None] * len(rows)
+    if rank is not None:
+        ranks = [row[-1] for row in rows]
+        rows = [row[0] if single_entity else tuple(row[:-1]) for row in rows]
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(filter.build_cursor(get_event(rows[-1]), ranks[limit - 1]))
+
+    return rows, next_cursor
 
 
 def get_by_id(event_id) -> Event:
@@ -75,20 +150,11 @@ def get_public_event_details(event_id: int) -> dict:
     event = get_by_id(event_id)
     user: User = current_user
 
-    enrolled_count = db.session.query(event_participants).filter_by(
-        event_id=event_id,
-        active=True
-    ).count()
-
-    remaining_slots = None
-    is_full = False
-
-    if event.capacity:
-        remaining_slots = event.capacity - enrolled_count
-        is_full = remaining_slots <= 0
+    remaining_slots = _remaining_slots(event)
+    is_full = remaining_slots is not None and remaining_slots <= 0
 
     event_dict = event.to_dict()
-    event_dict['enrolled_count'] = enrolled_count
+    event_dict['enrolled_count'] = event.enrolled_count
     event_dict['remaining_slots'] = remaining_slots
     event_dict['is_full'] = is_full
     event_dict['is_past'] = event.date < datetime.now()
@@ -180,56 +246,47 @@ def deleteAllByUser(user_id: int) -> None:
 
 
 def enroll_user(event_id: int, user: User) -> None:
-    event = get_by_id(event_id)
-
-    if event.date < datetime.now():
-        raise BadRequestException(
-            details=[{"event": "Não é possível se inscrever em eventos passados."}])
-
-    existing_active = db.session.query(event_participants).filter_by(
-        event_id=event_id,
-        user_id=user.id,
-        active=True
-    ).first()
-
-    if existing_active:
-        raise BadRequestException(
-            details=[{"enrollment": "Você já está inscrito neste evento."}])
-
-    existing_inactive = db.session.query(event_participants).filter_by(
-        event_id=event_id,
-        user_id=user.id,
-        active=False
-    ).first()
-
-    if event.capacity:
-        enrolled_count = db.session.query(event_participants).filter_by(
-            event_id=event_id,
-            active=True
-        ).count()
-
-        if enrolled_count >= event.capacity:
-            raise BadRequestException(
-                details=[{"event": "Este evento está lotado."}])
+    """
+    Inscreve o usuário com escritas condicionais em uma única transação:
+    1. upsert da inscrição (só reativa se estiver inativa);
+    2. incremento do contador somente se o evento está ativo, é futuro e
+       ainda há vagas.
+    Se qualquer um dos passos não afetar linhas, a transação é desfeita e o
+    motivo é diagnosticado. Como o incremento é verificado e aplicado no mesmo
+    comando, inscrições concorrentes não ultrapassam a capacidade.
+    """
+    now = datetime.now()
 
     try:
-        if existing_inactive:
-            stmt = event_participants.update().where(
-                (event_participants.c.event_id == event_id)
-                & (event_participants.c.user_id == user.id)
-            ).values(
-                active=True,
-                registered_at=datetime.now()
-            )
-            db.session.execute(stmt)
-        else:
-            stmt = event_participants.insert().values(
+        enrolled = db.session.execute(
+            sqlite_insert(event_participants).values(
                 user_id=user.id,
                 event_id=event_id,
-                registered_at=datetime.now(),
+                registered_at=now,
                 active=True
+            ).on_conflict_do_update(
+                index_elements=[event_participants.c.user_id,
+                                event_participants.c.event_id],
+                set_={"active": True, "registered_at": now},
+                where=event_participants.c.active == False
+            )
+        ).rowcount
+
+        seat_taken = enrolled and db.session.execute(
+            db.update(Event)
+            .where(
+                Event.id == event_id,
+                Event.active == True,
+                Event.date >= now,
+                or_(Event.capacity.is_(None), Event.enrolled_count < Event.capacity)
             )
-            db.session.execute(stmt)
+            .values(enrolled_count=Event.enrolled_count + 1)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+
+        if not seat_taken:
+            db.session.rollback()
+            _raise_enrollment_error(event_id, user)
 
         db.session.commit()
     except IntegrityError as e:
@@ -240,28 +297,51 @@ def enroll_user(event_id: int, user: User) -> None:
         raise
 
 
-def cancel_enrollment(event_id: int, user: User) -> None:
+def _raise_enrollment_error(event_id: int, user: User) -> None:
+    """Identifica por que a inscrição não foi aplicada (somente no caminho de falha)"""
     event = get_by_id(event_id)
 
     if event.date < datetime.now():
         raise BadRequestException(
-            details=[{"event": "Não é possível cancelar inscrição em eventos passados."}])
+            details=[{"event": "Não é possível se inscrever em eventos passados."}])
 
-    enrollment = db.session.query(event_participants).filter_by(
+    existing_active = db.session.query(event_participants).filter_by(
         event_id=event_id,
         user_id=user.id,
         active=True
     ).first()
 
-    if not enrollment:
-        raise NotFoundException("Você não está inscrito neste evento.")
+    if existing_active:
+        raise BadRequestException(
+            details=[{"enrollment": "Você já está inscrito neste evento."}])
+
+    raise BadRequestException(
+        details=[{"event": "Este evento está lotado."}])
+
+
+def cancel_enrollment(event_id: int, user: User) -> None:
+    event = get_by_id(event_id)
+
+    if event.date < datetime.now():
+        raise BadRequestException(
+            details=[{"event": "Não é possível cancelar inscrição em eventos passados."}])
 
     try:
-        stmt = event_participants.update().where(
-            event_participants.c.event_id == event_id,
-            event_participants.c.user_id == user.id
-        ).values(active=False)
-        db.session.execute(stmt)
+        # Só desativa (e decrementa) se a inscrição ainda estiver ativa, evitando
+        # decremento duplo em cancelamentos concorrentes
+        cancelled = db.session.execute(
+            event_participants.update().where(
+                event_participants.c.event_id == event_id,
+                event_participants.c.user_id == user.id,
+                event_participants.c.active == True
+            ).values(active=False)
+        ).rowcount
+
+        if not cancelled:
+            db.session.rollback()
+            raise NotFoundException("Você não está inscrito neste evento.")
+
+        _increment_enrolled_count(event_id, -1)
         db.session.commit()
     except Exception as e:
         db.session.rollback()
@@ -281,17 +361,8 @@ def list_user_enrollments(user: User) -> list[dict]:
 
     result = []
     for event in events:
-        enrolled_count = db.session.query(event_participants).filter_by(
-            event_id=event.id,
-            active=True
-        ).count()
-
-        remaining_slots = None
-        if event.capacity:
-            remaining_slots = event.capacity - enrolled_count
-
         event_dict = event.to_dict()
-        event_dict['remaining_slots'] = remaining_slots
+        event_dict['remaining_slots'] = _remaining_slots(event)
 
         # Buscar certificado se o evento já passou
         certificate_id = None
@@ -312,6 +383,56 @@ def list_user_enrollments(user: User) -> list[dict]:
     return result
 
 
+def _increment_enrolled_count(event_id: int, delta: int) -> None:
+    """Atualiza o contador de inscritos na mesma transação da inscrição"""
+    db.session.execute(
+        db.update(Event)
+        .where(Event.id == event_id)
+        .values(enrolled_count=Event.enrolled_count + delta)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def reconcile_enrolled_counts(fix: bool = True) -> list[dict]:
+    """
+    Compara Event.enrolled_count com a contagem real de inscrições ativas.
+    Args:
+        fix (bool): Se True, corrige os contadores divergentes.
+    Returns:
+        list[dict]: Eventos divergentes com o valor armazenado e o real.
+    """
+    actual = select(
+        func.count(event_participants.c.id)
+    ).where(
+        event_participants.c.event_id == Event.id,
+        event_participants.c.active == True
+    ).correlate(Event).scalar_subquery()
+
+    rows = db.session.query(Event.id, Event.enrolled_count, actual).filter(
+        Event.enrolled_count != actual
+    ).all()
+
+    drift = [
+        {"event_id": event_id, "stored": stored, "actual": real}
+        for event_id, stored, real in rows
+    ]
+
+    if fix and drift:
+        try:
+            db.session.execute(
+                db.update(Event)
+                .where(Event.id.in_([d["event_id"] for d in drift]))
+                .values(enrolled_count=actual)
+                .execution_options(synchronize_session=False)
+            )
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            raise
+
+    return drift
+
+
 def list_event_participants(event_id: int, organizer_id: int) -> list[User]:
     """Lista participantes de um evento (apenas para organizador)"""
     event = get_by_id(event_id)
@@ -0,0 +1,26 @@
+from datetime import datetime
+from app import db
+from domain.models import JobState
+
+
+def get_watermark(name: str) -> datetime | None:
+    """Marca d'água persistida do job (None se o job nunca rodou)"""
+    return db.session.query(JobState.watermark).filter(JobState.name == name).scalar()
+
+
+def set_watermark(name: str, watermark: datetime, commit: bool = True) -> None:
+    """Grava a marca d'água do job, criando o estado na primeira execução"""
+    state = db.session.get(JobState, name)
+    if state is None:
+        state = JobState(name=name)
+        db.session.add(state)
+
+    state.watermark = watermark
+    state.updated_at = datetime.now()
+
+    if commit:
+        try:
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
@@ -0,0 +1,103 @@
+"""
+Pub/sub em memória das notificações, usado pelo stream SSE (/notifications/stream).
+
+Cada conexão SSE é uma assinatura com sua própria fila; quem publica
+(notification_service) apenas coloca eventos nas filas dos assinantes do
+usuário, sem criar threads. As filas usam `queue.Queue`, portanto com
+gevent (monkey patching) a espera do stream é cooperativa e cada cliente
+ocioso custa um greenlet, não uma thread.
+
+O hub é por processo: notificações criadas em outro processo (ex.: o job
+de certificados) chegam ao cliente pela sincronização com o banco feita a
+cada heartbeat, ou pelo Last-Event-ID ao reconectar.
+"""
+import queue
+import threading
+from collections import defaultdict
+
+
+# Evento que pede ao stream para buscar no banco as notificações novas
+SYNC = "sync"
+
+
+class Subscription:
+    """Assinatura de uma conexão SSE de um usuário"""
+
+    def __init__(self, user_id: int, maxsize: int):
+        self.user_id = user_id
+        self.queue = queue.Queue(maxsize=maxsize)
+
+    def put(self, event: tuple) -> None:
+        try:
+            self.queue.put_nowait(event)
+        except queue.Full:
+            # Cliente lento: descarta a fila e pede uma sincronização com o banco
+            self.clear()
+            self.queue.put_nowait((SYNC, None))
+
+    def clear(self) -> None:
+        try:
+            while True:
+                self.queue.get_nowait()
+        except queue.Empty:
+            pass
+
+    def get(self, timeout: float):
+        """Próximo evento (tipo, dados) ou None se nada chegar dentro do timeout"""
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class NotificationHub:
+    """Registro das assinaturas por usuário"""
+
+    def __init__(self, queue_size: int = 100):
+        self.queue_size = queue_size
+        self._subscriptions = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def subscribe(self, user_id: int, max_clients: int = None) -> Subscription | None:
+        """Cria uma assinatura; retorna None se o limite de conexões do processo foi atingido"""
+        with self._lock:
+            if max_clients is not None and self._count() >= max_clients:
+                return None
+
+            subscription = Subscription(user_id, self.queue_size)
+            self._subscriptions[user_id].add(subscription)
+            return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.user_id)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._subscriptions[subscription.user_id]
+
+    def has_subscribers(self, user_id: int) -> bool:
+        with self._lock:
+            return user_id in self._subscriptions
+
+    def subscribed_users(self) -> set[int]:
+        with self._lock:
+            return set(self._subscriptions)
+
+    def publish(self, user_id: int, event_type: str, data=None) -> None:
+        """Entrega o evento a todas as conexões abertas do usuário"""
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(user_id, ()))
+
+        for subscription in subscriptions:
+            subscription.put((event_type, data))
+
+    def connection_count(self) -> int:
+        with self._lock:
+            return self._count()
+
+    def _count(self) -> int:
+        return sum(len(subscriptions) for subscriptions in self._subscriptions.values())
+
+
+notification_hub = NotificationHub()
@@ -1,9 +1,17 @@
+import json
+import time
+from collections import Counter
+from flask import current_app
+from sqlalchemy import and_, bindparam, false, func, literal, or_, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.exc import IntegrityError
 from app import db, current_user
-from domain.models import Notification
+from domain.models import Notification, NotificationArchive, User, event_participants
+from services.notification_hub import SYNC, notification_hub
 from utils import parse_integrity_error
-from datetime import datetime
-from exceptions import NotFoundException
+from utils.pagination import decode_cursor, encode_cursor
+from datetime import datetime, timedelta
+from exceptions import BadRequestException, NotFoundException
 
 
 def save_notification(notification: Notification) -> bool:
@@ -17,16 +25,135 @@ def save_notification(notification: Notification) -> bool:
 
     try:
         db.session.add(notification)
+        if not notification.is_read:
+            _increment_unread_counts({notification.user_id: 1})
         db.session.commit()
-        return True
     except IntegrityError as e:
         db.session.rollback()
         print(parse_integrity_error(e))
         return False
     except Exception as e:
+        db.session.rollback()
         print(f"Erro inesperado ao salvar notificação: {e}")
         return False
 
+    _publish_notifications([notification.to_dict()])
+    return True
+
+
+def save_notifications_bulk(notifications: list[Notification]) -> int:
+    """
+    Salva várias notificações com um único INSERT (executemany) e uma única transação.
+    Args:
+        notifications (list[Notification]): As notificações a serem salvas.
+    Returns:
+        int: Quantidade de notificações salvas (0 em caso de erro).
+    """
+    if not notifications:
+        return 0
+
+    now = datetime.now()
+    rows = [{
+        "user_id": notification.user_id,
+        "title": notification.title,
+        "message": notification.message,
+        "link": notification.link,
+        "created_at": notification.created_at or now,
+        "is_read": bool(notification.is_read),
+    } for notification in notifications]
+
+    # RETURNING das colunas (e não só do id) dispensa alinhar o resultado às linhas
+    stmt = db.insert(Notification).returning(*Notification.__table__.columns)
+
+    unread = Counter(row["user_id"] for row in rows if not row["is_read"])
+
+    try:
+        inserted = db.session.execute(stmt, rows).mappings().all()
+        _increment_unread_counts(unread)
+        db.session.commit()
+    except IntegrityError as e:
+        db.session.rollback()
+        print(parse_integrity_error(e))
+        return 0
+    except Exception as e:
+        db.session.rollback()
+        print(f"Erro inesperado ao salvar notificações em lote: {e}")
+        return 0
+
+    subscribed = notification_hub.subscribed_users()
+    if subscribed:
+        _publish_notifications([
+            _row_to_dict(row) for row in inserted if row["user_id"] in subscribed
+        ])
+
+    return len(rows)
+
+
+def notify_event_participants(event_id: int, title: str, message: str, link: str = None) -> int:
+    """
+    Cria a mesma notificação para todos os participantes ativos de um evento
+    com um único INSERT ... SELECT sobre event_participants, e incrementa o
+    contador de não lidas dos mesmos usuários com um único UPDATE.
+    Args:
+        event_id (int): ID do evento.
+        title (str): Título da notificação.
+        message (str): Mensagem da notificação.
+        link (str): Link opcional da notificação.
+    Returns:
+        int: Quantidade de notificações criadas.
+    """
+    participants = db.select(
+        event_participants.c.user_id,
+        literal(title),
+        literal(message),
+        literal(link),
+        literal(datetime.now()),
+        false()
+    ).join(
+        User, User.id == event_participants.c.user_id
+    ).where(
+        event_participants.c.event_id == event_id,
+        event_participants.c.active == True,
+        User.active == True
+    )
+
+    stmt = db.insert(Notification).from_select(
+        ["user_id", "title", "message", "link", "created_at", "is_read"],
+        participants
+    )
+
+    # Mesmo filtro do SELECT acima: os usuários que receberam a notificação
+    notified_users = db.update(User).where(
+        User.active == True,
+        User.id.in_(select(event_participants.c.user_id).where(
+            event_participants.c.event_id == event_id,
+            event_participants.c.active == True
+        ))
+    ).values(unread_count=User.unread_count + 1).execution_options(synchronize_session=False)
+
+    try:
+        result = db.session.execute(stmt)
+        if result.rowcount:
+            db.session.execute(notified_users)
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        print(f"Erro ao notificar participantes do evento {event_id}: {e}")
+        return 0
+
+    # As linhas vieram do INSERT ... SELECT: os streams abertos buscam no banco
+    subscribed = notification_hub.subscribed_users()
+    if subscribed:
+        notified = db.session.scalars(db.select(event_participants.c.user_id).where(
+            event_participants.c.event_id == event_id,
+            event_participants.c.active == True,
+            event_participants.c.user_id.in_(subscribed)
+        )).all()
+        for user_id in notified:
+            notification_hub.publish(user_id, SYNC)
+
+    return result.rowcount
+
 
 def get_user_notifications(unread: bool = False, since_date : datetime = None):
     """
@@ -37,35 +164,157 @@ def get_user_notifications(unread: bool = False, since_date : datetime = None):
     Returns:
         List[Notification]: Lista de notificações do usuário.
     """
-    q = Notification.query
-    q = q.filter_by(user_id=current_user.id)
+    q = _user_notifications_query(current_user.id, unread, since_date)
+    q = q.order_by(Notification.created_at.desc())
+    return q.all()
+
+
+def get_user_notifications_page(limit: int, cursor: str = None, unread: bool = False,
+                                since_date: datetime = None) -> tuple[list[Notification], str]:
+    """
+    Retorna uma página (keyset) das notificações do usuário atual, da mais
+    recente para a mais antiga, ordenada por (created_at, id).
+    Args:
+        limit (int): Tamanho da página.
+        cursor (str): Cursor retornado em next_cursor pela página anterior.
+        unread (bool): Se True, retorna apenas notificações não lidas.
+        since_date (datetime): Se fornecido, retorna notificações desde essa data.
+    Returns:
+        tuple[list[Notification], str]: A página e o cursor da próxima (ou None).
+    """
+    q = _user_notifications_query(current_user.id, unread, since_date)
+
+    if cursor:
+        created_at, last_id = _parse_page_cursor(decode_cursor(cursor))
+        q = q.filter(or_(
+            Notification.created_at < created_at,
+            and_(Notification.created_at == created_at, Notification.id < last_id)
+        ))
+
+    rows = q.order_by(Notification.created_at.desc(), Notification.id.desc()).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor({
+            "created_at": rows[-1].created_at.isoformat(),
+            "id": rows[-1].id
+        })
+
+    return rows, next_cursor
+
+
+def get_notifications_since(watermark: str, limit: int,
+                            unread: bool = False) -> tuple[list[Notification], str, bool]:
+    """
+    Modo delta: retorna, da mais antiga para a mais nova, as notificações
+    criadas depois da marca d'água informada. A marca d'água é o id da última
+    notificação vista (ids só crescem, ao contrário de created_at, que vem do
+    relógio de cada processo).
+    Args:
+        watermark (str): Marca d'água retornada pela listagem ou por uma chamada anterior.
+        limit (int): Quantidade máxima de notificações retornadas.
+        unread (bool): Se True, retorna apenas notificações não lidas.
+    Returns:
+        tuple[list[Notification], str, bool]: As notificações, a nova marca
+        d'água e se ainda há notificações depois dela.
+    """
+    last_id = _parse_watermark(watermark)
+
+    rows = _user_notifications_query(current_user.id, unread).filter(
+        Notification.id > last_id
+    ).order_by(Notification.id).limit(limit + 1).all()
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if rows:
+        last_id = rows[-1].id
+
+    return rows, encode_cursor({"id": last_id}), has_more
+
+
+def get_notifications_watermark() -> str:
+    """Marca d'água atual (id da notificação mais recente) do usuário atual"""
+    return encode_cursor({"id": _latest_notification_id(current_user.id)})
+
+
+def _user_notifications_query(user_id: int, unread: bool = False, since_date: datetime = None):
+    q = Notification.query.filter_by(user_id=user_id)
     if unread:
         q = q.filter_by(is_read=False)
     if since_date:
         q = q.filter(Notification.created_at >= since_date)
-    q = q.order_by(Notification.created_at.desc())
-    return q.all()
+    return q
+
+
+def _latest_notification_id(user_id: int) -> int:
+    return db.session.query(func.max(Notification.id)).filter(
+        Notification.user_id == user_id).scalar() or 0
+
+
+def _parse_page_cursor(cursor: dict) -> tuple[datetime, int]:
+    last_id = cursor.get("id")
+    if not isinstance(last_id, int) or not isinstance(cursor.get("created_at"), str):
+        raise BadRequestException(details=[{"cursor": "Cursor inválido."}])
+
+    try:
+        return datetime.fromisoformat(cursor["created_at"]), last_id
+    except ValueError:
+        raise BadRequestException(details=[{"cursor": "Cursor inválido."}])
+
+
+def _parse_watermark(watermark: str) -> int:
+    try:
+        last_id = decode_cursor(watermark).get("id")
+    except BadRequestException:
+        last_id = None
+
+    if not isinstance(last_id, int) or isinstance(last_id, bool):
+        raise BadRequestException(details=[{"since": "Marca d'água inválida."}])
+    return last_id
 
 
 def mark_notification_as_read(notification_id: int) -> bool:
     """
     Marca uma notificação como lida.
+    O UPDATE só altera a linha se ela ainda não estava lida, de forma que o
+    contador de não lidas é decrementado uma única vez mesmo com requisições
+    concorrentes.
     Args:
         notification_id (int): ID da notificação a ser marcada como lida.
     Returns:
         bool: True se a notificação foi marcada como lida com sucesso, False caso contrário.
     """
-    notification : Notification = Notification.query.filter_by(
-        id=notification_id,
-        user_id=current_user.id
-    ).first()
+    user_id = current_user.id
 
-    if not notification:
-        raise NotFoundException("Notificação não encontrada")
     try:
-        notification.is_read = True
+        updated = db.session.execute(
+            db.update(Notification)
+            .where(
+                Notification.id == notification_id,
+                Notification.user_id == user_id,
+                Notification.is_read == False
+            )
+            .values(is_read=True)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+
+        if not updated:
+            db.session.rollback()
+            exists = db.session.query(Notification.id).filter_by(
+                id=notification_id,
+                user_id=user_id
+            ).first()
+            if not exists:
+                raise NotFoundException("Notificação não encontrada")
+            return True
+
+        _decrement_unread_count(user_id, updated)
         db.session.commit()
+        _publish_unread_count(user_id)
         return True
+    except NotFoundException:
+        raise
     except IntegrityError as e:
         db.session.rollback()
         print(parse_integrity_error(e))
@@ -76,36 +325,384 @@ def mark_notification_as_read(notification_id: int) -> bool:
         return False
 
 
-def mark_all_notifications_as_read() -> int:
+def mark_all_notifications_as_read() -> dict:
     """
-    Marca todas as notificações do usuário atual como lidas.
+    Marca como lidas todas as notificações do usuário atual até a mais
+    recente no momento da chamada; notificações criadas durante a operação
+    continuam não lidas.
     Returns:
-        int: Número de notificações marcadas como lidas.
+        dict: {"updated": número de notificações marcadas como lidas,
+               "watermark": marca d'água da última notificação coberta}.
     """
+    user_id = current_user.id
+    last_id = _latest_notification_id(user_id)
+    result = {"updated": 0, "watermark": encode_cursor({"id": last_id})}
+
     try:
-        updated_count = Notification.query.filter_by(
-            user_id=current_user.id,
-            is_read=False
-        ).update({"is_read": True})
+        updated_count = Notification.query.filter(
+            Notification.user_id == user_id,
+            Notification.is_read == False,
+            Notification.id <= last_id
+        ).update({"is_read": True}, synchronize_session=False)
+        if updated_count:
+            _decrement_unread_count(user_id, updated_count)
         db.session.commit()
-        return updated_count
+        if updated_count:
+            _publish_unread_count(user_id)
+        result["updated"] = updated_count
     except IntegrityError as e:
         db.session.rollback()
         print(parse_integrity_error(e))
-        return 0
     except Exception as e:
         db.session.rollback()
         print(f"Erro ao marcar todas as notificações como lidas: {e}")
-        return 0
+
+    return result
 
 
 def count_unread_notifications() -> int:
     """
-    Conta o número de notificações não lidas do usuário atual.
+    Retorna o número de notificações não lidas do usuário atual, lido do
+    contador User.unread_count (consulta pela chave primária, sem COUNT).
     Returns:
         int: Número de notificações não lidas.
     """
-    return Notification.query.filter_by(
-        user_id=current_user.id,
-        is_read=False
-    ).count()
+    return _count_unread(current_user.id)
+
+
+def _count_unread(user_id: int) -> int:
+    return db.session.query(User.unread_count).filter(User.id == user_id).scalar() or 0
+
+
+def _increment_unread_counts(counts: dict) -> None:
+    """Soma {user_id: quantidade} aos contadores, na transação das notificações"""
+    if not counts:
+        return
+
+    users = User.__table__
+    db.session.execute(
+        users.update()
+        .where(users.c.id == bindparam("target_id"))
+        .values(unread_count=users.c.unread_count + bindparam("amount")),
+        [{"target_id": user_id, "amount": amount} for user_id, amount in counts.items()]
+    )
+
+
+def _decrement_unread_count(user_id: int, amount: int) -> None:
+    """Subtrai do contador sem deixá-lo negativo (caso já houvesse divergência)"""
+    _decrement_unread_counts({user_id: amount})
+
+
+def _decrement_unread_counts(counts: dict) -> None:
+    """Subtrai {user_id: quantidade} dos contadores, sem deixá-los negativos"""
+    if not counts:
+        return
+
+    users = User.__table__
+    db.session.execute(
+        users.update()
+        .where(users.c.id == bindparam("target_id"))
+        .values(unread_count=func.max(users.c.unread_count - bindparam("amount"), 0)),
+        [{"target_id": user_id, "amount": amount} for user_id, amount in counts.items()]
+    )
+
+
+def reconcile_unread_counts(fix: bool = True) -> list[dict]:
+    """
+    Compara User.unread_count com a contagem real de notificações não lidas.
+    Args:
+        fix (bool): Se True, corrige os contadores divergentes.
+    Returns:
+        list[dict]: Usuários divergentes com o valor armazenado e o real.
+    """
+    actual = select(
+        func.count(Notification.id)
+    ).where(
+        Notification.user_id == User.id,
+        Notification.is_read == False
+    ).correlate(User).scalar_subquery()
+
+    rows = db.session.query(User.id, User.unread_count, actual).filter(
+        User.unread_count != actual
+    ).all()
+
+    drift = [
+        {"user_id": user_id, "stored": stored, "actual": real}
+        for user_id, stored, real in rows
+    ]
+
+    if fix and drift:
+        try:
+            db.session.execute(
+                db.update(User)
+                .where(User.id.in_([d["user_id"] for d in drift]))
+                .values(unread_count=actual)
+                .execution_options(synchronize_session=False)
+            )
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+    return drift
+
+
+def apply_retention_policy(read_days: int = None, archive_days: int = None,
+                           batch_size: int = None, dry_run: bool = False) -> dict:
+    """
+    Aplica a política de retenção das notificações:
+    - notificações lidas mais antigas que read_days são apagadas;
+    - notificações não lidas mais antigas que archive_days são movidas para
+      notifications_archive e descontadas de User.unread_count.
+    Cada lote de até batch_size linhas é uma transação própria, de forma que o
+    lock de escrita do SQLite é liberado entre os lotes.
+    Args:
+        read_days (int): Idade mínima (dias) das lidas a apagar.
+        archive_days (int): Idade mínima (dias) das não lidas a arquivar.
+        batch_size (int): Linhas por lote.
+        dry_run (bool): Se True, apenas conta as notificações afetadas.
+    Returns:
+        dict: {"deleted", "archived", "batches", "elapsed_seconds", "dry_run"}.
+    """
+    config = current_app.config
+    if read_days is None:
+        read_days = config.get("NOTIFICATION_RETENTION_READ_DAYS", 90)
+    if archive_days is None:
+        archive_days = config.get("NOTIFICATION_RETENTION_ARCHIVE_DAYS", 180)
+    if batch_size is None:
+        batch_size = config.get("NOTIFICATION_RETENTION_BATCH_SIZE", 500)
+    pause = config.get("NOTIFICATION_RETENTION_BATCH_PAUSE_MS", 50) / 1000
+
+    started = time.perf_counter()
+    now = datetime.now()
+    read_cutoff = now - timedelta(days=read_days)
+    archive_cutoff = now - timedelta(days=archive_days)
+    metrics = {"deleted": 0, "archived": 0, "batches": 0, "dry_run": dry_run}
+
+    if dry_run:
+        metrics["deleted"] = _retention_candidates(True, read_cutoff).count()
+        metrics["archived"] = _retention_candidates(False, archive_cutoff).count()
+    else:
+        for step, key, cutoff in ((_delete_read_batch, "deleted", read_cutoff),
+                                  (_archive_unread_batch, "archived", archive_cutoff)):
+            while True:
+                selected, affected = step(cutoff, batch_size)
+                if not selected:
+                    break
+                metrics[key] += affected
+                metrics["batches"] += 1
+                if selected < batch_size:
+                    break
+                if pause:
+                    time.sleep(pause)  # Deixa outros escritores usarem o banco entre os lotes
+
+    metrics["elapsed_seconds"] = round(time.perf_counter() - started, 3)
+    current_app.logger.info(
+        f"Retenção de notificações{' (dry-run)' if dry_run else ''}: "
+        f"{metrics['deleted']} apagada(s), {metrics['archived']} arquivada(s) "
+        f"em {metrics['batches']} lote(s) e {metrics['elapsed_seconds']}s")
+    return metrics
+
+
+def _retention_candidates(is_read: bool, cutoff: datetime):
+    return db.session.query(Notification.id).filter(
+        Notification.is_read == is_read,
+        Notification.created_at < cutoff
+    )
+
+
+def _delete_read_batch(cutoff: datetime, batch_size: int) -> tuple[int, int]:
+    """Apaga um lote de notificações lidas; retorna (selecionadas, apagadas)"""
+    ids = _retention_candidates(True, cutoff).order_by(
+        Notification.created_at).limit(batch_size).scalar_subquery()
+
+    try:
+        deleted = db.session.execute(
+            db.delete(Notification)
+            .where(Notification.id.in_(ids))
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+    return deleted, deleted
+
+
+def _archive_unread_batch(cutoff: datetime, batch_size: int) -> tuple[int, int]:
+    """Move um lote de notificações não lidas para o arquivo; retorna (selecionadas, arquivadas)"""
+    ids = [row.id for row in _retention_candidates(False, cutoff).order_by(
+        Notification.created_at).limit(batch_size)]
+    if not ids:
+        return 0, 0
+
+    try:
+        # Apenas as que continuam não lidas: uma notificação lida entre a
+        # seleção e o lote fica para a regra das lidas
+        unread_rows = db.session.execute(db.select(
+            Notification.id, Notification.user_id
+        ).where(
+            Notification.id.in_(ids),
+            Notification.is_read == False
+        )).all()
+        archived_ids = [row.id for row in unread_rows]
+
+        rows = db.select(
+            Notification.id,
+            Notification.user_id,
+            Notification.title,
+            Notification.message,
+            Notification.link,
+            Notification.created_at,
+            literal(datetime.now())
+        ).where(Notification.id.in_(archived_ids))
+
+        # Ids já arquivados (ex.: nova execução após uma falha) não abortam o lote
+        db.session.execute(sqlite_insert(NotificationArchive).from_select(
+            ["id", "user_id", "title", "message", "link", "created_at", "archived_at"], rows
+        ).on_conflict_do_nothing(index_elements=["id"]))
+
+        db.session.execute(
+            db.delete(Notification)
+            .where(Notification.id.in_(archived_ids))
+            .execution_options(synchronize_session=False)
+        )
+        unread = Counter(row.user_id for row in unread_rows)
+        _decrement_unread_counts(unread)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+    for user_id in unread:
+        _publish_unread_count(user_id)
+
+    return len(ids), len(archived_ids)
+
+
+def _row_to_dict(row) -> dict:
+    """Equivalente a Notification.to_dict para uma linha retornada pelo banco"""
+    return {
+        "id": row["id"],
+        "user_id": row["user_id"],
+        "title": row["title"],
+        "message": row["message"],
+        "created_at": row["created_at"].isoformat() if row["created_at"] else None,
+        "is_read": row["is_read"],
+        "link": row["link"]
+    }
+
+
+def _publish_notifications(notifications: list[dict]) -> None:
+    """Envia as notificações (dicts de to_dict) e o novo contador aos streams abertos"""
+    users = []
+    for notification in notifications:
+        if notification_hub.has_subscribers(notification["user_id"]):
+            notification_hub.publish(notification["user_id"], "notification", notification)
+            if notification["user_id"] not in users:
+                users.append(notification["user_id"])
+
+    for user_id in users:
+        _publish_unread_count(user_id)
+
+
+def _publish_unread_count(user_id: int) -> None:
+    if notification_hub.has_subscribers(user_id):
+        notification_hub.publish(user_id, "unread_count", {"unread_count": _count_unread(user_id)})
+
+
+def subscribe_notifications(user_id: int):
+    """
+    Abre uma assinatura do hub para o stream SSE do usuário.
+    Retorna None quando o limite de conexões do processo foi atingido.
+    """
+    return notification_hub.subscribe(
+        user_id, max_clients=current_app.config.get("NOTIFICATION_STREAM_MAX_CLIENTS", 500))
+
+
+def parse_last_event_id(value) -> int | None:
+    if value in (None, ""):
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise BadRequestException(details=[{"last_event_id": "Last-Event-ID inválido"}])
+
+
+def _sse(data, event: str, event_id: int = None) -> str:
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(data, ensure_ascii=False)}")
+    return "\n".join(lines) + "\n\n"
+
+
+def stream_notifications(subscription, last_event_id: int = None):
+    """
+    Gera os eventos SSE de uma assinatura:
+    - `notification` (id = id da notificação) para cada notificação nova;
+    - `unread_count` com o contador de não lidas (ao conectar e a cada mudança);
+    - comentários de heartbeat a cada NOTIFICATION_STREAM_HEARTBEAT segundos.
+
+    Com Last-Event-ID, reenvia as notificações posteriores a ele. A cada
+    heartbeat (e quando o hub pede) busca no banco as notificações com id maior
+    que a última enviada, o que cobre as criadas por outros processos. O stream
+    termina após NOTIFICATION_STREAM_MAX_SECONDS; o navegador reconecta sozinho
+    enviando o Last-Event-ID.
+    """
+    config = current_app.config
+    heartbeat = config.get("NOTIFICATION_STREAM_HEARTBEAT", 15)
+    deadline = time.monotonic() + config.get("NOTIFICATION_STREAM_MAX_SECONDS", 300)
+    user_id = subscription.user_id
+
+    def sync():
+        nonlocal last_id
+        notifications = Notification.query.filter(
+            Notification.user_id == user_id,
+            Notification.id > last_id
+        ).order_by(Notification.id).limit(config.get("NOTIFICATION_STREAM_REPLAY_LIMIT", 100)).all()
+
+        events = []
+        for notification in notifications:
+            events.append(_sse(notification.to_dict(), "notification", notification.id))
+            last_id = notification.id
+        if events:
+            events.append(_sse({"unread_count": _count_unread(user_id)}, "unread_count"))
+
+        # Encerra a transação de leitura: não segura a conexão enquanto o stream espera
+        db.session.rollback()
+        return events
+
+    try:
+        yield f"retry: {config.get('NOTIFICATION_STREAM_RETRY_MS', 3000)}\n\n"
+
+        if last_event_id is not None:
+            last_id = last_event_id
+            yield from sync()
+        else:
+            last_id = _latest_notification_id(user_id)
+
+        yield _sse({"unread_count": _count_unread(user_id)}, "unread_count")
+        db.session.rollback()
+
+        while (remaining := deadline - time.monotonic()) > 0:
+            event = subscription.get(timeout=min(heartbeat, remaining))
+
+            if event is None:
+                yield from sync()
+                yield ": heartbeat\n\n"
+                continue
+
+            event_type, data = event
+            if event_type == SYNC:
+                yield from sync()
+            elif event_type == "notification":
+                if data["id"] > last_id:
+                    last_id = data["id"]
+                    yield _sse(data, "notification", data["id"])
+            else:
+                yield _sse(data, event_type)
+    finally:
+        notification_hub.unsubscribe(subscription)
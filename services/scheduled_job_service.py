@@ -0,0 +1,210 @@
+import json
+from datetime import datetime, timedelta
+from sqlalchemy import or_
+
+from app import db
+from domain.models import ScheduledJob, JobRun, JobRunStatus
+
+
+# Política para execuções perdidas (processo parado, job anterior ainda rodando):
+# RUN_ONCE executa uma única vez ao retomar; SKIP registra SKIPPED e aguarda o próximo horário
+CATCH_UP_RUN_ONCE = "run_once"
+CATCH_UP_SKIP = "skip"
+CATCH_UP_POLICIES = (CATCH_UP_RUN_ONCE, CATCH_UP_SKIP)
+
+
+def _parse_daily_at(daily_at: str) -> tuple[int, int]:
+    hour, minute = daily_at.split(":")
+    return int(hour), int(minute)
+
+
+def compute_next_run(interval_seconds: int | None, daily_at: str | None,
+                     anchor: datetime, after: datetime) -> datetime:
+    """
+    Próxima execução estritamente depois de `after`, considerando todos os
+    gatilhos do job (o mais próximo vence). O intervalo é contado a partir de
+    `anchor` (o horário agendado anterior) e não do fim da execução, para que
+    os horários não deslizem com a duração dos jobs.
+    """
+    candidates = []
+
+    if interval_seconds:
+        if anchor > after:
+            candidates.append(anchor)
+        else:
+            steps = int((after - anchor).total_seconds() // interval_seconds) + 1
+            candidates.append(anchor + timedelta(seconds=steps * interval_seconds))
+
+    if daily_at:
+        hour, minute = _parse_daily_at(daily_at)
+        candidate = after.replace(hour=hour, minute=minute, second=0, microsecond=0)
+        if candidate <= after:
+            candidate += timedelta(days=1)
+        candidates.append(candidate)
+
+    return min(candidates)
+
+
+def register_job(name: str, interval_seconds: int | None = None, daily_at: str | None = None,
+                 catch_up: str = CATCH_UP_RUN_ONCE, now: datetime | None = None) -> ScheduledJob:
+    """
+    Cria ou atualiza a definição persistida do job. A próxima execução gravada
+    é mantida entre reinícios, e só é recalculada se o gatilho mudou.
+    Args:
+        name (str): Nome único do job.
+        interval_seconds (int | None): Executa a cada N segundos.
+        daily_at (str | None): Executa diariamente no horário "HH:MM".
+        catch_up (str): Política para execuções perdidas (CATCH_UP_POLICIES).
+    Returns:
+        ScheduledJob: Job persistido.
+    """
+    if not interval_seconds and not daily_at:
+        raise ValueError(f"Job {name} precisa de interval_seconds ou daily_at")
+    if catch_up not in CATCH_UP_POLICIES:
+        raise ValueError(f"Política de catch-up inválida: {catch_up}")
+    if daily_at:
+        hour, minute = _parse_daily_at(daily_at)
+        if not (0 <= hour < 24 and 0 <= minute < 60):
+            raise ValueError(f"Horário diário inválido: {daily_at}")
+
+    now = now or datetime.now()
+    job = db.session.get(ScheduledJob, name)
+
+    if job is None:
+        job = ScheduledJob(name=name)
+        db.session.add(job)
+        trigger_changed = True
+    else:
+        trigger_changed = (job.interval_seconds, job.daily_at) != (interval_seconds, daily_at)
+
+    job.interval_seconds = interval_seconds
+    job.daily_at = daily_at
+    job.catch_up = catch_up
+    if trigger_changed:
+        job.next_run_at = compute_next_run(interval_seconds, daily_at, now, now)
+
+    try:
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+    return job
+
+
+def claim_run(name: str, owner: str, now: datetime, timeout: int) -> datetime | None:
+    """
+    Reserva a execução vencida do job e já agenda a seguinte, com um UPDATE
+    condicional: só vale se ninguém reservou este mesmo horário e se não há
+    execução em andamento (ou ela passou de `timeout` segundos, dono morto).
+    Assim o mesmo job nunca roda em paralelo, nem entre processos.
+    Returns:
+        datetime | None: Horário agendado que foi reservado, ou None.
+    """
+    job = db.session.get(ScheduledJob, name)
+    if job is None or job.next_run_at > now:
+        return None
+
+    scheduled_for = job.next_run_at
+    next_run_at = compute_next_run(job.interval_seconds, job.daily_at, scheduled_for, now)
+
+    try:
+        claimed = db.session.execute(
+            db.update(ScheduledJob)
+            .where(
+                ScheduledJob.name == name,
+                ScheduledJob.next_run_at == scheduled_for,
+                or_(ScheduledJob.running_since.is_(None),
+                    ScheduledJob.running_since < now - timedelta(seconds=timeout))
+            )
+            .values(running_since=now, running_owner=owner, next_run_at=next_run_at)
+            .execution_options(synchronize_session=False)
+        ).rowcount == 1
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+    db.session.expire(job)
+    return scheduled_for if claimed else None
+
+
+def _json_safe(result):
+    """Converte o retorno do job para algo serializável em JSON (datas viram texto)"""
+    if result is None:
+        return None
+    return json.loads(json.dumps(result, default=str))
+
+
+def finish_run(name: str, owner: str, scheduled_for: datetime, started_at: datetime,
+               status: JobRunStatus, result=None, error: str | None = None,
+               history: int = 100) -> JobRun:
+    """
+    Libera a reserva do job, grava a execução no histórico e mantém apenas
+    as `history` execuções mais recentes do job.
+    """
+    finished_at = datetime.now()
+    duration = round((finished_at - started_at).total_seconds(), 3)
+
+    run = JobRun(
+        job_name=name,
+        scheduled_for=scheduled_for,
+        started_at=started_at,
+        finished_at=finished_at,
+        duration_seconds=duration,
+        status=status,
+        owner=owner,
+        result=_json_safe(result),
+        error=error
+    )
+
+    try:
+        db.session.add(run)
+        db.session.execute(
+            db.update(ScheduledJob)
+            .where(ScheduledJob.name == name, ScheduledJob.running_owner == owner)
+            .values(running_since=None, running_owner=None, last_run_at=started_at,
+                    last_status=status, last_duration_seconds=duration)
+            .execution_options(synchronize_session=False)
+        )
+        db.session.flush()
+
+        # Primeiro id fora das `history` mais recentes (NULL se ainda não há excesso)
+        oldest_kept = (
+            db.select(JobRun.id)
+            .where(JobRun.job_name == name)
+            .order_by(JobRun.id.desc())
+            .limit(1)
+            .offset(history)
+            .scalar_subquery()
+        )
+        db.session.execute(
+            db.delete(JobRun)
+            .where(JobRun.job_name == name, JobRun.id <= oldest_kept)
+            .execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+    return run
+
+
+def get_job(name: str) -> ScheduledJob | None:
+    return db.session.get(ScheduledJob, name)
+
+
+def list_jobs() -> list[ScheduledJob]:
+    return ScheduledJob.query.order_by(ScheduledJob.next_run_at).all()
+
+
+def get_job_runs(name: str, limit: int = 20) -> list[JobRun]:
+    """Execuções mais recentes do job"""
+    return (
+        JobRun.query
+        .filter(JobRun.job_name == name)
+        .order_by(JobRun.id.desc())
+        .limit(limit)
+        .all()
+    )
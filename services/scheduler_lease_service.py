@@ -0,0 +1,80 @@
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta
+from sqlalchemy import case, or_
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from app import db
+from domain.models import SchedulerLease
+
+
+def make_owner_id() -> str:
+    """Identificador único do processo dono de um lease (host:pid:aleatório)"""
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+def acquire_lease(name: str, owner: str, ttl: int) -> bool:
+    """
+    Adquire ou renova o lease `name` por `ttl` segundos com um único UPSERT
+    condicional: a linha só é gravada se o lease não existe, já pertence a
+    `owner` ou expirou. Assim, entre processos concorrentes no mesmo banco,
+    apenas um recebe True.
+    Args:
+        name (str): Nome do lease (ex.: "scheduler").
+        owner (str): Identificador do processo (make_owner_id).
+        ttl (int): Segundos até o lease expirar sem um novo heartbeat.
+    Returns:
+        bool: True se `owner` detém o lease após a chamada.
+    """
+    now = datetime.now()
+    expires_at = now + timedelta(seconds=ttl)
+
+    stmt = sqlite_insert(SchedulerLease).values(
+        name=name,
+        owner=owner,
+        acquired_at=now,
+        heartbeat_at=now,
+        expires_at=expires_at
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[SchedulerLease.name],
+        set_={
+            "owner": owner,
+            # Renovação mantém o instante da aquisição original
+            "acquired_at": case((SchedulerLease.owner == owner, SchedulerLease.acquired_at), else_=now),
+            "heartbeat_at": now,
+            "expires_at": expires_at,
+        },
+        where=or_(SchedulerLease.owner == owner, SchedulerLease.expires_at < now)
+    )
+
+    try:
+        acquired = db.session.execute(stmt).rowcount == 1
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+    return acquired
+
+
+def release_lease(name: str, owner: str) -> bool:
+    """Libera o lease se ele pertence a `owner`, para que outro processo assuma sem esperar a expiração"""
+    try:
+        released = db.session.execute(
+            db.delete(SchedulerLease).where(
+                SchedulerLease.name == name,
+                SchedulerLease.owner == owner
+            ).execution_options(synchronize_session=False)
+        ).rowcount == 1
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+    return released
+
+
+def get_lease(name: str) -> SchedulerLease | None:
+    return db.session.get(SchedulerLease, name)
@@ -9,6 +9,7 @@ from utils import parse_integrity_error
 import secrets
 from datetime import datetime, timedelta
 import services.event_service as event_service
+from auth.identity_cache import invalidate_user
 
 
 def find_user_by_id(id: int) -> User:
@@ -95,6 +96,9 @@ def change_user_password(token: str, new_password: str) -> None:
     user.password_reset_token = None
     user.password_reset_expires_at = None
 
+    # Redefinição de senha revoga os tokens já emitidos
+    user.token_version = (user.token_version or 0) + 1
+
     try:
         db.session.merge(user)
         db.session.commit()
@@ -102,6 +106,8 @@ def change_user_password(token: str, new_password: str) -> None:
         db.session.rollback()
         raise
 
+    invalidate_user(user.id)
+
 
 def list_users() -> list[User]:
     return User.query.filter_by(active=True).all()
@@ -146,6 +152,8 @@ def update_user(user: User) -> User:
         db.session.rollback()
         raise
 
+    invalidate_user(user.id)
+
     return user
 
 
@@ -172,6 +180,8 @@ def patch_password(current_password: str, new_password: str) -> None:
         db.session.rollback()
         raise
 
+    invalidate_user(user.id)
+
 
 def delete_user() -> None:
     user = current_user
@@ -179,6 +189,8 @@ def delete_user() -> None:
     db.session.merge(user)
     db.session.commit()
 
+    invalidate_user(user.id)
+
     event_service.deleteAllByUser(user.id)
 
     # TODO - Remover relacionamentos do usuário (Eventos, Convites, etc)
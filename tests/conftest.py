@@ -1,12 +1,18 @@
 import pytest
 import os
+import socket
+import time
 
 os.environ['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
 os.environ['TESTING'] = '1'
+# Os testes processam a fila de emails explicitamente
+os.environ['EMAIL_OUTBOX_WORKER_ENABLED'] = '0'
+# Nem o scheduler (lease em background sobre o banco em memória)
+os.environ['SCHEDULER_ENABLED'] = '0'
 
 
 @pytest.fixture(scope='function')
-def app():
+def app(tmp_path):
     """
     Cria uma instância da aplicação para testes com banco de dados EM MEMÓRIA.
 
@@ -16,7 +22,8 @@ def app():
     - Automaticamente destruído quando o teste termina
     - ZERO possibilidade de afetar o banco de produção
 
-    O banco de produção NUNCA é tocado pelos testes!
+    O banco de produção NUNCA é tocado pelos testes! Os PDFs também vão para
+    um diretório temporário, e não para instance/certificates.
     """
     from app import create_app, db
 
@@ -29,6 +36,7 @@ def app():
     test_app.config['WTF_CSRF_ENABLED'] = False
     test_app.config['PRESERVE_CONTEXT_ON_EXCEPTION'] = False
     test_app.config['SQLALCHEMY_ECHO'] = False
+    test_app.config['CERTIFICATE_STORAGE_PATH'] = str(tmp_path / 'certificates')
 
     with test_app.app_context():
         # Criar todas as tabelas no banco EM MEMÓRIA
@@ -72,3 +80,83 @@ def create_test_user(name="João Silva", email="joao@test.com", password="123456
     db.session.add(user)
     db.session.commit()
     return user
+
+
+def free_port() -> int:
+    """Porta TCP livre em 127.0.0.1, para os servidores locais dos testes"""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_for(condition, timeout: float = 5) -> bool:
+    """Aguarda condition() ficar verdadeira, no máximo `timeout` segundos; retorna o último resultado"""
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.05)
+    return condition()
+
+
+class QueryCounter:
+    """Conta os comandos SQL executados pelo engine enquanto ativo"""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.statements = []
+
+    def _callback(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    def __enter__(self):
+        from sqlalchemy import event
+        event.listen(self.engine, "before_cursor_execute", self._callback)
+        return self
+
+    def __exit__(self, *exc):
+        from sqlalchemy import event
+        event.remove(self.engine, "before_cursor_execute", self._callback)
+
+    @property
+    def count(self):
+        return len(self.statements)
+
+
+class SMTPSink:
+    """Handler do aiosmtpd que guarda as mensagens recebidas"""
+
+    def __init__(self):
+        self.messages = []
+        self.sessions = set()
+
+    async def handle_DATA(self, server, session, envelope):
+        self.sessions.add(id(session))
+        self.messages.append(envelope)
+        return "250 OK"
+
+
+@pytest.fixture
+def smtp_server(app):
+    """
+    Servidor SMTP local (aiosmtpd) com o Flask-Mail da aplicação apontando
+    para ele. Expõe .messages e .sessions (conexões SMTP distintas usadas).
+    """
+    controller_module = pytest.importorskip("aiosmtpd.controller")
+
+    port = free_port()
+    sink = SMTPSink()
+    controller = controller_module.Controller(sink, hostname="127.0.0.1", port=port)
+    controller.start()
+
+    state = app.extensions["mail"]
+    state.server = "127.0.0.1"
+    state.port = port
+    state.use_tls = False
+    state.use_ssl = False
+    state.username = None
+    state.password = None
+    state.suppress = False
+    state.default_sender = "noreply@eventanexus.test"
+
+    yield sink
+
+    controller.stop()
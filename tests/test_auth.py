@@ -6,7 +6,8 @@ from app import db
 from domain.models import User, UserType
 from services import auth_service
 from exceptions import BadRequestException, UnauthorizedException, NotFoundException
-from tests.conftest import create_test_user
+from auth.identity_cache import IdentityCache, get_identity_cache
+from tests.conftest import QueryCounter, create_test_user
 
 
 class TestAuthService:
@@ -209,3 +210,160 @@ class TestAuthService:
 
             with pytest.raises(BadRequestException):
                 auth_service.verify_reset_token("ABC123", None)
+
+
+class TestIdentityCache:
+    """Testes do cache de identidades do user_lookup_loader (JWT)"""
+
+    def _auth_headers(self, user):
+        return {"Authorization": f"Bearer {user.generate_auth_token()}"}
+
+    def _user_queries(self, counter):
+        return [s for s in counter.statements if "FROM users" in s]
+
+    def test_lru_eviction_and_ttl(self):
+        """Deve expirar entradas pelo TTL e descartar as menos usadas"""
+        now = [0.0]
+        cache = IdentityCache(maxsize=2, ttl=10, clock=lambda: now[0])
+
+        cache.set(1, {"id": 1})
+        cache.set(2, {"id": 2})
+        assert cache.get(1) == {"id": 1}
+
+        cache.set(3, {"id": 3})  # 2 é o menos usado recentemente
+        assert cache.get(2) is None
+        assert cache.get(3) == {"id": 3}
+
+        now[0] = 11
+        assert cache.get(1) is None
+
+        stats = cache.stats()
+        assert stats["hits"] == 2
+        assert stats["misses"] == 2
+        assert stats["evictions"] == 1
+
+    def test_authenticated_requests_skip_user_lookup(self, app, client):
+        """Requisições seguintes do mesmo usuário não devem consultar a tabela users"""
+        with app.app_context():
+            user = create_test_user()
+            headers = self._auth_headers(user)
+
+            # Listagem de notificações: o endpoint em si não consulta users
+            with QueryCounter(db.engine) as first:
+                assert client.get("/notifications/", headers=headers).status_code == 200
+            with QueryCounter(db.engine) as second:
+                assert client.get("/notifications/", headers=headers).status_code == 200
+
+            assert len(self._user_queries(first)) == 1
+            assert self._user_queries(second) == []
+
+            stats = get_identity_cache().stats()
+            assert stats["hits"] == 1
+            assert stats["misses"] == 1
+
+    def test_update_user_invalidates_cache(self, app, client):
+        """Atualização do usuário deve invalidar o cache e refletir os novos dados"""
+        with app.app_context():
+            user = create_test_user()
+            headers = self._auth_headers(user)
+            client.get("/notifications/count-unread", headers=headers)
+
+            response = client.put("/users/", headers=headers, json={
+                "name": "João Atualizado", "type": "REGULAR"})
+
+            assert response.status_code == 200
+            assert get_identity_cache().get(user.id) is None
+            assert User.query.get(user.id).name == "João Atualizado"
+
+    def test_patch_password_invalidates_cache(self, app, client):
+        """Troca de senha deve invalidar o cache"""
+        with app.app_context():
+            user = create_test_user(password="12345678")
+            headers = self._auth_headers(user)
+            client.get("/notifications/count-unread", headers=headers)
+
+            response = client.patch("/users/", headers=headers, json={
+                "current_password": "12345678", "new_password": "nova-senha-123"})
+
+            assert response.status_code == 204
+            assert get_identity_cache().get(user.id) is None
+
+    def test_deleted_user_is_rejected_after_invalidation(self, app, client):
+        """Usuário excluído não pode continuar autenticado pelo cache"""
+        with app.app_context():
+            user = create_test_user()
+            headers = self._auth_headers(user)
+            client.get("/notifications/count-unread", headers=headers)
+
+            assert client.delete("/users/", headers=headers).status_code == 204
+            assert client.get("/notifications/count-unread", headers=headers).status_code == 401
+
+
+class TestTokenClaims:
+    """Testes da autorização por claims do JWT (tipo e versão do token)"""
+
+    def _headers(self, token):
+        return {"Authorization": f"Bearer {token}"}
+
+    def test_token_embeds_type_and_version_claims(self, app):
+        """Token deve conter o tipo do usuário (claim role) e a versão do token"""
+        from flask_jwt_extended import decode_token
+
+        with app.app_context():
+            user = create_test_user(user_type=UserType.ORGANIZER)
+
+            claims = decode_token(user.generate_auth_token())
+
+            assert claims["role"] == "ORGANIZER"
+            assert claims["type"] == "access"
+            assert claims["ver"] == 0
+
+    def test_organizer_endpoint_authorizes_from_claims(self, app, client):
+        """Com a versão em cache, rotas de organizador não consultam a tabela users"""
+        with app.app_context():
+            organizer = create_test_user(user_type=UserType.ORGANIZER)
+            headers = self._headers(organizer.generate_auth_token())
+
+            assert client.get("/events/", headers=headers).status_code == 200
+
+            with QueryCounter(db.engine) as counter:
+                response = client.get("/events/", headers=headers)
+
+            assert response.status_code == 200
+            assert [s for s in counter.statements if "FROM users" in s] == []
+
+    def test_regular_user_is_forbidden_by_claims(self, app, client):
+        """Usuário comum deve receber 403 nas rotas de organizador"""
+        with app.app_context():
+            user = create_test_user()
+            response = client.get("/events/", headers=self._headers(user.generate_auth_token()))
+
+            assert response.status_code == 403
+
+    def test_password_reset_revokes_issued_tokens(self, app, client):
+        """Redefinição de senha deve invalidar tokens emitidos antes dela"""
+        from services import user_service
+
+        with app.app_context():
+            organizer = create_test_user(user_type=UserType.ORGANIZER)
+            headers = self._headers(organizer.generate_auth_token())
+            assert client.get("/events/", headers=headers).status_code == 200
+
+            token = user_service.generate_user_reset_token(organizer.email)
+            user_service.change_user_password(token, "nova-senha-123")
+
+            assert client.get("/events/", headers=headers).status_code == 401
+            assert client.get("/notifications/count-unread", headers=headers).status_code == 401
+
+            new_token = User.query.get(organizer.id).generate_auth_token()
+            assert client.get("/events/", headers=self._headers(new_token)).status_code == 200
+
+    def test_legacy_token_without_claims_still_authorized(self, app, client):
+        """Tokens emitidos antes das claims devem continuar válidos (carregando o usuário)"""
+        from flask_jwt_extended import create_access_token
+
+        with app.app_context():
+            organizer = create_test_user(user_type=UserType.ORGANIZER)
+            legacy = create_access_token(identity=str(organizer.id), expires_delta=False)
+
+            assert client.get("/events/", headers=self._headers(legacy)).status_code == 200
@@ -6,6 +6,7 @@ from unittest.mock import patch, MagicMock, mock_open
 from app import db
 from domain.models import User, Event, EventType, UserType, Certificate, event_participants
 from services.certificate_service import CertificateService
+from services.certificate_storage import get_storage
 from exceptions import BadRequestException, NotFoundException
 
 
@@ -68,7 +69,7 @@ class TestCertificateServiceGeneration:
             assert certificate.user_id == participant.id
             assert certificate.event_id == event.id
             assert certificate.certificate_path is not None
-            assert os.path.exists(certificate.certificate_path)
+            assert get_storage().exists(certificate.certificate_path)
 
     def test_generate_certificate_for_future_event_should_fail(self, app):
         """Deve rejeitar geração de certificado para evento futuro"""
@@ -691,11 +692,11 @@ class TestCertificateServicePDFGeneration:
             )
 
             # Verificar se arquivo existe
-            assert os.path.exists(certificate.certificate_path)
+            assert get_storage().exists(certificate.certificate_path)
             assert certificate.certificate_path.endswith('.pdf')
 
             # Verificar tamanho do arquivo (deve ser maior que 0)
-            file_size = os.path.getsize(certificate.certificate_path)
+            file_size = get_storage().size(certificate.certificate_path)
             assert file_size > 0
 
     def test_certificates_directory_created(self, app):
@@ -706,6 +707,57 @@ class TestCertificateServicePDFGeneration:
             assert certificates_dir.exists()
             assert certificates_dir.is_dir()
 
+    def _certificate_data(self, **overrides):
+        return {
+            "user_id": 1,
+            "event_id": 1,
+            "participant_name": "João Silva",
+            "event_title": "Workshop Avançado de Python",
+            "event_date": datetime(2025, 3, 4, 19, 30),
+            "event_location": "Auditório Principal",
+            "event_speaker": "Dr. Maria Santos",
+            "institution_organizer": "Universidade Federal de Pernambuco",
+            **overrides
+        }
+
+    def test_template_is_reused_within_event(self):
+        """Participantes do mesmo evento compartilham o modelo; outro evento tem o seu"""
+        from services import certificate_renderer
+
+        data = self._certificate_data()
+        template = certificate_renderer.get_certificate_template(data)
+
+        assert certificate_renderer.get_certificate_template(
+            self._certificate_data(user_id=2, participant_name="Ana")) is template
+        assert certificate_renderer.get_certificate_template(
+            self._certificate_data(event_id=2, event_title="Outro evento")) is not template
+
+    def test_template_layout_matches_full_document(self):
+        """O nome desenhado no modelo ocupa a mesma posição que no layout completo"""
+        from services import certificate_renderer
+
+        data = self._certificate_data()
+        template = certificate_renderer.get_certificate_template(data)
+        name = certificate_renderer._name_paragraph(data["participant_name"])
+        full = certificate_renderer._layout(
+            certificate_renderer._story(data, template.emission_date, name))
+
+        name_slot = template._layout[template._name_index]
+        assert [position[1:4] for position in template._layout] == [position[1:4] for position in full]
+        assert name_slot[1:4] == full[template._name_index][1:4]
+
+    def test_template_renders_long_names(self, tmp_path):
+        """Nomes que quebram linha recalculam o layout e geram um PDF válido"""
+        from services import certificate_renderer
+
+        short = certificate_renderer.render_certificate_pdf(self._certificate_data(), str(tmp_path))
+        long = certificate_renderer.render_certificate_pdf(
+            self._certificate_data(user_id=2, participant_name="Maria " * 20), str(tmp_path))
+
+        for path in (short, long):
+            with open(path, "rb") as pdf:
+                assert pdf.read(5) == b"%PDF-"
+
 
 class TestCertificateServiceProcessing:
     """Testes de processamento automático - Regras de negócio"""
@@ -883,3 +935,452 @@ class TestCertificateServiceProcessing:
             ).all()
 
             assert len(certificates) == 1
+
+
+def _create_completed_event(participants: int):
+    """Cria um evento concluído com N participantes inscritos"""
+    from tests.conftest import create_test_user
+
+    organizer = create_test_user(
+        name="Organizador Lote", email="org.lote@test.com", user_type=UserType.ORGANIZER)
+
+    event = Event(
+        title="Conferência Lote",
+        date=datetime.now() - timedelta(hours=2),
+        location="Auditório",
+        type=EventType.CONFERENCE,
+        institution_organizer="UFPE",
+        created_by=organizer.id
+    )
+    db.session.add(event)
+    db.session.commit()
+
+    users = []
+    for i in range(participants):
+        users.append(create_test_user(
+            name=f"Participante {i}", email=f"participante{i}@lote.com"))
+
+    db.session.execute(event_participants.insert(), [
+        {"user_id": user.id, "event_id": event.id,
+         "registered_at": datetime.now(), "active": True}
+        for user in users
+    ])
+    db.session.commit()
+    return event, users
+
+
+class TestCertificateServiceBatchGeneration:
+    """Testes do modo em lote (pool de processos + INSERT único)"""
+
+    def test_batch_persists_all_certificates_in_one_insert(self, app):
+        """Deve gerar os certificados faltantes e persistir todos com um único INSERT"""
+        from tests.conftest import QueryCounter
+
+        with app.app_context():
+            event, users = _create_completed_event(participants=5)
+            CertificateService.generate_certificate_for_participant(users[0].id, event.id)
+
+            with QueryCounter(db.engine) as counter:
+                certificates, errors = CertificateService.generate_certificates_for_event_batch(
+                    event.id, max_workers=0)
+
+            inserts = [s for s in counter.statements if s.startswith("INSERT INTO certificates")]
+            assert len(inserts) == 1
+            assert errors == []
+            assert sorted(c.user_id for c in certificates) == sorted(u.id for u in users[1:])
+            assert all(get_storage().exists(c.certificate_path) for c in certificates)
+            assert Certificate.query.filter_by(event_id=event.id).count() == 5
+
+    def test_batch_reports_errors_per_participant(self, app):
+        """A falha de um participante não deve impedir a persistência dos demais"""
+        from services import certificate_renderer
+
+        with app.app_context():
+            event, users = _create_completed_event(participants=3)
+            failing_id = users[1].id
+            original = certificate_renderer.render_certificate_pdf
+
+            def render(data, certificates_dir):
+                if data["user_id"] == failing_id:
+                    raise RuntimeError("falha simulada")
+                return original(data, certificates_dir)
+
+            with patch.object(certificate_renderer, "render_certificate_pdf", side_effect=render):
+                certificates, errors = CertificateService.generate_certificates_for_event_batch(
+                    event.id, max_workers=0)
+
+            assert errors == [{"user_id": failing_id, "error": "falha simulada"}]
+            assert failing_id not in [c.user_id for c in certificates]
+            assert len(certificates) == 2
+
+    def test_batch_without_missing_certificates_is_noop(self, app):
+        """Sem participantes pendentes não deve renderizar nem inserir nada"""
+        with app.app_context():
+            event, _ = _create_completed_event(participants=2)
+            CertificateService.generate_certificates_for_event_batch(event.id, max_workers=0)
+
+            certificates, errors = CertificateService.generate_certificates_for_event_batch(
+                event.id, max_workers=0)
+
+            assert certificates == [] and errors == []
+            assert Certificate.query.filter_by(event_id=event.id).count() == 2
+
+    @pytest.mark.slow
+    def test_batch_with_process_pool(self, app):
+        """Deve renderizar no pool de processos e gerar PDFs válidos"""
+        from services import certificate_renderer
+
+        with app.app_context():
+            event, users = _create_completed_event(participants=6)
+
+            try:
+                certificates, errors = CertificateService.generate_certificates_for_event_batch(
+                    event.id, max_workers=2)
+            finally:
+                certificate_renderer.shutdown_render_pool()
+
+            assert errors == []
+            assert len(certificates) == len(users)
+            for certificate in certificates:
+                assert get_storage().read(certificate.certificate_path)[:5] == b"%PDF-"
+
+
+class TestCertificateServiceBulkGeneration:
+    """Testes do caminho em massa de generate_certificates_for_event"""
+
+    def test_generate_for_event_uses_constant_number_of_queries(self, app):
+        """Não deve executar consultas por participante"""
+        from tests.conftest import QueryCounter
+
+        with app.app_context():
+            event, users = _create_completed_event(participants=8)
+            CertificateService.generate_certificate_for_participant(users[0].id, event.id)
+            event_id = event.id
+
+            with QueryCounter(db.engine) as counter:
+                certificates = CertificateService.generate_certificates_for_event(event_id)
+
+            inserts = [s for s in counter.statements if s.startswith("INSERT INTO certificates")]
+            assert len(inserts) == 1
+            assert counter.count <= 6
+            assert sorted(c.user_id for c in certificates) == sorted(u.id for u in users)
+
+    def test_generate_for_event_is_idempotent_under_concurrent_generation(self, app):
+        """Um certificado gravado por outro processo durante a renderização não deve causar erro"""
+        from services import certificate_renderer
+
+        with app.app_context():
+            event, users = _create_completed_event(participants=3)
+            winner_id = users[2].id
+            original = certificate_renderer.render_certificates
+            rendered = []
+
+            def render_with_concurrent_insert(jobs, certificates_dir, max_workers=0):
+                results = original(jobs, certificates_dir, max_workers)
+                rendered.extend(r["path"] for r in results if r["user_id"] == winner_id)
+                # Simula outro processo gravando o mesmo certificado antes do INSERT
+                with db.engine.begin() as conn:
+                    conn.execute(Certificate.__table__.insert().values(
+                        user_id=winner_id, event_id=event.id,
+                        certificate_path="/tmp/concorrente.pdf",
+                        generated_at=datetime.now(), active=True))
+                return results
+
+            with patch.object(certificate_renderer, "render_certificates",
+                              side_effect=render_with_concurrent_insert):
+                certificates = CertificateService.generate_certificates_for_event(event.id)
+
+            by_user = {c.user_id: c for c in certificates}
+            assert sorted(by_user) == sorted(u.id for u in users)
+            assert by_user[winner_id].certificate_path == "/tmp/concorrente.pdf"
+            assert len(rendered) == 1 and not os.path.exists(rendered[0])
+            assert Certificate.query.filter_by(event_id=event.id).count() == 3
+
+
+class TestCertificateNotifications:
+    """Testes da criação em massa das notificações de certificados"""
+
+    def test_process_completed_events_creates_notifications_in_one_insert(self, app):
+        """As notificações dos certificados devem ser criadas com um único INSERT"""
+        from domain.models import Notification
+        from tests.conftest import QueryCounter
+
+        with app.app_context():
+            event, users = _create_completed_event(participants=4)
+            event_id = event.id
+
+            with QueryCounter(db.engine) as counter:
+                CertificateService.process_completed_events()
+
+            inserts = [s for s in counter.statements if s.startswith("INSERT INTO notifications")]
+            assert len(inserts) == 1
+
+            notifications = Notification.query.order_by(Notification.user_id).all()
+            assert [n.user_id for n in notifications] == sorted(u.id for u in users)
+            certificates = {c.user_id: c.id for c in Certificate.query.filter_by(event_id=event_id)}
+            assert all(n.link == f"dashboard-participant/certificado/{certificates[n.user_id]}"
+                       for n in notifications)
+
+
+class TestIncrementalProcessing:
+    """Testes do processamento incremental (marca d'água) de eventos concluídos"""
+
+    def _events(self, dates: list[datetime]) -> list[int]:
+        """Cria eventos nas datas informadas, cada um com um participante"""
+        from tests.conftest import create_test_user
+
+        organizer = create_test_user(
+            name="Organizador Marca", email="org.marca@test.com", user_type=UserType.ORGANIZER)
+        participant = create_test_user(name="Participante Marca", email="p.marca@test.com")
+
+        events = [Event(title=f"Evento {i}", date=date, location="Sala", type=EventType.WORKSHOP,
+                        institution_organizer="UFPE", created_by=organizer.id)
+                  for i, date in enumerate(dates)]
+        db.session.add_all(events)
+        db.session.commit()
+
+        db.session.execute(event_participants.insert(), [
+            {"user_id": participant.id, "event_id": event.id,
+             "registered_at": datetime.now(), "active": True}
+            for event in events
+        ])
+        db.session.commit()
+        return [event.id for event in events]
+
+    def _processed(self, event_ids: list[int]) -> list[bool]:
+        db.session.expire_all()
+        return [db.session.get(Event, event_id).certificates_processed_at is not None
+                for event_id in event_ids]
+
+    def test_marks_events_and_skips_them_next_run(self, app):
+        """Eventos processados são marcados e a execução seguinte não os toca"""
+        from services import job_state_service
+        from tests.conftest import QueryCounter
+
+        with app.app_context():
+            [event_id] = self._events([datetime.now() - timedelta(hours=3)])
+
+            stats = CertificateService.process_completed_events()
+
+            assert (stats["processed"], stats["failed"], stats["certificates"]) == (1, 0, 1)
+            assert self._processed([event_id]) == [True]
+            assert job_state_service.get_watermark(CertificateService.PROCESSING_JOB) == \
+                db.session.get(Event, event_id).date
+
+            with QueryCounter(db.engine) as counter:
+                stats = CertificateService.process_completed_events()
+
+            assert stats["processed"] == 0
+            assert not any("event_participants" in s for s in counter.statements)
+
+    def test_catches_up_after_downtime(self, app):
+        """Com a marca d'água antiga, eventos de dias atrás ainda são processados"""
+        from services import job_state_service
+
+        with app.app_context():
+            job_state_service.set_watermark(
+                CertificateService.PROCESSING_JOB, datetime.now() - timedelta(days=5))
+            event_ids = self._events([datetime.now() - timedelta(days=3),
+                                      datetime.now() - timedelta(days=6)])
+
+            stats = CertificateService.process_completed_events()
+
+            assert stats["processed"] == 1
+            assert self._processed(event_ids) == [True, False]
+
+    def test_work_is_bounded_per_run(self, app):
+        """Cada execução processa no máximo max_events, inclusive com datas iguais"""
+        with app.app_context():
+            same_date = datetime.now() - timedelta(hours=5)
+            event_ids = self._events([same_date, same_date, datetime.now() - timedelta(hours=1)])
+
+            assert CertificateService.process_completed_events(max_events=1)["processed"] == 1
+            assert CertificateService.process_completed_events(max_events=1)["processed"] == 1
+            assert self._processed(event_ids) == [True, True, False]
+
+            assert CertificateService.process_completed_events(max_events=1)["processed"] == 1
+            assert all(self._processed(event_ids))
+
+    def test_failed_event_holds_watermark_and_is_retried(self, app):
+        """Um evento que falha não é marcado e a marca d'água não passa dele"""
+        from services import job_state_service
+
+        with app.app_context():
+            event_ids = self._events([datetime.now() - timedelta(hours=6),
+                                      datetime.now() - timedelta(hours=2)])
+            original = CertificateService.generate_certificates_for_event_batch
+
+            def fail_first(event_id, *args, **kwargs):
+                if event_id == event_ids[0]:
+                    raise RuntimeError("falha de renderização")
+                return original(event_id, *args, **kwargs)
+
+            with patch.object(CertificateService, "generate_certificates_for_event_batch",
+                              side_effect=fail_first):
+                stats = CertificateService.process_completed_events()
+
+            assert (stats["processed"], stats["failed"]) == (1, 1)
+            assert self._processed(event_ids) == [False, True]
+            assert job_state_service.get_watermark(CertificateService.PROCESSING_JOB) < \
+                db.session.get(Event, event_ids[0]).date
+
+            stats = CertificateService.process_completed_events()
+
+            assert (stats["processed"], stats["failed"]) == (1, 0)
+            assert all(self._processed(event_ids))
+            assert Certificate.query.count() == 2
+
+
+class TestLazyRendering:
+    """Modo lazy: certificados criados sem PDF, renderizado no primeiro download ou email"""
+
+    @pytest.fixture
+    def lazy_app(self, app, tmp_path):
+        app.config["CERTIFICATE_RENDER_MODE"] = "lazy"
+        app.config["CERTIFICATE_STORAGE_PATH"] = str(tmp_path)
+        return app
+
+    def test_batch_creates_rows_without_rendering(self, lazy_app):
+        """O lote só insere as linhas; nenhum PDF é renderizado"""
+        from services import certificate_renderer
+
+        with lazy_app.app_context():
+            event, users = _create_completed_event(participants=3)
+
+            with patch.object(certificate_renderer, "render_certificates") as render:
+                certificates, errors = CertificateService.generate_certificates_for_event_batch(event.id)
+
+            render.assert_not_called()
+            assert errors == []
+            assert len(certificates) == 3
+            assert all(c.certificate_path is None for c in certificates)
+
+    def test_generated_at_uses_local_clock(self, lazy_app):
+        """generated_at (a data de emissão do PDF lazy) usa o mesmo relógio local nos dois caminhos"""
+        with lazy_app.app_context():
+            event, users = _create_completed_event(participants=2)
+            before = datetime.now().replace(microsecond=0)
+
+            single = CertificateService.generate_certificate_for_participant(users[1].id, event.id)
+            [batch], _ = CertificateService.generate_certificates_for_event_batch(event.id)
+
+            for certificate in (batch, single):
+                assert before <= certificate.generated_at <= datetime.now()
+
+    def test_first_download_renders_once(self, lazy_app, client, tmp_path):
+        """O primeiro download renderiza e grava o caminho pelo hash; os seguintes reutilizam"""
+        from services import certificate_renderer
+
+        with lazy_app.app_context():
+            event, users = _create_completed_event(participants=1)
+            certificate = CertificateService.generate_certificate_for_participant(users[0].id, event.id)
+            certificate_id = certificate.id
+            headers = {"Authorization": f"Bearer {users[0].generate_auth_token()}"}
+
+        original = certificate_renderer.CertificateTemplate.render
+        with patch.object(certificate_renderer.CertificateTemplate, "render",
+                          autospec=True, side_effect=original) as render:
+            first = client.get(f"/certificates/{certificate_id}/download", headers=headers)
+            second = client.get(f"/certificates/{certificate_id}/download", headers=headers)
+
+        assert first.status_code == second.status_code == 200
+        assert first.data[:5] == b"%PDF-"
+        assert render.call_count == 1
+
+        with lazy_app.app_context():
+            key = db.session.get(Certificate, certificate_id).certificate_path
+            assert len(Path(key).stem) == 64  # SHA-256 do conteúdo
+            assert get_storage().exists(key)
+
+    def test_concurrent_first_requests_are_coalesced(self, lazy_app, tmp_path):
+        """Pedidos simultâneos do mesmo certificado resultam em uma única renderização"""
+        import threading
+        import time
+        from services import certificate_renderer
+
+        data = {
+            "user_id": 1, "event_id": 1, "participant_name": "Ana",
+            "event_title": "Evento", "event_date": datetime(2025, 3, 4, 19, 30),
+            "event_location": "Recife", "event_speaker": None, "institution_organizer": "UFPE",
+        }
+        original = certificate_renderer.CertificateTemplate.render
+
+        def slow_render(template, name, filepath):
+            time.sleep(0.2)
+            return original(template, name, filepath)
+
+        barrier = threading.Barrier(4)
+        keys = []
+
+        def request():
+            with lazy_app.app_context():
+                barrier.wait()
+                keys.append(CertificateService._render_to_storage(data, "4 de março de 2025"))
+
+        with patch.object(certificate_renderer.CertificateTemplate, "render",
+                          autospec=True, side_effect=slow_render) as render:
+            threads = [threading.Thread(target=request) for _ in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join(timeout=10)
+
+        assert render.call_count == 1
+        assert len(keys) == 4 and len(set(keys)) == 1
+        with lazy_app.app_context():
+            assert [f.key for f in get_storage().iter_files()] == keys[:1]
+
+    def test_completion_emails_send_download_link(self, lazy_app, smtp_server):
+        """Na conclusão do evento o email leva o link do certificado e nenhum PDF é renderizado no envio"""
+        from services import certificate_renderer, email_service
+
+        lazy_app.config["FRONTEND_URL"] = "https://eventos.exemplo.com/"
+        with lazy_app.app_context():
+            event, users = _create_completed_event(participants=1)
+
+            with patch.object(certificate_renderer, "render_certificate_file") as render:
+                assert CertificateService._process_completed_event(event) == 1
+                stats = email_service.process_outbox()
+
+            render.assert_not_called()
+            assert stats["sent"] == 1
+            certificate = Certificate.query.one()
+            content = smtp_server.messages[0].content
+            assert b"application/pdf" not in content
+            assert f"https://eventos.exemplo.com/dashboard-participant/certificado/{certificate.id}".encode() in content
+            assert certificate.certificate_path is None
+
+    def test_send_email_route_attaches_pdf(self, lazy_app, client, smtp_server):
+        """O reenvio pedido pelo participante renderiza o PDF sob demanda e o anexa"""
+        from services import email_service
+
+        with lazy_app.app_context():
+            event, users = _create_completed_event(participants=1)
+            certificate = CertificateService.generate_certificate_for_participant(users[0].id, event.id)
+            certificate_id = certificate.id
+            headers = {"Authorization": f"Bearer {users[0].generate_auth_token()}"}
+
+        response = client.post(f"/certificates/{certificate_id}/send-email", headers=headers)
+        assert response.status_code == 200
+
+        with lazy_app.app_context():
+            assert email_service.process_outbox()["sent"] == 1
+            assert b"application/pdf" in smtp_server.messages[0].content
+            assert get_storage().exists(db.session.get(Certificate, certificate_id).certificate_path)
+
+    def test_queued_attachment_renders_on_send(self, lazy_app, smtp_server):
+        """Um email já enfileirado com o certificado anexado renderiza o PDF ao montar a mensagem"""
+        from services import email_service
+
+        with lazy_app.app_context():
+            event, users = _create_completed_event(participants=1)
+            certificate = CertificateService.generate_certificate_for_participant(users[0].id, event.id)
+            email_service.enqueue_email([users[0].email], "Certificado", "Segue em anexo.",
+                                        attachment_filename="certificado.pdf",
+                                        certificate_id=certificate.id)
+
+            stats = email_service.process_outbox()
+
+            assert stats["sent"] == 1
+            assert b"application/pdf" in smtp_server.messages[0].content
+            assert get_storage().exists(db.session.get(Certificate, certificate.id).certificate_path)
@@ -0,0 +1,340 @@
+import os
+import time
+import urllib.request
+from datetime import datetime, timedelta
+from pathlib import Path
+import pytest
+from app import db
+from domain.models import Certificate, Event, EventType, UserType, event_participants
+from services.certificate_service import CertificateService
+from services.certificate_storage import FilesystemStorage, S3Storage, get_storage, shard_path
+from tests.conftest import free_port
+
+
+@pytest.fixture
+def moto_server():
+    """Servidor S3 local (moto server), para testar o backend S3 sem a AWS"""
+    pytest.importorskip("boto3")
+    server_module = pytest.importorskip("moto.server")
+
+    port = free_port()
+    server = server_module.ThreadedMotoServer(ip_address="127.0.0.1", port=port)
+    server.start()
+    endpoint = f"http://127.0.0.1:{port}"
+    yield endpoint
+    # O estado do moto é global no processo: limpa os buckets para o próximo teste
+    urllib.request.urlopen(urllib.request.Request(f"{endpoint}/moto-api/reset", method="POST"))
+    server.stop()
+
+
+@pytest.fixture(params=["filesystem", "s3"])
+def storage(request, tmp_path, monkeypatch):
+    if request.param == "filesystem":
+        return FilesystemStorage(str(tmp_path / "certificates"))
+
+    endpoint = request.getfixturevalue("moto_server")
+    import boto3
+
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "teste")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "teste")
+    client = boto3.client("s3", endpoint_url=endpoint, region_name="us-east-1")
+    client.create_bucket(Bucket="certificados")
+    return S3Storage("certificados", prefix="certificates/",
+                     staging_dir=str(tmp_path / "staging"), client=client)
+
+
+def _stage(storage, content: bytes) -> str:
+    path = Path(storage.staging_dir) / "novo.pdf"
+    path.write_bytes(content)
+    return str(path)
+
+
+class TestCertificateStorage:
+    """Contrato dos backends de armazenamento (disco local e S3)"""
+
+    def test_save_read_and_delete(self, storage):
+        """save() consome o arquivo preparado; a chave pode ser lida e removida"""
+        source = _stage(storage, b"%PDF-conteudo")
+
+        storage.save("certificado.pdf", source)
+
+        assert not Path(source).exists()
+        assert storage.exists("certificado.pdf")
+        assert storage.size("certificado.pdf") == 13
+        assert storage.read("certificado.pdf") == b"%PDF-conteudo"
+
+        assert storage.delete("certificado.pdf")
+        assert not storage.exists("certificado.pdf")
+        assert not storage.delete("certificado.pdf")
+
+    def test_range_reads(self, storage):
+        """iter_range devolve apenas o intervalo pedido, em blocos"""
+        content = bytes(range(256)) * 10
+        storage.save("grande.pdf", _stage(storage, content))
+
+        assert b"".join(storage.iter_range("grande.pdf", 100, 612, chunk_size=64)) == content[100:612]
+        assert b"".join(storage.iter_range("grande.pdf", 2500)) == content[2500:]
+
+    def test_missing_key(self, storage):
+        with pytest.raises(FileNotFoundError):
+            storage.size("inexistente.pdf")
+        with pytest.raises(FileNotFoundError):
+            storage.iter_range("inexistente.pdf")
+
+    def test_iter_files_lists_stored_keys(self, storage):
+        """A listagem gera (chave, tamanho) de todos os arquivos, sem o diretório de preparação"""
+        for i in range(3):
+            storage.save(f"c{i}.pdf", _stage(storage, b"x" * (i + 1)))
+        Path(storage.staging_dir, "em_andamento.pdf").write_bytes(b"tmp")
+
+        assert sorted((f.key, f.size) for f in storage.iter_files()) == [("c0.pdf", 1), ("c1.pdf", 2), ("c2.pdf", 3)]
+        assert all(abs(f.modified_at - time.time()) < 60 for f in storage.iter_files())
+
+    def test_quarantine_removes_key_from_listing(self, storage):
+        """A quarentena tira a chave do armazenamento (e da listagem) sem apagar o conteúdo"""
+        storage.save("orfao.pdf", _stage(storage, b"%PDF-orfao"))
+
+        assert storage.quarantine("orfao.pdf")
+
+        assert not storage.exists("orfao.pdf")
+        assert list(storage.iter_files()) == []
+        assert not storage.quarantine("orfao.pdf")
+
+
+class TestFilesystemLayout:
+    """Layout do backend local"""
+
+    def test_keys_are_sharded_by_hash_prefix(self, tmp_path):
+        storage = FilesystemStorage(str(tmp_path))
+        storage.save("certificado.pdf", _stage(storage, b"%PDF-"))
+
+        relative = shard_path("certificado.pdf")
+        assert (tmp_path / relative).is_file()
+        assert len(Path(relative).parts) == 3
+
+    def test_legacy_absolute_paths(self, tmp_path):
+        """Caminhos absolutos gravados antes do armazenamento continuam acessíveis e listados"""
+        storage = FilesystemStorage(str(tmp_path))
+        legacy = tmp_path / "certificate_1_1_20250101_120000.pdf"
+        legacy.write_bytes(b"%PDF-antigo")
+
+        assert storage.read(str(legacy)) == b"%PDF-antigo"
+        assert [(f.key, f.size) for f in storage.iter_files()] == [(str(legacy), 11)]
+
+
+class TestCertificateDownload:
+    """Download do certificado transmitido do armazenamento, com suporte a Range"""
+
+    @pytest.fixture
+    def download(self, app, tmp_path):
+        from tests.conftest import create_test_user
+
+        app.config["CERTIFICATE_STORAGE_PATH"] = str(tmp_path)
+        with app.app_context():
+            organizer = create_test_user(
+                name="Organizador", email="org@test.com", user_type=UserType.ORGANIZER)
+            participant = create_test_user(name="José Araújo", email="jose@test.com")
+            event = Event(title="Evento de Teste", date=datetime.now() - timedelta(days=1),
+                          location="Recife", type=EventType.WORKSHOP,
+                          institution_organizer="UFPE", created_by=organizer.id)
+            db.session.add(event)
+            db.session.commit()
+            db.session.execute(event_participants.insert().values(
+                user_id=participant.id, event_id=event.id, registered_at=datetime.now(), active=True))
+            db.session.commit()
+
+            certificate = CertificateService.generate_certificate_for_participant(participant.id, event.id)
+            content = get_storage().read(certificate.certificate_path)
+            return (f"/certificates/{certificate.id}/download",
+                    {"Authorization": f"Bearer {participant.generate_auth_token()}"}, content)
+
+    def test_full_download(self, client, download):
+        url, headers, content = download
+
+        response = client.get(url, headers=headers)
+
+        assert response.status_code == 200
+        assert response.data == content
+        assert response.headers["Accept-Ranges"] == "bytes"
+        assert response.headers["Content-Length"] == str(len(content))
+        assert "filename*=UTF-8''certificado_Evento_de_Teste_Jos%C3%A9_Ara%C3%BAjo.pdf" \
+            in response.headers["Content-Disposition"]
+
+    def test_range_download(self, client, download):
+        url, headers, content = download
+
+        response = client.get(url, headers={**headers, "Range": "bytes=10-109"})
+
+        assert response.status_code == 206
+        assert response.data == content[10:110]
+        assert response.headers["Content-Range"] == f"bytes 10-109/{len(content)}"
+
+        suffix = client.get(url, headers={**headers, "Range": "bytes=-20"})
+        assert suffix.status_code == 206
+        assert suffix.data == content[-20:]
+
+    def test_unsatisfiable_range(self, client, download):
+        url, headers, content = download
+
+        response = client.get(url, headers={**headers, "Range": f"bytes={len(content) + 10}-"})
+
+        assert response.status_code == 416
+        assert response.headers["Content-Range"] == f"bytes */{len(content)}"
+
+    def test_multiple_ranges_get_full_body(self, client, download):
+        """Vários intervalos (ou um suffix maior que o arquivo) podem ser ignorados: 200 com o arquivo inteiro"""
+        url, headers, content = download
+
+        for value in ("bytes=0-9,20-29", f"bytes=-{len(content) + 100}"):
+            response = client.get(url, headers={**headers, "Range": value})
+
+            assert response.status_code == 200
+            assert response.data == content
+
+    def test_etag_and_conditional_requests(self, client, download):
+        url, headers, content = download
+
+        etag = client.get(url, headers=headers).headers["ETag"]
+        assert etag
+
+        not_modified = client.get(url, headers={**headers, "If-None-Match": etag})
+        assert not_modified.status_code == 304
+        assert not_modified.data == b""
+
+        # If-Range confere: 206; não confere (arquivo mudou): 200 com o arquivo inteiro
+        partial = client.get(url, headers={**headers, "Range": "bytes=0-9", "If-Range": etag})
+        assert (partial.status_code, partial.data) == (206, content[:10])
+        stale = client.get(url, headers={**headers, "Range": "bytes=0-9", "If-Range": '"outro"'})
+        assert (stale.status_code, stale.data) == (200, content)
+
+    def test_missing_file_is_rendered_again(self, app, client, download):
+        """Se o arquivo sumiu do armazenamento, o download renderiza de novo"""
+        url, headers, _ = download
+        with app.app_context():
+            certificate = Certificate.query.one()
+            get_storage().delete(certificate.certificate_path)
+
+        response = client.get(url, headers=headers)
+
+        assert response.status_code == 200
+        assert response.data[:5] == b"%PDF-"
+
+
+class TestOrphanCollection:
+    """Coleta dos PDFs do armazenamento sem certificado correspondente"""
+
+    @pytest.fixture
+    def referenced(self, app, tmp_path):
+        """Certificado gerado (arquivo referenciado e antigo) no armazenamento em tmp_path"""
+        from tests.conftest import create_test_user
+
+        app.config["CERTIFICATE_STORAGE_PATH"] = str(tmp_path)
+        with app.app_context():
+            organizer = create_test_user(
+                name="Organizador", email="org@test.com", user_type=UserType.ORGANIZER)
+            participant = create_test_user(name="Participante", email="part@test.com")
+            event = Event(title="Evento", date=datetime.now() - timedelta(days=1),
+                          location="Recife", type=EventType.WORKSHOP,
+                          institution_organizer="UFPE", created_by=organizer.id)
+            db.session.add(event)
+            db.session.commit()
+            db.session.execute(event_participants.insert().values(
+                user_id=participant.id, event_id=event.id, registered_at=datetime.now(), active=True))
+            db.session.commit()
+
+            key = CertificateService.generate_certificate_for_participant(participant.id, event.id).certificate_path
+            self._age(tmp_path / shard_path(key))
+            return key
+
+    @staticmethod
+    def _age(path, hours=48):
+        past = time.time() - hours * 3600
+        os.utime(path, (past, past))
+
+    def _orphans(self, tmp_path, count, hours=48):
+        storage = get_storage()
+        keys = [f"orfao_{i}.pdf" for i in range(count)]
+        for key in keys:
+            storage.save(key, _stage(storage, b"x" * 10))
+            self._age(tmp_path / shard_path(key), hours)
+        return keys
+
+    def test_orphans_are_deleted_and_referenced_kept(self, app, tmp_path, referenced):
+        with app.app_context():
+            orphans = self._orphans(tmp_path, 5)
+
+            metrics = CertificateService.collect_orphaned_files(batch_size=2)
+
+            assert (metrics["scanned"], metrics["orphans"], metrics["removed"]) == (6, 5, 5)
+            assert metrics["reclaimed_bytes"] == 50
+            assert metrics["batches"] == 3
+            storage = get_storage()
+            assert storage.exists(referenced)
+            assert not any(storage.exists(key) for key in orphans)
+
+    def test_one_query_per_batch(self, app, tmp_path, referenced):
+        """Memória e consultas proporcionais ao lote: uma consulta IN por lote"""
+        from tests.conftest import QueryCounter
+
+        with app.app_context():
+            self._orphans(tmp_path, 9)
+
+            with QueryCounter(db.engine) as counter:
+                metrics = CertificateService.collect_orphaned_files(batch_size=4)
+
+            assert metrics["batches"] == 3
+            assert counter.count == 3
+
+    def test_inactive_certificate_keeps_its_file(self, app, tmp_path, referenced):
+        """Um certificado desativado pode ser reativado: o arquivo não é órfão"""
+        with app.app_context():
+            Certificate.query.update({"active": False})
+            db.session.commit()
+
+            assert CertificateService.collect_orphaned_files()["orphans"] == 0
+            assert get_storage().exists(referenced)
+
+    def test_dry_run_changes_nothing(self, app, tmp_path, referenced):
+        with app.app_context():
+            orphans = self._orphans(tmp_path, 2)
+
+            metrics = CertificateService.collect_orphaned_files(dry_run=True)
+
+            assert (metrics["orphans"], metrics["removed"], metrics["reclaimed_bytes"]) == (2, 0, 20)
+            assert all(get_storage().exists(key) for key in orphans)
+
+    def test_recent_files_are_preserved(self, app, tmp_path, referenced):
+        """Arquivos mais novos que a idade mínima podem ser renderizações ainda sem commit"""
+        with app.app_context():
+            [fresh] = self._orphans(tmp_path, 1, hours=1)
+
+            metrics = CertificateService.collect_orphaned_files(min_age_hours=24)
+
+            assert metrics["orphans"] == 0
+            assert get_storage().exists(fresh)
+
+    def test_quarantine_and_staging_leftovers(self, app, tmp_path, referenced):
+        with app.app_context():
+            [orphan] = self._orphans(tmp_path, 1)
+            leftover = Path(get_storage().staging_dir) / "tmpabandonado.pdf"
+            leftover.write_bytes(b"%PDF-")
+            self._age(leftover)
+
+            metrics = CertificateService.collect_orphaned_files(quarantine=True)
+
+            assert (metrics["removed"], metrics["staging"]) == (1, 1)
+            assert not get_storage().exists(orphan)
+            assert (tmp_path / ".quarantine" / orphan).is_file()
+            assert not leftover.exists()
+
+    def test_gc_cli_command(self, app, runner, tmp_path, referenced):
+        with app.app_context():
+            self._orphans(tmp_path, 3)
+
+            result = runner.invoke(args=["certificates", "gc", "--dry-run"])
+            assert "3 arquivo(s) órfão(s) de 4 (30 bytes)" in result.output
+            assert "(dry-run)" in result.output
+
+            result = runner.invoke(args=["certificates", "gc", "--batch-size", "2"])
+            assert "3 arquivo(s) órfão(s) de 4 apagado(s) (30 bytes)" in result.output
+            assert len(list(get_storage().iter_files())) == 1
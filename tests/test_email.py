@@ -0,0 +1,236 @@
+from datetime import datetime, timedelta
+from unittest.mock import patch
+from app import db
+from domain.models import EmailOutbox, EmailStatus
+from services import email_service
+from tests.conftest import create_test_user, free_port
+
+
+def _enqueue(total: int = 1, **kwargs):
+    for i in range(total):
+        email_service.enqueue_email(
+            recipients=[f"destino{i}@test.com"],
+            subject=f"Assunto {i}",
+            body="Corpo do email",
+            commit=False,
+            **kwargs
+        )
+    db.session.commit()
+
+
+class TestEmailOutboxEnqueue:
+    """Testes do enfileiramento de emails"""
+
+    def test_reset_password_route_enqueues_without_smtp(self, app, client):
+        """A rota de redefinição deve apenas enfileirar o email"""
+        with app.app_context():
+            create_test_user(email="fila@test.com")
+
+            with patch("app.mail.send") as mock_send, \
+                    patch("app.mail.connect") as mock_connect:
+                response = client.post("/auth/reset-password", json={"email": "fila@test.com"})
+
+            assert response.status_code == 200
+            mock_send.assert_not_called()
+            mock_connect.assert_not_called()
+
+            email = EmailOutbox.query.one()
+            assert email.recipients == ["fila@test.com"]
+            assert email.status == EmailStatus.PENDING
+            assert email.attempts == 0
+
+
+class TestEmailOutboxProcessing:
+    """Testes do envio da fila contra um servidor SMTP local"""
+
+    def test_batch_is_sent_over_a_single_connection(self, app, smtp_server):
+        """Um lote deve ser enviado reutilizando uma única conexão SMTP"""
+        with app.app_context():
+            app.config["EMAIL_BATCH_CONNECTIONS"] = 1
+            _enqueue(5)
+
+            stats = email_service.process_outbox(batch_size=10)
+
+            assert stats == {"claimed": 5, "sent": 5, "failed": 0, "dead": 0}
+            assert len(smtp_server.messages) == 5
+            assert len(smtp_server.sessions) == 1
+            assert EmailOutbox.query.filter_by(status=EmailStatus.SENT).count() == 5
+
+    def test_attachment_is_sent(self, app, smtp_server, tmp_path):
+        """O anexo deve ser lido do disco no momento do envio"""
+        pdf = tmp_path / "certificado.pdf"
+        pdf.write_bytes(b"%PDF-1.4 conteudo")
+
+        with app.app_context():
+            _enqueue(1, attachment_path=str(pdf), attachment_filename="certificado.pdf")
+
+            email_service.process_outbox()
+
+            content = smtp_server.messages[0].content.decode()
+            assert 'filename="certificado.pdf"' in content
+
+    def test_drain_processes_multiple_batches(self, app, smtp_server):
+        """drain_outbox deve processar lotes até esvaziar a fila"""
+        with app.app_context():
+            _enqueue(7)
+
+            totals = email_service.drain_outbox(batch_size=3)
+
+            assert totals["sent"] == 7
+            assert len(smtp_server.messages) == 7
+            assert EmailOutbox.query.filter(EmailOutbox.status != EmailStatus.SENT).count() == 0
+
+    def test_failure_is_retried_with_backoff(self, app):
+        """Com o SMTP indisponível o email deve ser reagendado com backoff"""
+        with app.app_context():
+            state = app.extensions["mail"]
+            state.server, state.port, state.suppress, state.use_tls = "127.0.0.1", free_port(), False, False
+            _enqueue(1)
+
+            stats = email_service.process_outbox()
+
+            email = EmailOutbox.query.one()
+            assert stats["failed"] == 1
+            assert email.status == EmailStatus.PENDING
+            assert email.attempts == 1
+            assert email.last_error
+            assert email.next_attempt_at > datetime.now() + timedelta(seconds=20)
+
+            # Ainda não venceu: não deve ser reservado novamente
+            assert email_service.process_outbox()["claimed"] == 0
+
+    def test_exhausted_retries_go_to_dead_letter(self, app):
+        """Após o máximo de tentativas o email deve ir para a dead letter"""
+        with app.app_context():
+            app.config["EMAIL_OUTBOX_MAX_ATTEMPTS"] = 2
+            state = app.extensions["mail"]
+            state.server, state.port, state.suppress, state.use_tls = "127.0.0.1", free_port(), False, False
+            _enqueue(1)
+
+            email_service.process_outbox()
+            email = EmailOutbox.query.one()
+            email.next_attempt_at = datetime.now() - timedelta(seconds=1)
+            db.session.commit()
+
+            stats = email_service.process_outbox()
+
+            assert stats["dead"] == 1
+            assert EmailOutbox.query.one().status == EmailStatus.DEAD
+            assert email_service.process_outbox()["claimed"] == 0
+
+    def test_stale_claim_is_recovered(self, app, smtp_server):
+        """Reservas abandonadas por um worker que morreu devem ser retomadas"""
+        with app.app_context():
+            _enqueue(2)
+            email_service._claim_batch(10)
+
+            # Reserva recente: outro worker não deve pegar
+            assert email_service.process_outbox()["claimed"] == 0
+
+            EmailOutbox.query.update(
+                {"claimed_at": datetime.now() - timedelta(hours=1)})
+            db.session.commit()
+
+            assert email_service.process_outbox()["sent"] == 2
+            assert len(smtp_server.messages) == 2
+
+
+class TestEmailOutboxWorker:
+    """Testes do worker de envio em background"""
+
+    def test_disabled_worker_does_not_start(self, app):
+        """Com EMAIL_OUTBOX_WORKER_ENABLED desligado nenhuma thread deve ser criada"""
+        from utils.email_outbox_worker import EmailOutboxWorker
+
+        worker = EmailOutboxWorker()
+        worker.init_app(app)
+
+        assert worker._thread is None
+
+    def test_worker_thread_drains_queue(self, app, smtp_server):
+        """O worker deve enviar os emails enfileirados e parar de forma limpa"""
+        import time
+        from utils.email_outbox_worker import EmailOutboxWorker
+
+        with app.app_context():
+            _enqueue(3)
+
+        app.config["EMAIL_OUTBOX_WORKER_ENABLED"] = True
+        worker = EmailOutboxWorker()
+        worker.init_app(app)
+        try:
+            deadline = time.monotonic() + 5
+            while len(smtp_server.messages) < 3 and time.monotonic() < deadline:
+                time.sleep(0.05)
+        finally:
+            worker.stop()
+
+        assert len(smtp_server.messages) == 3
+        with app.app_context():
+            assert EmailOutbox.query.filter_by(status=EmailStatus.SENT).count() == 3
+
+
+class TestSendMessagesBatch:
+    """Testes da API de envio em lote com conexões persistentes"""
+
+    def _messages(self, total: int):
+        from flask_mail import Message
+        return [Message(subject=f"Lote {i}", recipients=[f"lote{i}@test.com"], body="corpo")
+                for i in range(total)]
+
+    def test_caps_messages_per_connection(self, app, smtp_server):
+        """Cada conexão deve ser reaberta após max_per_connection mensagens"""
+        with app.app_context():
+            results = email_service.send_messages_batch(
+                self._messages(10), connections=1, max_per_connection=4)
+
+            assert results == [None] * 10
+            assert len(smtp_server.messages) == 10
+            assert len(smtp_server.sessions) == 3
+
+    def test_uses_concurrent_connections(self, app, smtp_server):
+        """Com várias conexões as mensagens devem ser divididas entre elas"""
+        with app.app_context():
+            results = email_service.send_messages_batch(
+                self._messages(20), connections=3, max_per_connection=100)
+
+            assert results == [None] * 20
+            assert len(smtp_server.messages) == 20
+            assert 1 < len(smtp_server.sessions) <= 3
+
+    def test_reconnects_after_disconnect(self, app, smtp_server):
+        """Uma queda da conexão deve causar reconexão e reenvio da mensagem"""
+        import smtplib
+        from flask_mail import Connection
+
+        original = Connection.send
+        calls = {"count": 0}
+
+        def flaky_send(self, message, *args, **kwargs):
+            calls["count"] += 1
+            if calls["count"] == 3:
+                raise smtplib.SMTPServerDisconnected("conexão encerrada")
+            return original(self, message, *args, **kwargs)
+
+        with app.app_context():
+            with patch.object(Connection, "send", flaky_send):
+                results = email_service.send_messages_batch(
+                    self._messages(5), connections=1, max_per_connection=100)
+
+            assert results == [None] * 5
+            assert len(smtp_server.messages) == 5
+            assert len(smtp_server.sessions) == 2
+
+    def test_unreachable_server_fails_whole_batch_fast(self, app):
+        """Sem servidor o lote deve falhar sem tentar cada mensagem"""
+        with app.app_context():
+            state = app.extensions["mail"]
+            state.server, state.port, state.suppress, state.use_tls = "127.0.0.1", free_port(), False, False
+
+            with patch("smtplib.SMTP.connect", wraps=None,
+                       side_effect=ConnectionRefusedError("recusada")) as mock_connect:
+                results = email_service.send_messages_batch(
+                    self._messages(50), connections=2, retries=1)
+
+            assert all(isinstance(r, ConnectionRefusedError) for r in results)
+            assert mock_connect.call_count <= 4
@@ -1,12 +1,16 @@
+import base64
+import json
 import pytest
 from datetime import datetime, timedelta
 from unittest.mock import patch, MagicMock
+from sqlalchemy import text
 from app import db
 from domain.models import User, Event, EventType, UserType, event_participants
 from domain.dtos import EventFilterDTO
 from services import event_service
 from exceptions import BadRequestException, NotFoundException
 from exceptions.business_exceptions import UnauthorizedException
+from tests.conftest import QueryCounter
 
 
 class TestEventServiceCreate:
@@ -960,6 +964,558 @@ class TestEventServiceList:
             assert len(enrollments) == 2
 
 
+class TestEventServiceEnrollmentCounter:
+    """Testes do contador desnormalizado de inscritos (Event.enrolled_count)"""
+
+    def _setup(self, capacity=None):
+        organizer = User(
+            name="Organizador Test",
+            email="organizador@test.com",
+            password="12345678",
+            type=UserType.ORGANIZER
+        )
+        organizer.encrypt_password()
+        participant = User(
+            name="Participante Test",
+            email="participante@test.com",
+            password="12345678",
+            type=UserType.REGULAR
+        )
+        participant.encrypt_password()
+        db.session.add_all([organizer, participant])
+        db.session.commit()
+
+        event = Event(
+            title="Workshop Python",
+            date=datetime.now() + timedelta(days=30),
+            location="Sala 101",
+            capacity=capacity,
+            type=EventType.WORKSHOP,
+            institution_organizer="UFPE",
+            created_by=organizer.id
+        )
+        db.session.add(event)
+        db.session.commit()
+        return organizer, participant, event
+
+    def test_enroll_and_cancel_update_counter(self, app):
+        """Inscrição, cancelamento e reinscrição devem manter o contador"""
+        with app.app_context():
+            _, participant, event = self._setup()
+
+            assert event.enrolled_count == 0
+
+            event_service.enroll_user(event.id, participant)
+            assert Event.query.get(event.id).enrolled_count == 1
+
+            event_service.cancel_enrollment(event.id, participant)
+            assert Event.query.get(event.id).enrolled_count == 0
+
+            event_service.enroll_user(event.id, participant)
+            assert Event.query.get(event.id).enrolled_count == 1
+
+    def test_failed_enrollment_does_not_change_counter(self, app):
+        """Inscrição rejeitada não deve alterar o contador"""
+        with app.app_context():
+            _, participant, event = self._setup()
+
+            event_service.enroll_user(event.id, participant)
+            with pytest.raises(BadRequestException):
+                event_service.enroll_user(event.id, participant)
+
+            assert Event.query.get(event.id).enrolled_count == 1
+
+    def test_enrollment_does_not_touch_search_index(self, app):
+        """Atualizar o contador não deve reescrever o índice FTS (o trigger olha só as colunas de texto)"""
+        with app.app_context():
+            _, participant, event = self._setup()
+            snapshot = text("SELECT id, block FROM events_fts_data ORDER BY id")
+            before = db.session.execute(snapshot).all()
+
+            event_service.enroll_user(event.id, participant)
+            event_service.cancel_enrollment(event.id, participant)
+
+            assert db.session.execute(snapshot).all() == before
+
+    def test_public_details_use_counter(self, app):
+        """Detalhes públicos devem refletir o contador"""
+        with app.app_context():
+            _, participant, event = self._setup(capacity=1)
+
+            event_service.enroll_user(event.id, participant)
+
+            with patch('services.event_service.current_user', participant):
+                details = event_service.get_public_event_details(event.id)
+
+            assert details['enrolled_count'] == 1
+            assert details['remaining_slots'] == 0
+            assert details['is_full'] is True
+            assert details['is_participant'] is True
+
+    def test_reconcile_detects_and_repairs_drift(self, app):
+        """Reconciliação deve detectar e corrigir divergências"""
+        with app.app_context():
+            _, participant, event = self._setup()
+
+            db.session.execute(event_participants.insert().values(
+                user_id=participant.id,
+                event_id=event.id,
+                registered_at=datetime.now(),
+                active=True
+            ))
+            db.session.commit()
+
+            drift = event_service.reconcile_enrolled_counts(fix=False)
+            assert drift == [{"event_id": event.id, "stored": 0, "actual": 1}]
+            assert Event.query.get(event.id).enrolled_count == 0
+
+            event_service.reconcile_enrolled_counts()
+            assert Event.query.get(event.id).enrolled_count == 1
+            assert event_service.reconcile_enrolled_counts(fix=False) == []
+
+    def test_reconcile_cli_command(self, app, runner):
+        """Comando flask events reconcile-enrollments deve corrigir divergências"""
+        with app.app_context():
+            _, _, event = self._setup()
+            event.enrolled_count = 5
+            db.session.commit()
+
+            result = runner.invoke(args=["events", "reconcile-enrollments", "--dry-run"])
+            assert "armazenado=5 real=0" in result.output
+            assert Event.query.get(event.id).enrolled_count == 5
+
+            result = runner.invoke(args=["events", "reconcile-enrollments"])
+            assert "1 evento(s) corrigido(s)" in result.output
+            db.session.expire_all()
+            assert Event.query.get(event.id).enrolled_count == 0
+
+
+@pytest.mark.slow
+class TestEventServiceConcurrentEnrollment:
+    """Teste de estresse: inscrições concorrentes não podem exceder a capacidade"""
+
+    TOTAL_REQUESTS = 1000
+    CAPACITY = 100
+    WORKERS = 32
+
+    @pytest.fixture
+    def file_app(self, tmp_path, monkeypatch):
+        """Aplicação com SQLite em arquivo, compartilhado entre as threads"""
+        from app import create_app
+        from config import Config
+
+        monkeypatch.setattr(Config, 'SQLALCHEMY_DATABASE_URI',
+                            f"sqlite:///{tmp_path / 'stress.db'}", raising=False)
+        monkeypatch.setattr(Config, 'SQLALCHEMY_ENGINE_OPTIONS',
+                            {"connect_args": {"timeout": 60}}, raising=False)
+
+        stress_app = create_app()
+        with stress_app.app_context():
+            db.create_all()
+            yield stress_app
+            db.session.remove()
+            db.drop_all()
+
+    def test_concurrent_enrollments_respect_capacity(self, file_app):
+        """1000 inscrições concorrentes em evento de 100 vagas: exatamente 100 sucessos"""
+        from concurrent.futures import ThreadPoolExecutor
+        from types import SimpleNamespace
+        import time
+
+        organizer = User(
+            name="Organizador Test",
+            email="organizador@test.com",
+            password="hash",
+            type=UserType.ORGANIZER
+        )
+        db.session.add(organizer)
+        db.session.commit()
+
+        db.session.execute(User.__table__.insert(), [
+            {"name": f"Participante {i}", "email": f"p{i}@test.com", "password": "hash",
+             "type": UserType.REGULAR, "active": True}
+            for i in range(self.TOTAL_REQUESTS)
+        ])
+        event = Event(
+            title="Conferência Popular",
+            date=datetime.now() + timedelta(days=30),
+            location="Auditório",
+            capacity=self.CAPACITY,
+            type=EventType.CONFERENCE,
+            institution_organizer="UFPE",
+            created_by=organizer.id
+        )
+        db.session.add(event)
+        db.session.commit()
+
+        event_id = event.id
+        user_ids = [u.id for u in User.query.filter(User.id != organizer.id).all()]
+
+        def enroll(user_id):
+            with file_app.app_context():
+                try:
+                    event_service.enroll_user(event_id, SimpleNamespace(id=user_id))
+                    return "ok"
+                except BadRequestException as e:
+                    return "full" if "lotado" in str(e.details) else "error"
+                except Exception:
+                    return "error"
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.WORKERS) as pool:
+            results = list(pool.map(enroll, user_ids))
+        elapsed = time.perf_counter() - start
+
+        print(f"\n{len(results)} inscrições concorrentes em {elapsed:.2f}s "
+              f"({len(results) / elapsed:.0f} req/s, {self.WORKERS} threads)")
+
+        db.session.expire_all()
+        active = db.session.query(event_participants).filter_by(
+            event_id=event_id, active=True).count()
+
+        assert results.count("ok") == self.CAPACITY
+        assert results.count("full") == self.TOTAL_REQUESTS - self.CAPACITY
+        assert active == self.CAPACITY
+        assert Event.query.get(event_id).enrolled_count == self.CAPACITY
+
+
+class TestEventServiceAvailableListing:
+    """Testes de listagem agregada de eventos disponíveis - Desempenho"""
+
+    def _create_events(self, organizer, participant, total):
+        events = []
+        for i in range(total):
+            event = Event(
+                title=f"Workshop {i}",
+                date=datetime.now() + timedelta(days=10 + i),
+                location="Sala 101",
+                capacity=10,
+                type=EventType.WORKSHOP,
+                institution_organizer="UFPE",
+                created_by=organizer.id
+            )
+            db.session.add(event)
+            events.append(event)
+        db.session.commit()
+
+        for event in events[::2]:
+            event_service.enroll_user(event.id, participant)
+        return events
+
+    def _setup_users(self):
+        organizer = User(
+            name="Organizador Test",
+            email="organizador@test.com",
+            password="12345678",
+            type=UserType.ORGANIZER
+        )
+        organizer.encrypt_password()
+        participant = User(
+            name="Participante Test",
+            email="participante@test.com",
+            password="12345678",
+            type=UserType.REGULAR
+        )
+        participant.encrypt_password()
+        db.session.add_all([organizer, participant])
+        db.session.commit()
+        return organizer, participant
+
+    def test_list_available_events_counts_and_participation(self, app):
+        """Deve calcular inscritos, vagas e participação por evento"""
+        with app.app_context():
+            organizer, participant = self._setup_users()
+            self._create_events(organizer, participant, 4)
+
+            mock_user = MagicMock()
+            mock_user.id = participant.id
+
+            with patch('services.event_service.current_user', mock_user):
+                events = event_service.list_available_events(None)
+
+            assert len(events) == 4
+            by_title = {e['title']: e for e in events}
+            assert by_title["Workshop 0"]['is_participant'] is True
+            assert by_title["Workshop 0"]['enrolled_count'] == 1
+            assert by_title["Workshop 0"]['remaining_slots'] == 9
+            assert by_title["Workshop 1"]['is_participant'] is False
+            assert by_title["Workshop 1"]['enrolled_count'] == 0
+            assert by_title["Workshop 1"]['remaining_slots'] == 10
+
+    def test_list_available_events_honours_filters(self, app):
+        """Deve aplicar filtros e ordenação do EventFilterDTO"""
+        with app.app_context():
+            organizer, participant = self._setup_users()
+            self._create_events(organizer, participant, 5)
+
+            filter = EventFilterDTO()
+            filter.q = "Workshop 3"
+            filter.order_direction = 'desc'
+
+            mock_user = MagicMock()
+            mock_user.id = participant.id
+
+            with patch('services.event_service.current_user', mock_user):
+                events = event_service.list_available_events(filter)
+
+            assert [e['title'] for e in events] == ["Workshop 3"]
+
+    def test_list_available_events_constant_query_count(self, app):
+        """Número de consultas não deve crescer com a quantidade de eventos"""
+        with app.app_context():
+            organizer, participant = self._setup_users()
+
+            mock_user = MagicMock()
+            mock_user.id = participant.id
+
+            self._create_events(organizer, participant, 2)
+            with patch('services.event_service.current_user', mock_user):
+                with QueryCounter(db.engine) as few:
+                    assert len(event_service.list_available_events(None)) == 2
+
+            self._create_events(organizer, participant, 50)
+            with patch('services.event_service.current_user', mock_user):
+                with QueryCounter(db.engine) as many:
+                    assert len(event_service.list_available_events(None)) == 52
+
+            assert many.count == few.count
+            assert many.count == 1
+
+
+class TestEventServicePagination:
+    """Testes de paginação por cursor (keyset) - Regras de negócio"""
+
+    def _setup(self, total):
+        organizer = User(
+            name="Organizador Test",
+            email="organizador@test.com",
+            password="12345678",
+            type=UserType.ORGANIZER
+        )
+        organizer.encrypt_password()
+        db.session.add(organizer)
+        db.session.commit()
+
+        for i in range(total):
+            db.session.add(Event(
+                title=f"Workshop {i:02d}",
+                date=datetime.now() + timedelta(days=10 + i % 3),
+                location="Sala 101",
+                capacity=None if i % 4 == 0 else i % 5 + 1,
+                type=EventType.WORKSHOP,
+                institution_organizer="UFPE",
+                created_by=organizer.id
+            ))
+        db.session.commit()
+        return organizer
+
+    def _walk(self, fetch, limit):
+        pages = []
+        cursor = None
+        while True:
+            items, cursor = fetch(limit, cursor)
+            pages.append(items)
+            if not cursor:
+                return pages
+
+    def test_list_events_page_walks_all_events_without_duplicates(self, app):
+        """Deve percorrer todas as páginas sem repetir ou perder eventos"""
+        with app.app_context():
+            organizer = self._setup(11)
+
+            for order_by in ['date', 'capacity', 'title']:
+                for direction in ['asc', 'desc']:
+                    def fetch(limit, cursor):
+                        return event_service.list_events_page(
+                            organizer, self._filter(order_by, direction), limit, cursor)
+
+                    pages = self._walk(fetch, 4)
+                    ids = [event.id for page in pages for event in page]
+
+                    expected = [event.id for event in event_service.list_events(
+                        organizer, self._filter(order_by, direction))]
+
+                    assert [len(page) for page in pages] == [4, 4, 3]
+                    assert ids == expected
+
+    def _filter(self, order_by, direction):
+        filter = EventFilterDTO()
+        filter.order_by = order_by
+        filter.order_direction = direction
+        return filter
+
+    def test_list_available_events_page(self, app):
+        """Deve paginar eventos disponíveis mantendo os campos agregados"""
+        with app.app_context():
+            organizer = self._setup(5)
+
+            mock_user = MagicMock()
+            mock_user.id = organizer.id
+
+            with patch('services.event_service.current_user', mock_user):
+                first, cursor = event_service.list_available_events_page(None, 3)
+                second, last_cursor = event_service.list_available_events_page(None, 3, cursor)
+
+            assert len(first) == 3
+            assert len(second) == 2
+            assert last_cursor is None
+            assert 'remaining_slots' in first[0]
+            assert {e['id'] for e in first}.isdisjoint({e['id'] for e in second})
+
+    def test_cursor_with_different_ordering_should_fail(self, app):
+        """Deve rejeitar cursor gerado para outra ordenação"""
+        with app.app_context():
+            organizer = self._setup(3)
+
+            _, cursor = event_service.list_events_page(organizer, None, 1)
+
+            with pytest.raises(BadRequestException):
+                event_service.list_events_page(
+                    organizer, self._filter('title', 'desc'), 1, cursor)
+
+    def test_invalid_cursor_should_fail(self, app):
+        """Deve rejeitar cursor malformado"""
+        with app.app_context():
+            organizer = self._setup(1)
+
+            with pytest.raises(BadRequestException):
+                event_service.list_events_page(organizer, None, 1, "nao-e-um-cursor")
+
+
+class TestEventFilterSearch:
+    """Testes da busca textual (FTS5) do filtro q"""
+
+    def _setup(self):
+        organizer = User(
+            name="Organizador Test",
+            email="organizador@test.com",
+            password="12345678",
+            type=UserType.ORGANIZER
+        )
+        organizer.encrypt_password()
+        db.session.add(organizer)
+        db.session.commit()
+
+        events = [
+            Event(
+                title="Introdução a Python",
+                description="Conceitos básicos",
+                date=datetime.now() + timedelta(days=10),
+                location="Sala 101",
+                type=EventType.WORKSHOP,
+                institution_organizer="UFPE",
+                created_by=organizer.id
+            ),
+            Event(
+                title="Palestra de IA",
+                description="Aplicações com python e dados",
+                date=datetime.now() + timedelta(days=5),
+                location="Auditório",
+                type=EventType.LECTURE,
+                institution_organizer="UFRPE",
+                created_by=organizer.id
+            ),
+            Event(
+                title="Hackathon",
+                date=datetime.now() + timedelta(days=7),
+                location="Laboratório",
+                type=EventType.HACKATHON,
+                institution_organizer="CIn",
+                created_by=organizer.id
+            ),
+        ]
+        db.session.add_all(events)
+        db.session.commit()
+        return organizer, events
+
+    def _search(self, organizer, q, order_by=None):
+        filter = EventFilterDTO()
+        filter.q = q
+        if order_by:
+            filter.order_by = order_by
+        return event_service.list_events(organizer, filter)
+
+    def test_search_matches_substring_case_insensitive(self, app):
+        """Deve encontrar substrings em qualquer coluna, sem diferenciar maiúsculas"""
+        with app.app_context():
+            organizer, _ = self._setup()
+
+            titles = {e.title for e in self._search(organizer, "YTHO")}
+
+            assert titles == {"Introdução a Python", "Palestra de IA"}
+
+    def test_search_orders_by_relevance(self, app):
+        """Ordenação por relevância deve priorizar matches no título"""
+        with app.app_context():
+            organizer, _ = self._setup()
+
+            events = self._search(organizer, "python", order_by='relevance')
+
+            assert [e.title for e in events] == ["Introdução a Python", "Palestra de IA"]
+
+    def test_from_dict_defaults_to_relevance_when_searching(self, app):
+        """Filtro com q e sem order_by deve ordenar por relevância"""
+        with app.app_context():
+            data = base64.b64encode(json.dumps({"q": "python"}).encode()).decode()
+
+            assert EventFilterDTO.from_dict(data).order_by == 'relevance'
+
+    def _search_pages(self, organizer, q, limit=1):
+        pages, cursor = [], None
+        while True:
+            filter = EventFilterDTO()
+            filter.q, filter.order_by = q, 'relevance'
+            events, cursor = event_service.list_events_page(organizer, filter, limit, cursor)
+            pages.append([e.title for e in events])
+            if not cursor:
+                return pages
+
+    def test_paginated_search_keeps_relevance_order(self, app):
+        """A paginação por cursor segue o rank bm25 da busca, e não a data"""
+        with app.app_context():
+            organizer, _ = self._setup()
+
+            assert self._search_pages(organizer, "python") == [["Introdução a Python"], ["Palestra de IA"]]
+            # Termo curto (sem índice FTS): ordenação determinística pelo id
+            assert self._search_pages(organizer, "la") == [["Introdução a Python"], ["Hackathon"]]
+
+    def test_paginated_invalid_ordering_should_fail(self, app):
+        """Ordenação desconhecida, ou relevância sem busca, é rejeitada em vez de trocada por date"""
+        with app.app_context():
+            organizer, _ = self._setup()
+
+            for order_by, q in (("inexistente", None), ("relevance", None)):
+                filter = EventFilterDTO()
+                filter.q, filter.order_by = q, order_by
+                with pytest.raises(BadRequestException):
+                    event_service.list_events_page(organizer, filter, 1)
+
+    def test_search_index_follows_updates(self, app):
+        """Índice deve refletir alterações nos eventos"""
+        with app.app_context():
+            organizer, events = self._setup()
+
+            events[2].title = "Hackathon de Python"
+            db.session.commit()
+
+            assert len(self._search(organizer, "python")) == 3
+
+            events[0].title = "Introdução a Go"
+            db.session.commit()
+
+            titles = {e.title for e in self._search(organizer, "python")}
+            assert "Introdução a Go" not in titles
+
+    def test_short_search_falls_back_to_ilike(self, app):
+        """Termos com menos de 3 caracteres devem usar ILIKE"""
+        with app.app_context():
+            organizer, _ = self._setup()
+
+            titles = {e.title for e in self._search(organizer, "ia")}
+
+            assert "Palestra de IA" in titles
+
+
 class TestEventServiceValidation:
     """Testes de validação de campos - Regras de negócio"""
 
@@ -0,0 +1,200 @@
+import threading
+import time
+from datetime import datetime, timedelta
+from domain.models import JobRun, JobRunStatus, ScheduledJob
+from services import scheduled_job_service
+from services.scheduled_job_service import CATCH_UP_SKIP, compute_next_run
+from utils.certificate_scheduler import CertificateScheduler
+from utils.job_scheduler import JobScheduler
+
+
+def _scheduler(app, owner="dono"):
+    scheduler = JobScheduler(app)
+    scheduler.owner = owner
+    return scheduler
+
+
+class TestComputeNextRun:
+    """Cálculo da próxima execução a partir dos gatilhos do job"""
+
+    def test_interval_does_not_drift(self):
+        """O intervalo é contado do horário agendado, não do fim da execução"""
+        anchor = datetime(2025, 1, 1, 0, 0)
+
+        assert compute_next_run(3600, None, anchor, anchor + timedelta(minutes=7)) == datetime(2025, 1, 1, 1, 0)
+        # Várias execuções perdidas: pula direto para o próximo horário futuro
+        assert compute_next_run(3600, None, anchor, anchor + timedelta(hours=5, minutes=1)) == datetime(2025, 1, 1, 6, 0)
+
+    def test_daily_and_combined_triggers(self):
+        """Com intervalo e horário diário, vence o gatilho mais próximo"""
+        after = datetime(2025, 1, 1, 22, 0)
+
+        assert compute_next_run(None, "23:00", after, after) == datetime(2025, 1, 1, 23, 0)
+        assert compute_next_run(None, "03:00", after, after) == datetime(2025, 1, 2, 3, 0)
+        assert compute_next_run(6 * 3600, "23:00", datetime(2025, 1, 1, 18, 0), after) == datetime(2025, 1, 1, 23, 0)
+        assert compute_next_run(6 * 3600, "23:00", datetime(2025, 1, 1, 23, 0), datetime(2025, 1, 1, 23, 0, 5)) \
+            == datetime(2025, 1, 2, 5, 0)
+
+
+class TestJobScheduler:
+    """Testes do scheduler persistente de jobs"""
+
+    def test_registration_persists_and_survives_restart(self, app):
+        """A próxima execução é persistida e mantida por um novo processo (reinício)"""
+        now = datetime(2025, 1, 1, 12, 0)
+        first = _scheduler(app)
+        first.register("job", lambda: None, interval_seconds=3600)
+        first.sync(now=now)
+
+        restarted = _scheduler(app)
+        restarted.register("job", lambda: None, interval_seconds=3600)
+        restarted.sync(now=now + timedelta(minutes=30))
+
+        with app.app_context():
+            assert scheduled_job_service.get_job("job").next_run_at == datetime(2025, 1, 1, 13, 0)
+        assert restarted.seconds_until_next(now=now + timedelta(minutes=30)) == 1800
+
+    def test_heap_orders_jobs_and_records_history(self, app):
+        """Executa apenas os jobs vencidos, na ordem, gravando duração e resultado"""
+        now = datetime(2025, 1, 1, 12, 0)
+        calls = []
+        scheduler = _scheduler(app)
+        scheduler.register("rapido", lambda: calls.append("rapido") or {"itens": 2}, interval_seconds=60)
+        scheduler.register("lento", lambda: calls.append("lento"), interval_seconds=600)
+        scheduler.sync(now=now)
+
+        assert scheduler.run_due(now=now + timedelta(seconds=59)) == []
+        assert scheduler.run_due(now=now + timedelta(seconds=61)) == ["rapido"]
+        assert scheduler.seconds_until_next(now=now + timedelta(seconds=61)) == 59
+
+        with app.app_context():
+            [run] = scheduled_job_service.get_job_runs("rapido")
+            assert run.status == JobRunStatus.SUCCESS
+            assert run.result == {"itens": 2}
+            assert run.scheduled_for == now + timedelta(seconds=60)
+            assert run.duration_seconds >= 0
+
+            job = scheduled_job_service.get_job("rapido")
+            assert job.last_status == JobRunStatus.SUCCESS
+            assert job.running_since is None
+            assert job.next_run_at == now + timedelta(seconds=120)
+        assert calls == ["rapido"]
+
+    def test_failure_is_recorded_and_job_rescheduled(self, app):
+        """Um job com erro registra FAILED e continua agendado"""
+        def boom():
+            raise RuntimeError("falhou")
+
+        now = datetime(2025, 1, 1, 12, 0)
+        scheduler = _scheduler(app)
+        scheduler.register("quebrado", boom, interval_seconds=60)
+        scheduler.sync(now=now)
+
+        scheduler.run_due(now=now + timedelta(seconds=60))
+
+        with app.app_context():
+            [run] = scheduled_job_service.get_job_runs("quebrado")
+            assert run.status == JobRunStatus.FAILED
+            assert run.error == "falhou"
+            assert scheduled_job_service.get_job("quebrado").next_run_at == now + timedelta(seconds=120)
+
+    def test_missed_runs_run_once(self, app):
+        """Com run_once, várias execuções perdidas viram uma única execução"""
+        now = datetime(2025, 1, 1, 12, 0)
+        calls = []
+        scheduler = _scheduler(app)
+        scheduler.register("job", lambda: calls.append(1), interval_seconds=3600)
+        scheduler.sync(now=now)
+
+        resumed_at = now + timedelta(hours=5, minutes=30)
+        assert scheduler.run_due(now=resumed_at) == ["job"]
+
+        assert calls == [1]
+        with app.app_context():
+            assert scheduled_job_service.get_job("job").next_run_at == now + timedelta(hours=6)
+
+    def test_missed_run_skipped(self, app):
+        """Com skip, a execução perdida é registrada como SKIPPED sem executar"""
+        now = datetime(2025, 1, 1, 12, 0)
+        calls = []
+        scheduler = _scheduler(app)
+        scheduler.register("diario", lambda: calls.append(1), daily_at="13:00", catch_up=CATCH_UP_SKIP)
+        scheduler.sync(now=now)
+
+        scheduler.run_due(now=datetime(2025, 1, 1, 18, 0))
+
+        assert calls == []
+        with app.app_context():
+            [run] = scheduled_job_service.get_job_runs("diario")
+            assert run.status == JobRunStatus.SKIPPED
+            assert scheduled_job_service.get_job("diario").next_run_at == datetime(2025, 1, 2, 13, 0)
+
+        # Dentro da tolerância o job executa normalmente
+        scheduler.run_due(now=datetime(2025, 1, 2, 13, 1))
+        assert calls == [1]
+
+    def test_running_job_is_not_claimed_again(self, app):
+        """Enquanto uma execução está em andamento, outro processo não reserva o job"""
+        now = datetime(2025, 1, 1, 12, 0)
+        with app.app_context():
+            scheduled_job_service.register_job("job", interval_seconds=60, now=now)
+
+            assert scheduled_job_service.claim_run("job", "a", now + timedelta(seconds=60), timeout=3600)
+            # O job atrasou e o próximo horário venceu com a execução ainda em andamento
+            later = now + timedelta(seconds=130)
+            assert scheduled_job_service.claim_run("job", "b", later, timeout=3600) is None
+            # Execução abandonada (dono morto) é reservada após o timeout
+            assert scheduled_job_service.claim_run("job", "b", later, timeout=10)
+
+    def test_history_is_pruned(self, app):
+        """Apenas as SCHEDULER_JOB_HISTORY execuções mais recentes são mantidas"""
+        app.config["SCHEDULER_JOB_HISTORY"] = 3
+        now = datetime(2025, 1, 1, 12, 0)
+        scheduler = _scheduler(app)
+        scheduler.register("job", lambda: None, interval_seconds=60)
+        scheduler.sync(now=now)
+
+        for minute in range(1, 6):
+            scheduler.run_due(now=now + timedelta(minutes=minute, seconds=1))
+
+        with app.app_context():
+            runs = scheduled_job_service.get_job_runs("job")
+            assert len(runs) == 3
+            assert JobRun.query.count() == 3
+            assert runs[0].scheduled_for == now + timedelta(minutes=5)
+
+    def test_loop_sleeps_until_next_job(self, app):
+        """O loop dorme até o job vencer, sem polling, e para com wake()"""
+        calls = []
+        scheduler = _scheduler(app)
+        scheduler.register("job", lambda: calls.append(time.monotonic()), interval_seconds=1)
+        stop = threading.Event()
+
+        started = time.monotonic()
+        thread = threading.Thread(target=scheduler.run_forever, args=(stop,), daemon=True)
+        thread.start()
+        try:
+            deadline = time.monotonic() + 5
+            while not calls and time.monotonic() < deadline:
+                time.sleep(0.05)
+        finally:
+            stop.set()
+            scheduler.wake()
+            thread.join(timeout=5)
+
+        assert not thread.is_alive()
+        assert len(calls) == 1
+        assert 0.9 <= calls[0] - started < 2
+
+    def test_certificate_scheduler_registers_jobs(self, app):
+        """Processamento de certificados (6h + 23:00) é um único job; retenção e coleta usam skip"""
+        scheduler = CertificateScheduler(app)
+        scheduler._register_jobs()
+        scheduler.jobs.sync()
+
+        with app.app_context():
+            jobs = {job.name: job for job in ScheduledJob.query.all()}
+            certificates = jobs["certificates.process_completed_events"]
+            assert (certificates.interval_seconds, certificates.daily_at) == (6 * 3600, "23:00")
+            assert jobs["notifications.retention"].catch_up == CATCH_UP_SKIP
+            assert (jobs["certificates.gc"].daily_at, jobs["certificates.gc"].catch_up) == ("04:00", CATCH_UP_SKIP)
@@ -0,0 +1,679 @@
+import pytest
+from datetime import datetime, timedelta
+from app import db
+from domain.models import (Event, EventType, Notification, NotificationArchive, User, UserType,
+                           event_participants)
+from services import notification_service
+from tests.conftest import QueryCounter, create_test_user
+
+
+def _create_event_with_participants(active: int, inactive: int = 0, inactive_users: int = 0):
+    organizer = create_test_user(name="Organizador", email="org@notif.com",
+                                 user_type=UserType.ORGANIZER)
+    event = Event(
+        title="Evento Notificado",
+        date=datetime.now() + timedelta(days=3),
+        location="Sala 1",
+        type=EventType.MEETUP,
+        institution_organizer="UFPE",
+        created_by=organizer.id
+    )
+    db.session.add(event)
+    db.session.commit()
+
+    rows = []
+    for i in range(active + inactive + inactive_users):
+        user = create_test_user(name=f"Participante {i}", email=f"p{i}@notif.com")
+        if i >= active + inactive:
+            user.active = False
+        rows.append({"user_id": user.id, "event_id": event.id,
+                     "registered_at": datetime.now(),
+                     "active": not (active <= i < active + inactive)})
+    db.session.commit()
+    if rows:
+        db.session.execute(event_participants.insert(), rows)
+        db.session.commit()
+    return event, [row["user_id"] for row in rows[:active]]
+
+
+class TestSaveNotificationsBulk:
+    """Testes da gravação de notificações em lote"""
+
+    def test_inserts_all_rows_in_one_statement(self, app):
+        """Deve inserir todas as notificações com um único INSERT e um commit"""
+        with app.app_context():
+            users = [create_test_user(email=f"u{i}@bulk.com") for i in range(5)]
+            notifications = [
+                Notification(user_id=user.id, title="Aviso", message=f"Mensagem {user.id}")
+                for user in users
+            ]
+
+            with QueryCounter(db.engine) as counter:
+                saved = notification_service.save_notifications_bulk(notifications)
+
+            inserts = [s for s in counter.statements if s.startswith("INSERT INTO notifications")]
+            assert saved == 5
+            assert len(inserts) == 1
+            stored = Notification.query.order_by(Notification.user_id).all()
+            assert [n.user_id for n in stored] == [u.id for u in users]
+            assert all(n.is_read is False and n.created_at for n in stored)
+            assert all(db.session.get(User, u.id).unread_count == 1 for u in users)
+
+    def test_failure_rolls_back_whole_batch(self, app):
+        """Uma linha inválida deve desfazer o lote inteiro"""
+        with app.app_context():
+            user = create_test_user()
+            notifications = [
+                Notification(user_id=user.id, title="Ok", message="válida"),
+                Notification(user_id=None, title="Inválida", message="sem usuário"),
+            ]
+
+            assert notification_service.save_notifications_bulk(notifications) == 0
+            assert Notification.query.count() == 0
+            assert db.session.get(User, user.id).unread_count == 0
+
+    def test_empty_list_is_noop(self, app):
+        """Lista vazia não deve executar nenhum comando"""
+        with app.app_context():
+            with QueryCounter(db.engine) as counter:
+                assert notification_service.save_notifications_bulk([]) == 0
+            assert counter.count == 0
+
+
+class TestNotifyEventParticipants:
+    """Testes da notificação de todos os participantes de um evento"""
+
+    def test_single_insert_select_for_active_participants(self, app):
+        """Deve notificar apenas inscrições e usuários ativos com um único INSERT ... SELECT"""
+        with app.app_context():
+            event, active_ids = _create_event_with_participants(
+                active=6, inactive=2, inactive_users=1)
+            event_id = event.id
+
+            with QueryCounter(db.engine) as counter:
+                created = notification_service.notify_event_participants(
+                    event_id, "Evento alterado", "O local do evento mudou.", link="eventos/1")
+
+            assert created == 6
+            assert counter.count == 2
+            assert counter.statements[0].startswith("INSERT INTO notifications")
+            assert "SELECT" in counter.statements[0]
+            assert counter.statements[1].startswith("UPDATE users SET unread_count")
+
+            notifications = Notification.query.order_by(Notification.user_id).all()
+            assert [n.user_id for n in notifications] == sorted(active_ids)
+            assert all(n.title == "Evento alterado" and n.link == "eventos/1" and not n.is_read
+                       for n in notifications)
+            counts = dict(db.session.query(User.id, User.unread_count).all())
+            assert all(counts[user_id] == 1 for user_id in active_ids)
+            assert sum(counts.values()) == 6
+
+    def test_event_without_participants(self, app):
+        """Evento sem participantes não deve criar notificações"""
+        with app.app_context():
+            event, _ = _create_event_with_participants(active=0)
+
+            assert notification_service.notify_event_participants(
+                event.id, "Aviso", "Mensagem") == 0
+            assert Notification.query.count() == 0
+
+
+class TestUnreadCounter:
+    """Testes do contador desnormalizado de notificações não lidas"""
+
+    def _headers(self, user):
+        return {"Authorization": f"Bearer {user.generate_auth_token()}"}
+
+    def _notify(self, user_id: int, is_read: bool = False) -> int:
+        notification = Notification(user_id=user_id, title="Aviso", message="mensagem",
+                                    is_read=is_read)
+        assert notification_service.save_notification(notification)
+        return notification.id
+
+    def _unread(self, client, user) -> int:
+        response = client.get("/notifications/count-unread", headers=self._headers(user))
+        assert response.status_code == 200
+        return response.get_json()["unread_count"]
+
+    def test_count_unread_reads_counter_without_count_query(self, app, client):
+        """count-unread deve ler o contador sem COUNT sobre notifications"""
+        with app.app_context():
+            user = create_test_user()
+            for _ in range(3):
+                self._notify(user.id)
+            self._notify(user.id, is_read=True)
+
+            assert self._unread(client, user) == 3
+            with QueryCounter(db.engine) as counter:
+                assert self._unread(client, user) == 3
+
+            assert not any("notifications" in s for s in counter.statements)
+
+    def test_mark_as_read_decrements_once(self, app, client):
+        """Marcar a mesma notificação duas vezes deve decrementar uma única vez"""
+        with app.app_context():
+            user = create_test_user()
+            first = self._notify(user.id)
+            self._notify(user.id)
+
+            for _ in range(2):
+                response = client.patch(f"/notifications/{first}/mark-as-read",
+                                        headers=self._headers(user))
+                assert response.status_code == 200
+
+            assert self._unread(client, user) == 1
+            assert notification_service.reconcile_unread_counts(fix=False) == []
+
+    def test_mark_as_read_of_other_user_is_not_found(self, app, client):
+        """Notificação de outro usuário não deve alterar nenhum contador"""
+        with app.app_context():
+            owner = create_test_user(email="dono@notif.com")
+            other = create_test_user(email="outro@notif.com")
+            notification_id = self._notify(owner.id)
+
+            response = client.patch(f"/notifications/{notification_id}/mark-as-read",
+                                    headers=self._headers(other))
+
+            assert response.status_code == 404
+            assert self._unread(client, owner) == 1
+            assert self._unread(client, other) == 0
+
+    def test_mark_all_resets_counter(self, app, client):
+        """Marcar todas como lidas deve zerar o contador"""
+        with app.app_context():
+            user = create_test_user()
+            for _ in range(4):
+                self._notify(user.id)
+
+            response = client.patch("/notifications/mark-all-as-read",
+                                    headers=self._headers(user))
+
+            assert response.status_code == 200
+            assert self._unread(client, user) == 0
+            assert notification_service.reconcile_unread_counts(fix=False) == []
+
+    def test_reconcile_detects_and_repairs_drift(self, app):
+        """Reconciliação deve detectar e corrigir divergências"""
+        with app.app_context():
+            user = create_test_user()
+            db.session.add(Notification(user_id=user.id, title="Sem contador", message="m"))
+            db.session.commit()
+
+            drift = notification_service.reconcile_unread_counts(fix=False)
+            assert drift == [{"user_id": user.id, "stored": 0, "actual": 1}]
+
+            notification_service.reconcile_unread_counts()
+            db.session.expire_all()
+            assert db.session.get(User, user.id).unread_count == 1
+            assert notification_service.reconcile_unread_counts(fix=False) == []
+
+    def test_reconcile_cli_command(self, app, runner):
+        """Comando flask notifications reconcile-unread deve corrigir divergências"""
+        with app.app_context():
+            user = create_test_user()
+            user.unread_count = 7
+            db.session.commit()
+
+            result = runner.invoke(args=["notifications", "reconcile-unread", "--dry-run"])
+            assert "armazenado=7 real=0" in result.output
+            assert db.session.get(User, user.id).unread_count == 7
+
+            result = runner.invoke(args=["notifications", "reconcile-unread"])
+            assert "1 usuário(s) corrigido(s)" in result.output
+            db.session.expire_all()
+            assert db.session.get(User, user.id).unread_count == 0
+
+
+class TestNotificationPagination:
+    """Testes da paginação keyset e do modo delta da listagem de notificações"""
+
+    def _headers(self, user):
+        return {"Authorization": f"Bearer {user.generate_auth_token()}"}
+
+    def _create(self, user_id: int, total: int, created_at: datetime = None) -> list[int]:
+        notifications = [
+            Notification(user_id=user_id, title=f"N{i}", message="mensagem",
+                         created_at=created_at or datetime.now() - timedelta(minutes=total - i))
+            for i in range(total)
+        ]
+        db.session.add_all(notifications)
+        db.session.commit()
+        return [n.id for n in notifications]
+
+    def test_pages_follow_created_at_and_id(self, app, client):
+        """As páginas devem cobrir todas as notificações, inclusive com created_at repetido"""
+        with app.app_context():
+            user = create_test_user()
+            older = self._create(user.id, 5)
+            tied = self._create(user.id, 7, created_at=datetime.now())
+            headers = self._headers(user)
+
+            seen, cursor, pages = [], None, 0
+            while True:
+                url = "/notifications/?limit=4" + (f"&cursor={cursor}" if cursor else "")
+                body = client.get(url, headers=headers).get_json()
+                assert len(body["data"]) <= 4
+                assert ("watermark" in body) == (cursor is None)
+                seen += [n["id"] for n in body["data"]]
+                pages += 1
+                cursor = body["next_cursor"]
+                if not cursor:
+                    break
+
+            assert pages == 3
+            assert seen == sorted(tied, reverse=True) + sorted(older, reverse=True)
+
+    def test_page_with_unread_filter(self, app, client):
+        """O cursor deve respeitar o filtro de não lidas"""
+        with app.app_context():
+            user = create_test_user()
+            ids = self._create(user.id, 6)
+            Notification.query.filter(Notification.id.in_(ids[:3])).update({"is_read": True})
+            db.session.commit()
+
+            body = client.get("/notifications/?unread=true&limit=2",
+                              headers=self._headers(user)).get_json()
+            second = client.get(f"/notifications/?unread=true&limit=2&cursor={body['next_cursor']}",
+                                headers=self._headers(user)).get_json()
+
+            assert [n["id"] for n in body["data"]] == [ids[5], ids[4]]
+            assert [n["id"] for n in second["data"]] == [ids[3]]
+            assert second["next_cursor"] is None
+
+    def test_delta_returns_only_newer_notifications(self, app, client):
+        """Com since deve retornar apenas as notificações posteriores à marca d'água"""
+        with app.app_context():
+            user = create_test_user()
+            other = create_test_user(email="outro@notif.com")
+            self._create(user.id, 3)
+            headers = self._headers(user)
+
+            watermark = client.get("/notifications/?limit=10", headers=headers).get_json()["watermark"]
+            assert client.get(f"/notifications/?since={watermark}",
+                              headers=headers).get_json()["data"] == []
+
+            newer = self._create(user.id, 3)
+            self._create(other.id, 2)
+
+            body = client.get(f"/notifications/?since={watermark}&limit=2", headers=headers).get_json()
+            assert [n["id"] for n in body["data"]] == newer[:2]
+            assert body["has_more"] is True
+
+            body = client.get(f"/notifications/?since={body['watermark']}&limit=2",
+                              headers=headers).get_json()
+            assert [n["id"] for n in body["data"]] == newer[2:]
+            assert body["has_more"] is False
+
+    def test_invalid_cursor_and_watermark(self, app, client):
+        """Cursor ou marca d'água inválidos devem ser rejeitados"""
+        with app.app_context():
+            user = create_test_user()
+            headers = self._headers(user)
+
+            assert client.get("/notifications/?cursor=invalido", headers=headers).status_code == 400
+            assert client.get("/notifications/?since=invalido", headers=headers).status_code == 400
+
+    def test_mark_all_returns_count_and_watermark(self, app, client):
+        """mark-all-as-read deve retornar apenas a contagem e a marca d'água"""
+        with app.app_context():
+            user = create_test_user()
+            self._create(user.id, 4)
+            headers = self._headers(user)
+
+            with QueryCounter(db.engine) as counter:
+                response = client.patch("/notifications/mark-all-as-read", headers=headers)
+
+            body = response.get_json()
+            assert response.status_code == 200
+            assert set(body) == {"updated", "watermark"}
+            assert body["updated"] == 4
+            assert not any(s.startswith("SELECT notifications.id AS notifications_id")
+                           for s in counter.statements)
+
+            newer = self._create(user.id, 1)
+            delta = client.get(f"/notifications/?since={body['watermark']}", headers=headers).get_json()
+            assert [n["id"] for n in delta["data"]] == newer
+            assert delta["data"][0]["is_read"] is False
+
+            again = client.patch("/notifications/mark-all-as-read", headers=headers).get_json()
+            assert again["updated"] == 1
+
+
+class TestNotificationRetention:
+    """Testes da política de retenção e do arquivo de notificações"""
+
+    @pytest.fixture(autouse=True)
+    def _no_pause(self, app):
+        app.config["NOTIFICATION_RETENTION_BATCH_PAUSE_MS"] = 0
+
+    def _create(self, user_id: int, days_ago: int, is_read: bool, total: int = 1) -> list[int]:
+        notifications = [
+            Notification(user_id=user_id, title=f"Antiga {i}", message="mensagem", is_read=is_read,
+                         created_at=datetime.now() - timedelta(days=days_ago, minutes=i))
+            for i in range(total)
+        ]
+        db.session.add_all(notifications)
+        if not is_read:
+            db.session.get(User, user_id).unread_count += total
+        db.session.commit()
+        return [n.id for n in notifications]
+
+    def test_deletes_old_read_and_archives_old_unread(self, app):
+        """Lidas antigas são apagadas, não lidas antigas arquivadas e as recentes mantidas"""
+        with app.app_context():
+            user = create_test_user()
+            old_read = self._create(user.id, 100, is_read=True, total=3)
+            recent_read = self._create(user.id, 10, is_read=True)
+            old_unread = self._create(user.id, 200, is_read=False, total=2)
+            recent_unread = self._create(user.id, 100, is_read=False)
+
+            metrics = notification_service.apply_retention_policy(
+                read_days=90, archive_days=180, batch_size=2)
+
+            assert metrics["deleted"] == 3
+            assert metrics["archived"] == 2
+            assert metrics["batches"] == 3
+            remaining = {n.id for n in Notification.query.all()}
+            assert remaining == set(recent_read + recent_unread)
+            assert not remaining & set(old_read)
+
+            archived = NotificationArchive.query.order_by(NotificationArchive.id).all()
+            assert [a.id for a in archived] == sorted(old_unread)
+            assert all(a.user_id == user.id and a.title.startswith("Antiga") for a in archived)
+
+            db.session.expire_all()
+            assert db.session.get(User, user.id).unread_count == 1
+            assert notification_service.reconcile_unread_counts(fix=False) == []
+
+    def test_batches_are_bounded(self, app):
+        """Cada lote deve apagar no máximo batch_size linhas, em transações separadas"""
+        with app.app_context():
+            user = create_test_user()
+            self._create(user.id, 100, is_read=True, total=7)
+
+            with QueryCounter(db.engine) as counter:
+                metrics = notification_service.apply_retention_policy(batch_size=3)
+
+            deletes = [s for s in counter.statements if s.startswith("DELETE FROM notifications")]
+            assert metrics["deleted"] == 7
+            assert len(deletes) == 3
+            assert all("LIMIT" in s for s in deletes)
+            assert Notification.query.count() == 0
+
+    def test_dry_run_only_counts(self, app):
+        """dry-run deve apenas contar as notificações afetadas"""
+        with app.app_context():
+            user = create_test_user()
+            self._create(user.id, 100, is_read=True, total=2)
+            self._create(user.id, 200, is_read=False)
+
+            metrics = notification_service.apply_retention_policy(dry_run=True)
+
+            assert (metrics["deleted"], metrics["archived"], metrics["batches"]) == (2, 1, 0)
+            assert Notification.query.count() == 3
+            assert NotificationArchive.query.count() == 0
+
+    def test_archive_does_not_make_drifted_counter_negative(self, app):
+        """Um contador já divergente fica em zero, e não negativo, ao arquivar"""
+        with app.app_context():
+            user = create_test_user()
+            self._create(user.id, 200, is_read=False, total=2)
+            db.session.get(User, user.id).unread_count = 1
+            db.session.commit()
+
+            notification_service.apply_retention_policy(archive_days=180)
+
+            db.session.expire_all()
+            assert db.session.get(User, user.id).unread_count == 0
+
+    def test_archive_skips_ids_already_archived(self, app):
+        """Um id já presente no arquivo (nova execução após falha) não aborta a retenção"""
+        with app.app_context():
+            user = create_test_user()
+            ids = self._create(user.id, 200, is_read=False, total=2)
+            db.session.add(NotificationArchive(
+                id=ids[0], user_id=user.id, title="Já arquivada", message="mensagem",
+                created_at=datetime.now() - timedelta(days=200), archived_at=datetime.now()))
+            db.session.commit()
+
+            metrics = notification_service.apply_retention_policy(archive_days=180)
+
+            assert metrics["archived"] == 2
+            assert Notification.query.count() == 0
+            assert NotificationArchive.query.count() == 2
+            assert db.session.get(NotificationArchive, ids[0]).title == "Já arquivada"
+            db.session.expire_all()
+            assert db.session.get(User, user.id).unread_count == 0
+
+    def test_retention_cli_command(self, app, runner):
+        """Comando flask notifications retention deve aplicar a política"""
+        with app.app_context():
+            user = create_test_user()
+            self._create(user.id, 40, is_read=True, total=2)
+
+            result = runner.invoke(args=["notifications", "retention", "--dry-run", "--read-days", "30"])
+            assert "2 notificação(ões) lida(s) seriam apagada(s)" in result.output
+            assert Notification.query.count() == 2
+
+            result = runner.invoke(args=["notifications", "retention", "--read-days", "30"])
+            assert "2 notificação(ões) apagada(s) e 0 arquivada(s)" in result.output
+            assert Notification.query.count() == 0
+
+
+class TestNotificationHub:
+    """Testes do pub/sub em memória"""
+
+    def test_publish_reaches_only_user_subscriptions(self):
+        """Eventos devem chegar a todas as conexões do usuário e só a elas"""
+        from services.notification_hub import NotificationHub
+
+        hub = NotificationHub()
+        first, second, other = hub.subscribe(1), hub.subscribe(1), hub.subscribe(2)
+
+        hub.publish(1, "unread_count", {"unread_count": 1})
+
+        assert first.get(timeout=0) == ("unread_count", {"unread_count": 1})
+        assert second.get(timeout=0) == ("unread_count", {"unread_count": 1})
+        assert other.get(timeout=0) is None
+
+        hub.unsubscribe(first)
+        hub.unsubscribe(second)
+        assert not hub.has_subscribers(1)
+        assert hub.connection_count() == 1
+
+    def test_slow_subscriber_overflow_collapses_into_sync(self):
+        """Fila cheia deve ser trocada por um pedido de sincronização com o banco"""
+        from services.notification_hub import SYNC, NotificationHub
+
+        hub = NotificationHub(queue_size=3)
+        subscription = hub.subscribe(1)
+        for i in range(4):
+            hub.publish(1, "notification", {"id": i})
+
+        assert subscription.get(timeout=0) == (SYNC, None)
+        assert subscription.get(timeout=0) is None
+
+    def test_max_clients(self):
+        """Não deve abrir assinaturas acima do limite"""
+        from services.notification_hub import NotificationHub
+
+        hub = NotificationHub()
+        assert hub.subscribe(1, max_clients=1) is not None
+        assert hub.subscribe(2, max_clients=1) is None
+
+
+class TestNotificationStream:
+    """Testes do stream SSE de notificações"""
+
+    @pytest.fixture(autouse=True)
+    def _fast_stream(self, app):
+        app.config["NOTIFICATION_STREAM_HEARTBEAT"] = 0.2
+        app.config["NOTIFICATION_STREAM_MAX_SECONDS"] = 5
+
+    def _open(self, client, token, **headers):
+        response = client.get("/notifications/stream", buffered=False,
+                              headers={"Authorization": f"Bearer {token}", **headers})
+        return response, iter(response.response)
+
+    def _next_event(self, chunks, skip_heartbeats=True):
+        for chunk in chunks:
+            text = chunk.decode() if isinstance(chunk, bytes) else chunk
+            if text.startswith("retry:") or (skip_heartbeats and text.startswith(":")):
+                continue
+            return text
+        return None
+
+    def _notify(self, user_id: int, title: str = "Nova"):
+        notification = Notification(user_id=user_id, title=title, message="mensagem")
+        notification_service.save_notification(notification)
+        return notification.id
+
+    def test_pushes_initial_count_and_new_notifications(self, app, client):
+        """Deve enviar o contador ao conectar e cada notificação criada depois"""
+        from services.notification_hub import notification_hub
+
+        with app.app_context():
+            user = create_test_user()
+            response, chunks = self._open(client, user.generate_auth_token())
+            try:
+                assert response.status_code == 200
+                assert response.mimetype == "text/event-stream"
+                assert self._next_event(chunks) == 'event: unread_count\ndata: {"unread_count": 0}\n\n'
+                assert notification_hub.has_subscribers(user.id)
+
+                notification_id = self._notify(user.id, "Olá")
+
+                event = self._next_event(chunks)
+                assert event.startswith(f"id: {notification_id}\nevent: notification\n")
+                assert '"title": "Olá"' in event
+                assert self._next_event(chunks) == 'event: unread_count\ndata: {"unread_count": 1}\n\n'
+            finally:
+                response.close()
+
+            assert not notification_hub.has_subscribers(user.id)
+
+    def test_last_event_id_replays_missed_notifications(self, app, client):
+        """Com Last-Event-ID deve reenviar as notificações posteriores a ele"""
+        with app.app_context():
+            user = create_test_user()
+            ids = [self._notify(user.id, f"N{i}") for i in range(3)]
+
+            response, chunks = self._open(client, user.generate_auth_token(),
+                                          **{"Last-Event-ID": str(ids[0])})
+            try:
+                assert self._next_event(chunks).startswith(f"id: {ids[1]}\n")
+                assert self._next_event(chunks).startswith(f"id: {ids[2]}\n")
+                assert '"unread_count": 3' in self._next_event(chunks)
+            finally:
+                response.close()
+
+    def test_heartbeat_syncs_notifications_from_other_processes(self, app, client):
+        """No heartbeat deve buscar no banco notificações criadas fora do hub"""
+        with app.app_context():
+            user = create_test_user()
+            response, chunks = self._open(client, user.generate_auth_token())
+            try:
+                self._next_event(chunks)
+
+                # Inserção direta, como a feita por outro processo
+                with db.engine.begin() as conn:
+                    conn.execute(Notification.__table__.insert().values(
+                        user_id=user.id, title="Externa", message="outro processo",
+                        created_at=datetime.now(), is_read=False))
+                    conn.execute(User.__table__.update().where(User.id == user.id).values(
+                        unread_count=User.unread_count + 1))
+
+                event = self._next_event(chunks)
+                assert '"title": "Externa"' in event
+                assert self._next_event(chunks, skip_heartbeats=False) == \
+                    'event: unread_count\ndata: {"unread_count": 1}\n\n'
+                assert self._next_event(chunks, skip_heartbeats=False) == ": heartbeat\n\n"
+            finally:
+                response.close()
+
+    def test_event_fan_out_reaches_open_streams(self, app, client):
+        """Notificações criadas por INSERT ... SELECT devem chegar aos streams abertos"""
+        with app.app_context():
+            event, participant_ids = _create_event_with_participants(active=2)
+            participant = db.session.get(User, participant_ids[0])
+            response, chunks = self._open(client, participant.generate_auth_token())
+            try:
+                self._next_event(chunks)
+                notification_service.notify_event_participants(event.id, "Aviso", "Evento mudou")
+
+                assert '"title": "Aviso"' in self._next_event(chunks)
+            finally:
+                response.close()
+
+    def _stream_token(self, client, user):
+        response = client.post("/notifications/stream-token",
+                               headers={"Authorization": f"Bearer {user.generate_auth_token()}"})
+        assert response.status_code == 200
+        assert response.get_json()["expires_in"] == 60
+        return response.get_json()["token"]
+
+    def test_stream_token_in_query_string(self, app, client):
+        """EventSource não envia headers: o token de stream deve ser aceito na query string"""
+        with app.app_context():
+            user = create_test_user()
+            token = self._stream_token(client, user)
+
+            response = client.get(f"/notifications/stream?jwt={token}", buffered=False)
+            try:
+                assert response.status_code == 200
+            finally:
+                response.close()
+
+    def test_access_token_rejected_in_query_string(self, app, client):
+        """O token de acesso (sem expiração) não pode ir na URL"""
+        with app.app_context():
+            user = create_test_user()
+
+            response = client.get(f"/notifications/stream?jwt={user.generate_auth_token()}")
+
+            assert response.status_code == 401
+
+    def test_stream_token_only_valid_for_stream(self, app, client):
+        """O token de stream não autentica as demais rotas, nem emite outro token"""
+        with app.app_context():
+            user = create_test_user()
+            token = self._stream_token(client, user)
+
+            for method, url in (("get", "/notifications/count-unread"),
+                                ("post", "/notifications/stream-token")):
+                response = getattr(client, method)(url, headers={"Authorization": f"Bearer {token}"})
+                assert response.status_code == 401
+
+    def test_stream_token_expires(self, app, client):
+        """O token de stream expira após NOTIFICATION_STREAM_TOKEN_TTL"""
+        with app.app_context():
+            user = create_test_user()
+            token = user.generate_stream_token(expires_in=-1)
+
+            response = client.get(f"/notifications/stream?jwt={token}")
+
+            assert response.status_code == 401
+
+    def test_connection_limit(self, app, client):
+        """Acima do limite de conexões do processo deve responder 503"""
+        with app.app_context():
+            app.config["NOTIFICATION_STREAM_MAX_CLIENTS"] = 1
+            user = create_test_user()
+            token = user.generate_auth_token()
+
+            first, _ = self._open(client, token)
+            try:
+                second, _ = self._open(client, token)
+                assert second.status_code == 503
+            finally:
+                first.close()
+
+    def test_invalid_last_event_id(self, app, client):
+        """Last-Event-ID não numérico deve ser rejeitado"""
+        with app.app_context():
+            user = create_test_user()
+            response = client.get("/notifications/stream", headers={
+                "Authorization": f"Bearer {user.generate_auth_token()}",
+                "Last-Event-ID": "abc"})
+
+            assert response.status_code == 400
@@ -0,0 +1,126 @@
+import pytest
+from datetime import datetime, timedelta
+from unittest.mock import patch, MagicMock
+from sqlalchemy import event as sa_event
+from app import db
+from domain.models import User, Event, EventType, UserType, Certificate, Notification, event_participants
+from domain.dtos import EventFilterDTO
+from services import event_service, notification_service
+from services.certificate_service import CertificateService
+
+
+class QueryPlanRecorder:
+    """Registra os comandos SELECT executados e os respectivos planos (EXPLAIN QUERY PLAN)"""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.executed = []
+
+    def _callback(self, conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT") and not executemany:
+            self.executed.append((statement, parameters))
+
+    def __enter__(self):
+        sa_event.listen(self.engine, "before_cursor_execute", self._callback)
+        return self
+
+    def __exit__(self, *exc):
+        sa_event.remove(self.engine, "before_cursor_execute", self._callback)
+
+    def plans(self):
+        raw = self.engine.raw_connection()
+        try:
+            cursor = raw.cursor()
+            for statement, parameters in self.executed:
+                cursor.execute(f"EXPLAIN QUERY PLAN {statement}", parameters)
+                yield statement, [row[3] for row in cursor.fetchall()]
+        finally:
+            raw.close()
+
+    def table_scans(self):
+        """
+        Retorna os passos que percorrem uma tabela (ou um índice) inteira.
+        Varreduras de tabelas virtuais (FTS5) são resolvidas pelo próprio índice
+        e o catálogo (sqlite_master) só é consultado uma vez por engine.
+        """
+        scans = []
+        for statement, plan in self.plans():
+            for step in plan:
+                if step.startswith("SCAN ") and "VIRTUAL TABLE" not in step \
+                        and not step.startswith(("SCAN CONSTANT ROW", "SCAN sqlite_master")):
+                    scans.append((step, statement))
+        return scans
+
+
+@pytest.fixture
+def populated(app):
+    with app.app_context():
+        organizer = User(name="Organizador", email="org@test.com",
+                         password="12345678", type=UserType.ORGANIZER)
+        organizer.encrypt_password()
+        participant = User(name="Participante", email="part@test.com",
+                           password="12345678", type=UserType.REGULAR)
+        participant.encrypt_password()
+        db.session.add_all([organizer, participant])
+        db.session.commit()
+
+        future = Event(title="Workshop Futuro", date=datetime.now() + timedelta(days=3),
+                       location="Sala 1", capacity=10, type=EventType.WORKSHOP,
+                       institution_organizer="UFPE", created_by=organizer.id)
+        past = Event(title="Workshop Passado", date=datetime.now() - timedelta(hours=3),
+                     location="Sala 2", capacity=10, type=EventType.WORKSHOP,
+                     institution_organizer="UFPE", created_by=organizer.id)
+        db.session.add_all([future, past])
+        db.session.commit()
+
+        for event in (future, past):
+            db.session.execute(event_participants.insert().values(
+                user_id=participant.id, event_id=event.id,
+                registered_at=datetime.now(), active=True))
+        db.session.add(Certificate(user_id=participant.id, event_id=past.id,
+                                   certificate_path="/tmp/certificado.pdf"))
+        db.session.add(Notification(user_id=participant.id, title="Olá", message="Mensagem"))
+        db.session.commit()
+
+        yield organizer, participant, future, past
+
+
+def _run_hot_paths(organizer, participant, future, past):
+    mock_user = MagicMock()
+    mock_user.id = participant.id
+
+    with patch('services.event_service.current_user', mock_user), \
+            patch('services.notification_service.current_user', mock_user):
+        event_service.list_events(organizer, None)
+        event_service.list_events_page(organizer, None, 10)
+        event_service.list_available_events(None)
+        event_service.list_available_events_page(None, 10)
+        search = EventFilterDTO()
+        search.q = "Workshop"
+        event_service.list_available_events(search)
+        event_service.get_public_event_details(future.id)
+        event_service.list_user_enrollments(participant)
+        event_service.list_event_participants(future.id, organizer.id)
+        event_service.enroll_user(future.id, organizer)
+        event_service.cancel_enrollment(future.id, organizer)
+        CertificateService.get_user_certificates(participant.id)
+        notification_service.get_user_notifications()
+        notification_service.get_user_notifications(unread=True)
+        notification_service.get_user_notifications_page(10)
+        notification_service.get_user_notifications_page(10, unread=True)
+        notification_service.get_notifications_since(notification_service.get_notifications_watermark(), 10)
+        notification_service.count_unread_notifications()
+        notification_service.apply_retention_policy(dry_run=True)
+        notification_service.apply_retention_policy()
+        with patch('services.certificate_service.email_service.send_certificate_by_email'):
+            CertificateService.process_completed_events()
+
+
+def test_hot_path_queries_use_indexes(app, populated):
+    """Nenhuma consulta dos caminhos quentes deve varrer uma tabela inteira"""
+    with app.app_context():
+        with QueryPlanRecorder(db.engine) as recorder:
+            _run_hot_paths(*populated)
+
+        assert recorder.executed
+        assert recorder.table_scans() == []
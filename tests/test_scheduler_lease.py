@@ -0,0 +1,174 @@
+import multiprocessing
+import os
+import threading
+import time
+import pytest
+from sqlalchemy import create_engine
+from app import db
+from domain.models import SchedulerLease
+from services import scheduler_lease_service
+from utils.certificate_scheduler import LEASE_NAME, CertificateScheduler
+from tests.conftest import wait_for
+
+
+def _lease_worker(name, ttl, seconds, barrier, results, leader_dies=None):
+    """
+    Processo que disputa o lease durante `seconds` segundos. Roda em um
+    processo novo (spawn), que herda SQLALCHEMY_DATABASE_URI do teste.
+    Com `leader_dies`, o primeiro processo a adquirir o lease morre sem liberá-lo.
+    """
+    from app import create_app
+
+    app = create_app()
+    owner = f"processo-{os.getpid()}"
+
+    with app.app_context():
+        barrier.wait()
+        start = time.monotonic()
+        acquired_at, renewals = None, 0
+
+        while time.monotonic() - start < seconds:
+            if scheduler_lease_service.acquire_lease(name, owner, ttl):
+                if leader_dies is not None and not leader_dies.is_set():
+                    leader_dies.set()
+                    results.put((owner, time.time(), -1))
+                    results.close()
+                    results.join_thread()
+                    os._exit(0)  # Morre sem liberar o lease
+                acquired_at = acquired_at or time.time()
+                renewals += 1
+            time.sleep(0.05)
+
+        results.put((owner, acquired_at, renewals))
+
+
+class TestSchedulerLease:
+    """Testes do lease que elege o processo líder do scheduler"""
+
+    def test_acquire_renew_and_block_other_owner(self, app):
+        """O dono renova o lease e outro processo não o adquire enquanto válido"""
+        with app.app_context():
+            assert scheduler_lease_service.acquire_lease("job", "a", ttl=60)
+            first = scheduler_lease_service.get_lease("job")
+            acquired_at = first.acquired_at
+
+            assert not scheduler_lease_service.acquire_lease("job", "b", ttl=60)
+            assert scheduler_lease_service.acquire_lease("job", "a", ttl=60)
+
+            db.session.expire_all()
+            lease = scheduler_lease_service.get_lease("job")
+            assert lease.owner == "a"
+            assert lease.acquired_at == acquired_at
+            assert lease.heartbeat_at >= acquired_at
+
+    def test_expired_lease_is_taken_over(self, app):
+        """Lease expirado (dono morto) deve ser assumido por outro processo"""
+        with app.app_context():
+            assert scheduler_lease_service.acquire_lease("job", "a", ttl=0)
+            time.sleep(0.01)
+
+            assert scheduler_lease_service.acquire_lease("job", "b", ttl=60)
+            assert not scheduler_lease_service.acquire_lease("job", "a", ttl=60)
+            assert scheduler_lease_service.get_lease("job").owner == "b"
+
+    def test_release_only_by_owner(self, app):
+        """Apenas o dono libera o lease"""
+        with app.app_context():
+            scheduler_lease_service.acquire_lease("job", "a", ttl=60)
+
+            assert not scheduler_lease_service.release_lease("job", "b")
+            assert scheduler_lease_service.release_lease("job", "a")
+            assert scheduler_lease_service.get_lease("job") is None
+            assert scheduler_lease_service.acquire_lease("job", "b", ttl=60)
+
+    def test_only_leader_scheduler_runs_jobs(self, app):
+        """Entre dois schedulers só o líder executa os jobs; ao parar, o outro assume"""
+        app.config["SCHEDULER_MAX_SLEEP"] = 0.1
+        runs = {"lider": 0, "seguidor": 0}
+        leader, follower = CertificateScheduler(app), CertificateScheduler(app)
+
+        for scheduler, owner in ((leader, "lider"), (follower, "seguidor")):
+            scheduler.owner = scheduler.jobs.owner = owner
+            # Um job por scheduler, para saber qual processo o executou
+            scheduler.jobs.register(f"job.{owner}", lambda owner=owner: runs.update({owner: runs[owner] + 1}),
+                                    interval_seconds=1)
+
+        with app.app_context():
+            assert leader.renew_leadership()
+            assert not follower.renew_leadership()
+            assert SchedulerLease.query.count() == 1
+
+        for scheduler in (leader, follower):
+            scheduler._thread = threading.Thread(target=scheduler._run_schedule, daemon=True)
+            scheduler._thread.start()
+        try:
+            # Os jobs dos dois vencem a cada segundo, mas só o do líder executa
+            assert wait_for(lambda: runs["lider"] >= 2)
+            assert runs["seguidor"] == 0
+
+            leader.stop_scheduler()
+            assert not leader.is_leader
+
+            assert follower.renew_leadership()
+            assert wait_for(lambda: runs["seguidor"] >= 1)
+            with app.app_context():
+                assert scheduler_lease_service.get_lease(LEASE_NAME).owner == "seguidor"
+        finally:
+            leader.stop_scheduler()
+            follower.stop_scheduler()
+
+
+@pytest.mark.slow
+class TestSchedulerLeaseMultiProcess:
+    """Processos independentes disputando o lease no mesmo arquivo SQLite"""
+
+    @pytest.fixture
+    def database(self, tmp_path, monkeypatch):
+        uri = f"sqlite:///{tmp_path / 'leases.db'}"
+        engine = create_engine(uri)
+        db.metadata.create_all(engine)
+        engine.dispose()
+
+        # Herdada pelos processos filhos (spawn), que importam a configuração do zero
+        monkeypatch.setenv("SQLALCHEMY_DATABASE_URI", uri)
+        return uri
+
+    def _run(self, ctx, count, **kwargs):
+        barrier = ctx.Barrier(count)
+        results = ctx.Queue()
+        processes = [
+            ctx.Process(target=_lease_worker, kwargs={**kwargs, "barrier": barrier, "results": results})
+            for _ in range(count)
+        ]
+        for process in processes:
+            process.start()
+        collected = [results.get(timeout=60) for _ in processes]
+        for process in processes:
+            process.join(timeout=60)
+        return collected
+
+    def test_exactly_one_process_holds_the_lease(self, database):
+        """Com vários processos simultâneos, apenas um deve deter e renovar o lease"""
+        ctx = multiprocessing.get_context("spawn")
+
+        results = self._run(ctx, 3, name="job", ttl=30, seconds=1.5)
+
+        holders = [owner for owner, acquired_at, renewals in results if acquired_at]
+        assert len(holders) == 1
+        assert all(renewals == 0 for owner, _, renewals in results if owner not in holders)
+
+    def test_survivor_takes_over_after_leader_dies(self, database):
+        """Se o líder morrer sem liberar o lease, outro processo assume após o TTL"""
+        ctx = multiprocessing.get_context("spawn")
+        ttl = 1
+
+        results = self._run(ctx, 3, name="job", ttl=ttl, seconds=4,
+                            leader_dies=ctx.Event())
+
+        [(dead, died_at)] = [(owner, at) for owner, at, renewals in results if renewals == -1]
+        holders = [(owner, at) for owner, at, renewals in results if renewals > 0]
+        assert len(holders) == 1
+        owner, acquired_at = holders[0]
+        assert owner != dead
+        # Assume só depois de o lease expirar, e logo em seguida
+        assert ttl - 0.1 <= acquired_at - died_at < ttl + 1
@@ -0,0 +1,90 @@
+import threading
+import click
+from app import create_app, db
+from commands.worker_commands import run_worker
+from domain.models import EmailOutbox, EmailStatus
+from services import email_service, scheduler_lease_service
+from utils.certificate_scheduler import LEASE_NAME, certificate_scheduler
+from utils.email_outbox_worker import email_outbox_worker
+from tests.conftest import wait_for
+
+
+def _start(app, **kwargs):
+    stop_event = threading.Event()
+    thread = threading.Thread(target=run_worker, args=(app,),
+                              kwargs={**kwargs, "stop_event": stop_event}, daemon=True)
+    thread.start()
+    return stop_event, thread
+
+
+class TestWorker:
+    """Testes do processo dedicado aos jobs em background (flask worker)"""
+
+    def test_web_app_does_not_start_background_jobs(self, app):
+        """Com os jobs desligados, create_app não deve iniciar threads de background"""
+        assert app.config["SCHEDULER_ENABLED"] is False
+        assert certificate_scheduler._thread is None
+        assert email_outbox_worker._thread is None
+
+    def test_cli_commands_do_not_start_background_jobs(self, monkeypatch):
+        """Comandos da CLI (exceto flask run) não iniciam o scheduler nem a fila de emails"""
+        started = []
+        monkeypatch.setattr("utils.certificate_scheduler.init_certificate_scheduler",
+                            lambda app: started.append("scheduler"))
+        monkeypatch.setattr("utils.email_outbox_worker.init_email_outbox_worker",
+                            lambda app: started.append("email"))
+
+        for command in ("db", "jobs", "worker"):
+            with click.Context(click.Command(command), info_name=command):
+                create_app()
+        assert started == []
+
+        with click.Context(click.Command("run"), info_name="run"):
+            create_app()
+        assert started == ["scheduler", "email"]
+
+    def test_runs_scheduler_and_releases_lease_on_stop(self, app):
+        """O worker inicia o scheduler mesmo desligado na configuração e libera o lease ao parar"""
+        app.config["SCHEDULER_LEASE_HEARTBEAT"] = 0.05
+
+        stop_event, thread = _start(app, email=False)
+        try:
+            assert wait_for(lambda: certificate_scheduler.is_leader)
+            with app.app_context():
+                assert scheduler_lease_service.get_lease(LEASE_NAME).owner == certificate_scheduler.owner
+        finally:
+            stop_event.set()
+            thread.join(timeout=5)
+
+        assert not thread.is_alive()
+        assert certificate_scheduler._thread is None
+        assert not certificate_scheduler.is_leader
+        with app.app_context():
+            db.session.expire_all()
+            assert scheduler_lease_service.get_lease(LEASE_NAME) is None
+
+    def test_runs_email_outbox_consumer(self, app, smtp_server):
+        """O worker deve esvaziar a fila de emails"""
+        with app.app_context():
+            for i in range(2):
+                email_service.enqueue_email([f"w{i}@test.com"], "Assunto", "Corpo", commit=False)
+            db.session.commit()
+
+        stop_event, thread = _start(app, scheduler=False)
+        try:
+            assert wait_for(lambda: len(smtp_server.messages) == 2)
+        finally:
+            stop_event.set()
+            thread.join(timeout=5)
+
+        assert not thread.is_alive()
+        assert email_outbox_worker._thread is None
+        with app.app_context():
+            assert EmailOutbox.query.filter_by(status=EmailStatus.SENT).count() == 2
+
+    def test_cli_requires_a_job(self, app, runner):
+        """flask worker sem nenhum job habilitado deve falhar"""
+        result = runner.invoke(args=["worker", "--no-scheduler", "--no-email"])
+
+        assert result.exit_code == 2
+        assert "Nada a executar" in result.output
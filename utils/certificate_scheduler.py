@@ -1,21 +1,49 @@
-import schedule
-import time
 import threading
 from flask import current_app
 from services.certificate_service import CertificateService
+from services.scheduled_job_service import CATCH_UP_RUN_ONCE, CATCH_UP_SKIP
+import services.notification_service as notification_service
+import services.scheduler_lease_service as lease_service
+from utils.job_scheduler import JobScheduler
+
+
+# Lease disputado por todos os processos; só o líder executa os jobs
+LEASE_NAME = "scheduler"
 
 
 class CertificateScheduler:
-    """Scheduler para processar certificados automaticamente"""
+    """
+    Scheduler para processar certificados automaticamente.
+
+    Os jobs rodam no JobScheduler persistente (tabelas scheduled_jobs e
+    job_runs), que mantém os horários e o histórico entre reinícios. Cada
+    processo (ex.: worker do gunicorn) mantém sua thread, mas apenas o dono
+    do lease "scheduler" (tabela scheduler_leases) executa os jobs. Uma
+    thread de heartbeat renova o lease a cada SCHEDULER_LEASE_HEARTBEAT
+    segundos, inclusive durante jobs longos; se o líder morrer, outro processo
+    assume em até SCHEDULER_LEASE_TTL + SCHEDULER_LEASE_HEARTBEAT segundos.
+    """
 
     def __init__(self, app=None):
         self.app = app
         self._running = False
         self._thread = None
+        self._heartbeat_thread = None
+        self._stop = threading.Event()
         self._initialized = False
+        self.owner = None
+        self.is_leader = False
+        self.jobs = JobScheduler(app)
+
+    def init_app(self, app, force: bool = False):
+        """
+        Inicializa o scheduler com a aplicação Flask. Com force=True (usado
+        pelo `flask worker`) inicia mesmo com SCHEDULER_ENABLED desligado.
+        """
+        if not force and not app.config.get("SCHEDULER_ENABLED", True):
+            app.logger.info("Scheduler desabilitado neste processo")
+            return
 
-    def init_app(self, app):
-        """Inicializa o scheduler com a aplicação Flask"""
         if self._initialized:
             app.logger.warning(
                 "Certificate scheduler já foi inicializado, ignorando...")
@@ -26,54 +54,107 @@ class CertificateScheduler:
         app.logger.info("Inicializando certificate scheduler...")
         self.start_scheduler()
 
-    def _job_wrapper(self):
-        """Wrapper para executar jobs dentro do contexto da aplicação"""
-        with self.app.app_context():
-            try:
-                current_app.logger.info("Executando processamento de certificados...")
-                CertificateService.process_completed_events()
-                current_app.logger.info("Processamento de certificados concluído")
-            except Exception as e:
-                current_app.logger.error(
-                    f"Erro no processamento de certificados: {str(e)}")
+    def _process_certificates(self):
+        """Processa os eventos concluídos; as estatísticas vão para o histórico do job"""
+        current_app.logger.info("Executando processamento de certificados...")
+        stats = CertificateService.process_completed_events()
+        current_app.logger.info(f"Processamento de certificados concluído: {stats}")
+        return stats
+
+    def _register_jobs(self):
+        """Registra os jobs periódicos no scheduler persistente"""
+        self.jobs.clear()
+
+        # A cada 6 horas e também diariamente às 23:00, como um único job para
+        # que os dois gatilhos nunca executem em paralelo
+        self.jobs.register(CertificateService.PROCESSING_JOB, self._process_certificates,
+                           interval_seconds=6 * 3600, daily_at="23:00",
+                           catch_up=CATCH_UP_RUN_ONCE)
+
+        # Retenção de notificações, fora do horário de uso: se a janela das
+        # 03:00 for perdida, aguarda a do dia seguinte
+        if self.app.config.get("NOTIFICATION_RETENTION_ENABLED", True):
+            self.jobs.register("notifications.retention",
+                               notification_service.apply_retention_policy,
+                               daily_at="03:00", catch_up=CATCH_UP_SKIP)
+
+        # Coleta de PDFs órfãos no armazenamento, depois da retenção
+        if self.app.config.get("CERTIFICATE_GC_ENABLED", True):
+            self.jobs.register("certificates.gc", CertificateService.collect_orphaned_files,
+                               daily_at="04:00", catch_up=CATCH_UP_SKIP)
+
+        self.app.logger.info(f"Scheduler configurado com {len(self.jobs.job_names)} jobs")
 
     def start_scheduler(self):
-        """Inicia o scheduler em thread separada"""
+        """Inicia o scheduler e o heartbeat do lease em threads separadas"""
         if self._running:
             self.app.logger.warning("Scheduler já está rodando, ignorando...")
             return
 
-        # Limpar jobs existentes para evitar duplicação
-        schedule.clear()
-
-        # Agendar para executar a cada 6 horas
-        schedule.every(6).hours.do(self._job_wrapper)
-
-        # Testes
-        # schedule.every(1).minutes.do(self._job_wrapper)
-
-        # Também executar diariamente às 23:00
-        schedule.every().day.at("23:00").do(self._job_wrapper)
-
-        self.app.logger.info(f"Scheduler configurado com {len(schedule.jobs)} jobs")
+        self.jobs.app = self.app
+        self._register_jobs()
 
         self._running = True
+        self._stop.clear()
+        # Gerado ao iniciar (e não na importação) para ser único por processo
+        self.owner = self.jobs.owner = lease_service.make_owner_id()
+        self._heartbeat_thread = threading.Thread(target=self._run_heartbeat, daemon=True)
+        self._heartbeat_thread.start()
         self._thread = threading.Thread(target=self._run_schedule, daemon=True)
         self._thread.start()
 
         self.app.logger.info("Thread do scheduler iniciada")
 
+    def renew_leadership(self) -> bool:
+        """Adquire ou renova o lease; retorna se este processo é o líder"""
+        ttl = self.app.config.get("SCHEDULER_LEASE_TTL", 60)
+
+        with self.app.app_context():
+            try:
+                leader = lease_service.acquire_lease(LEASE_NAME, self.owner, ttl)
+            except Exception as e:
+                current_app.logger.error(f"Erro ao renovar o lease do scheduler: {str(e)}")
+                leader = False
+
+            if leader != self.is_leader:
+                current_app.logger.info(
+                    f"Processo {self.owner} {'assumiu' if leader else 'perdeu'} a liderança do scheduler")
+
+        changed, self.is_leader = leader != self.is_leader, leader
+        if changed:
+            # O loop dorme até o próximo job; acorda para assumir (ou largar) os jobs
+            self.jobs.wake()
+        return leader
+
+    def _run_heartbeat(self):
+        """Renova o lease periodicamente, independente da execução dos jobs"""
+        interval = self.app.config.get("SCHEDULER_LEASE_HEARTBEAT", 15)
+        while not self._stop.is_set():
+            self.renew_leadership()
+            self._stop.wait(interval)
+
     def _run_schedule(self):
-        """Loop principal do scheduler"""
-        while self._running:
-            schedule.run_pending()
-            time.sleep(60)  # Verificar a cada minuto
+        """Loop principal do scheduler: só o líder executa os jobs vencidos"""
+        self.jobs.run_forever(self._stop, is_active=lambda: self.is_leader)
 
     def stop_scheduler(self):
-        """Para o scheduler"""
+        """Para o scheduler e libera o lease para que outro processo assuma"""
         self._running = False
-        if self._thread:
-            self._thread.join()
+        self._stop.set()
+        self.jobs.wake()
+        for thread in (self._thread, self._heartbeat_thread):
+            if thread:
+                thread.join()
+        self._thread = self._heartbeat_thread = None
+        self._initialized = False
+
+        if self.is_leader:
+            with self.app.app_context():
+                try:
+                    lease_service.release_lease(LEASE_NAME, self.owner)
+                except Exception as e:
+                    current_app.logger.error(f"Erro ao liberar o lease do scheduler: {str(e)}")
+            self.is_leader = False
 
 
 certificate_scheduler = CertificateScheduler()
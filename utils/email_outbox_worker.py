@@ -0,0 +1,82 @@
+import threading
+from flask import current_app
+
+
+class EmailOutboxWorker:
+    """Worker em background que esvazia a fila de emails (email_outbox)"""
+
+    def __init__(self, app=None):
+        self.app = app
+        self._thread = None
+        self._stop = threading.Event()
+        self._wakeup = threading.Event()
+        self._initialized = False
+
+    def init_app(self, app, force: bool = False):
+        """
+        Inicializa o worker com a aplicação Flask. Com force=True (usado pelo
+        `flask worker`) inicia mesmo com EMAIL_OUTBOX_WORKER_ENABLED desligado.
+        """
+        if not force and not app.config.get("EMAIL_OUTBOX_WORKER_ENABLED", True):
+            app.logger.info("Worker da fila de emails desabilitado")
+            return
+
+        if self._initialized:
+            app.logger.warning(
+                "Worker da fila de emails já foi inicializado, ignorando...")
+            return
+
+        self.app = app
+        self._initialized = True
+        self.start()
+
+    def start(self):
+        """Inicia o worker em thread separada"""
+        if self._thread and self._thread.is_alive():
+            self.app.logger.warning("Worker da fila de emails já está rodando, ignorando...")
+            return
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        self.app.logger.info("Thread do worker da fila de emails iniciada")
+
+    def wake(self):
+        """Antecipa o próximo ciclo (chamado ao enfileirar um email)"""
+        self._wakeup.set()
+
+    def run_once(self) -> dict:
+        """Envia todos os emails vencidos da fila"""
+        from services import email_service
+
+        with self.app.app_context():
+            try:
+                return email_service.drain_outbox()
+            except Exception as e:
+                current_app.logger.error(f"Erro no processamento da fila de emails: {str(e)}")
+                return {}
+
+    def _run(self):
+        """Loop principal: processa a fila e dorme até o intervalo ou um wake()"""
+        interval = self.app.config.get("EMAIL_OUTBOX_POLL_INTERVAL", 10)
+        while not self._stop.is_set():
+            self._wakeup.clear()
+            self.run_once()
+            self._wakeup.wait(interval)
+
+    def stop(self):
+        """Para o worker"""
+        self._stop.set()
+        self._wakeup.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+        self._initialized = False
+
+
+email_outbox_worker = EmailOutboxWorker()
+
+
+def init_email_outbox_worker(app):
+    """Função para inicializar o worker da fila de emails"""
+    email_outbox_worker.init_app(app)
@@ -0,0 +1,173 @@
+"""
+Scheduler persistente de jobs periódicos.
+
+Os jobs são registrados com um intervalo e/ou um horário diário e ficam
+persistidos em `scheduled_jobs` (próxima execução, reserva da execução em
+andamento e último resultado); cada execução é gravada em `job_runs`. Em
+memória há apenas um min-heap (próxima execução, nome): o loop dorme
+exatamente até o job mais próximo, e não em um polling fixo.
+
+Uso:
+    scheduler = JobScheduler(app)
+    scheduler.register("relatorios.diarios", gerar_relatorios, daily_at="02:00")
+    scheduler.run_forever(stop_event, is_active=lambda: sou_lider)
+"""
+import heapq
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Callable
+
+from app import db
+from domain.models import JobRunStatus
+import services.scheduled_job_service as service
+from services.scheduled_job_service import CATCH_UP_RUN_ONCE, CATCH_UP_SKIP
+
+
+# Espera antes de tentar de novo um job reservado por outro processo
+BUSY_RETRY_SECONDS = 30
+
+
+@dataclass
+class JobDefinition:
+    func: Callable
+    interval_seconds: int | None
+    daily_at: str | None
+    catch_up: str
+
+
+class JobScheduler:
+    """Executa os jobs registrados nos horários persistidos no banco"""
+
+    def __init__(self, app=None):
+        self.app = app
+        self.owner = None
+        self._jobs = {}
+        self._heap = []
+        self._wake = threading.Event()
+
+    def register(self, name: str, func: Callable, interval_seconds: int | None = None,
+                 daily_at: str | None = None, catch_up: str = CATCH_UP_RUN_ONCE) -> None:
+        """
+        Registra um job. Vários gatilhos no mesmo job (ex.: a cada 6 horas e
+        diariamente às 23:00) nunca se sobrepõem, pois há uma única próxima execução.
+        Args:
+            name (str): Nome único do job.
+            func (Callable): Função sem argumentos, executada no contexto da
+                aplicação; o retorno (ex.: estatísticas) é gravado no histórico.
+            interval_seconds (int | None): Executa a cada N segundos.
+            daily_at (str | None): Executa diariamente no horário "HH:MM".
+            catch_up (str): "run_once" executa uma vez as execuções perdidas;
+                "skip" as registra como SKIPPED.
+        """
+        self._jobs[name] = JobDefinition(func, interval_seconds, daily_at, catch_up)
+
+    def clear(self) -> None:
+        self._jobs.clear()
+        self._heap = []
+
+    @property
+    def job_names(self) -> list[str]:
+        return list(self._jobs)
+
+    def sync(self, now: datetime | None = None) -> None:
+        """Persiste as definições e reconstrói o heap a partir das próximas execuções do banco"""
+        heap = []
+        with self.app.app_context():
+            for name, definition in self._jobs.items():
+                job = service.register_job(
+                    name, definition.interval_seconds, definition.daily_at,
+                    definition.catch_up, now=now)
+                heap.append((job.next_run_at, name))
+        heapq.heapify(heap)
+        self._heap = heap
+
+    def seconds_until_next(self, now: datetime | None = None) -> float | None:
+        """Segundos até o job mais próximo (0 se já venceu; None sem jobs)"""
+        if not self._heap:
+            return None
+        now = now or datetime.now()
+        return max((self._heap[0][0] - now).total_seconds(), 0)
+
+    def run_due(self, now: datetime | None = None) -> list[str]:
+        """Executa os jobs vencidos até `now`; retorna os nomes dos jobs processados"""
+        now = now or datetime.now()
+        processed = []
+        while self._heap and self._heap[0][0] <= now:
+            _, name = heapq.heappop(self._heap)
+            next_run_at = self._run_job(name, now)
+            heapq.heappush(self._heap, (next_run_at, name))
+            processed.append(name)
+        return processed
+
+    def _run_job(self, name: str, now: datetime) -> datetime:
+        """Reserva e executa (ou pula) o job; retorna sua próxima execução"""
+        definition = self._jobs[name]
+        config = self.app.config
+
+        with self.app.app_context():
+            scheduled_for = service.claim_run(
+                name, self.owner, now, config.get("SCHEDULER_JOB_TIMEOUT", 21600))
+
+            if scheduled_for is None:
+                # Em execução ou já executado por outro processo
+                job = service.get_job(name)
+                return max(job.next_run_at, now + timedelta(seconds=BUSY_RETRY_SECONDS))
+
+            late = (now - scheduled_for).total_seconds() > config.get("SCHEDULER_MISFIRE_GRACE", 600)
+            started_at = datetime.now()
+            result, error = None, None
+
+            if late and definition.catch_up == CATCH_UP_SKIP:
+                status = JobRunStatus.SKIPPED
+                error = f"Execução de {scheduled_for.isoformat()} perdida"
+                self.app.logger.warning(f"Job {name}: {error}, ignorada pela política de catch-up")
+            else:
+                if late:
+                    self.app.logger.info(
+                        f"Job {name}: recuperando execução perdida de {scheduled_for.isoformat()}")
+                try:
+                    result = definition.func()
+                    status = JobRunStatus.SUCCESS
+                except Exception as e:
+                    db.session.rollback()
+                    status, error = JobRunStatus.FAILED, str(e)
+                    self.app.logger.error(f"Erro no job {name}: {error}")
+
+            run = service.finish_run(
+                name, self.owner, scheduled_for, started_at, status,
+                result=result, error=error, history=config.get("SCHEDULER_JOB_HISTORY", 100))
+            self.app.logger.info(
+                f"Job {name} finalizado: {status.name} em {run.duration_seconds}s")
+
+            return service.get_job(name).next_run_at
+
+    def wake(self) -> None:
+        """Interrompe a espera do loop (ex.: ao assumir a liderança ou ao parar)"""
+        self._wake.set()
+
+    def run_forever(self, stop: threading.Event, is_active: Callable[[], bool] = lambda: True) -> None:
+        """
+        Loop do scheduler: enquanto `is_active()` (ex.: processo líder), executa
+        os jobs vencidos e dorme até o próximo, até SCHEDULER_MAX_SLEEP segundos
+        (para perceber mudanças feitas por outros processos) ou até wake().
+        """
+        max_sleep = self.app.config.get("SCHEDULER_MAX_SLEEP", 300)
+        while True:
+            # Limpa antes de checar `stop`, para não perder um wake() dado ao parar
+            self._wake.clear()
+            if stop.is_set():
+                break
+            timeout = max_sleep
+
+            if is_active():
+                try:
+                    self.sync()
+                    self.run_due()
+                    wait = self.seconds_until_next()
+                    if wait is not None:
+                        timeout = min(wait, max_sleep)
+                except Exception as e:
+                    self.app.logger.error(f"Erro no loop do scheduler: {str(e)}")
+
+            self._wake.wait(timeout)
@@ -0,0 +1,43 @@
+import base64
+import binascii
+import json
+from exceptions.business_exceptions import BadRequestException
+
+
+DEFAULT_PAGE_LIMIT = 20
+MAX_PAGE_LIMIT = 100
+
+
+def encode_cursor(data: dict) -> str:
+    """Serializa o cursor em uma string opaca (base64 de um JSON)"""
+    raw = json.dumps(data, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> dict:
+    """Desserializa um cursor gerado por encode_cursor"""
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    except (ValueError, binascii.Error, UnicodeError):
+        raise BadRequestException(details=[{"cursor": "Cursor inválido."}])
+
+    if not isinstance(data, dict):
+        raise BadRequestException(details=[{"cursor": "Cursor inválido."}])
+
+    return data
+
+
+def parse_limit(limit, default: int = DEFAULT_PAGE_LIMIT, maximum: int = MAX_PAGE_LIMIT) -> int:
+    """Valida o parâmetro limit, aplicando o valor padrão e o máximo permitido"""
+    if limit is None or limit == "":
+        return default
+
+    try:
+        limit = int(limit)
+    except (TypeError, ValueError):
+        raise BadRequestException(details=[{"limit": "O limite deve ser um número inteiro."}])
+
+    if limit <= 0:
+        raise BadRequestException(details=[{"limit": "O limite deve ser maior que zero."}])
+
+    return min(limit, maximum)
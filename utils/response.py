@@ -29,3 +29,11 @@ def response_deleted():
 
 def response_resource(data):
     return jsonify(data), 200
+
+
+def response_page(data, next_cursor, **extra):
+    return jsonify({
+        "data": data,
+        "next_cursor": next_cursor,
+        **extra
+    }), 200